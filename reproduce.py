@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
 import argparse
+import json
 import os
+import shutil
+import socket
 import subprocess
+import sys
+import threading
+import time
+import uuid
+import queue
+import statistics
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import CalledProcessError
 
 IMAGE = "rl-project"
 
+QUEUE_PLAN = "plan.json"
+QUEUE_CLAIMS = "claims"
+QUEUE_DONE = "done"
+QUEUE_STALE = "stale"
+QUEUE_FAILED = "failed"
+QUEUE_LOCK = "plan.lock"
+QUEUE_LOCK_STALE_SEC = 60.0
+
 
 def run_cmd(cmd):
     print("[RUN]", " ".join(cmd))
@@ -16,19 +35,37 @@ def run_cmd(cmd):
         raise
 
 
-def start_container(fuzzer, prog, run_id, time_sec, outdir, lr, gamma, clip):
-    cname = f"{fuzzer}_{prog}_{run_id}"
-    abs_out = os.path.abspath(outdir)
+def mount_opts(outdir, corpus_cache=None, shadow=None):
+    opts = ["-v", f"{os.path.abspath(outdir)}:/output"]
+    if corpus_cache:
+        abs_cache = os.path.abspath(corpus_cache)
+        os.makedirs(abs_cache, exist_ok=True)
+        opts += ["-v", f"{abs_cache}:/corpus_cache", "-e", "CORPUS_CACHE=/corpus_cache"]
+    if shadow:
+        opts += ["-v", f"{os.path.abspath(shadow)}:/shadow:ro", "-e", "RL_SHADOW=/shadow"]
+    return opts
 
-    cmd = [
-        "docker", "run",
-        "-d", "--rm",
-        "--name", cname,
-        "-v", f"{abs_out}:/output",
 
+def env_opts(lr, gamma, clip, telemetry_sec=5):
+    return [
         "-e", f"RL_LR={lr}",
         "-e", f"RL_GAMMA={gamma}",
         "-e", f"RL_CLIP={clip}",
+        "-e", f"TELEMETRY_SEC={telemetry_sec}",
+    ]
+
+
+def start_container(fuzzer, prog, run_id, time_sec, outdir, lr, gamma, clip,
+                    telemetry_sec=5, corpus_cache=None, shadow=None, cname=None):
+    if cname is None:
+        cname = f"{fuzzer}_{prog}_{run_id}"
+
+    cmd = [
+        "docker", "run",
+        "-d", "--rm",
+        "--name", cname,
+        *mount_opts(outdir, corpus_cache, shadow),
+        *env_opts(lr, gamma, clip, telemetry_sec),
         IMAGE,
         "/script/entry.sh",
         fuzzer,
@@ -42,16 +79,418 @@ def start_container(fuzzer, prog, run_id, time_sec, outdir, lr, gamma, clip):
 
 
 def wait_container(cname):
+    # the container's exit code (docker wait prints it), None if waiting failed
+    print("[RUN]", "docker wait", cname)
+    r = subprocess.run(["docker", "wait", cname], capture_output=True, text=True)
+    if r.returncode != 0:
+        print(f"[WARN] docker wait failed for {cname}: {r.stderr.strip()}")
+        return None
     try:
-        run_cmd(["docker", "wait", cname])
-    except CalledProcessError:
-        print(f"[WARN] docker wait failed for {cname}")
+        return int(r.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        print(f"[WARN] unexpected docker wait output for {cname}: {r.stdout.strip()!r}")
+        return None
 
 
-def main():
-    ap = argparse.ArgumentParser(
-        description="Run AFL / AFL-PPO experiments in Docker."
+# pool containers run under docker's --init (PID 1 reaps the orphans a job
+# leaves) with an idle sleep that records its PID; the image runs as a non-root
+# user, so the pidfile lives in /tmp and is kept by the reset below
+POOL_PIDFILE = "/tmp/pool_idle.pid"
+POOL_IDLE = f"echo $$ > {POOL_PIDFILE}; exec sleep infinity"
+
+# kill everything but init, the idle sleep and this shell, then drop the PPO
+# socket, AFL temp files and any SysV shm a killed afl-fuzz left behind; exits
+# non-zero (container is recreated) if the idle process is unknown or gone
+POOL_CLEAN = (f"keep=$(cat {POOL_PIDFILE} 2>/dev/null); [ -n \"$keep\" ] || exit 1; "
+              "for p in /proc/[0-9]*; do p=${p#/proc/}; "
+              "case $p in 1|$$|$keep) ;; *) kill -9 $p 2>/dev/null ;; esac; done; "
+              f"find /tmp -mindepth 1 -maxdepth 1 ! -path {POOL_PIDFILE} -exec rm -rf {{}} + 2>/dev/null; "
+              "ipcrm -a 2>/dev/null; kill -0 \"$keep\"")
+
+
+class ContainerPool:
+    # long-lived containers that run jobs through `docker exec`; a container is
+    # (re)created lazily when its mounts differ from the job's or it has been
+    # used max_uses times
+
+    def __init__(self, size, max_uses=20, prefix=None):
+        self.max_uses = max_uses
+        self.prefix = prefix or f"rlpool_{os.getpid()}"
+        self.idle = queue.Queue()
+        self.slots = [{"name": f"{self.prefix}_{i}", "mounts": None, "uses": 0} for i in range(size)]
+        for slot in self.slots:
+            self.idle.put(slot)
+
+    def _start(self, slot, mounts):
+        subprocess.run(["docker", "rm", "-f", slot["name"]],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        run_cmd(["docker", "run", "-d", "--rm", "--init", "--name", slot["name"], *mounts,
+                 IMAGE, "sh", "-c", POOL_IDLE])
+        slot["mounts"] = mounts
+        slot["uses"] = 0
+
+    def _running(self, slot):
+        r = subprocess.run(["docker", "inspect", "-f", "{{.State.Running}}", slot["name"]],
+                           capture_output=True, text=True)
+        return r.returncode == 0 and r.stdout.strip() == "true"
+
+    def _clean(self, slot):
+        r = subprocess.run(["docker", "exec", slot["name"], "bash", "-c", POOL_CLEAN],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if r.returncode != 0:
+            slot["mounts"] = None
+
+    def run(self, job):
+        slot = self.idle.get()
+        try:
+            mounts = mount_opts(job["output"], job.get("corpus_cache"), job.get("shadow"))
+            if slot["mounts"] != mounts or slot["uses"] >= self.max_uses:
+                if slot["mounts"] is not None:
+                    print(f"[POOL] recycling {slot['name']} after {slot['uses']} job(s)")
+                self._start(slot, mounts)
+            elif not self._running(slot):
+                print(f"[POOL] {slot['name']} is no longer running, recreating it")
+                self._start(slot, mounts)
+            slot["uses"] += 1
+            try:
+                run_cmd([
+                    "docker", "exec",
+                    *env_opts(job["lr"], job["gamma"], job["clip"], job.get("telemetry_sec", 5)),
+                    slot["name"],
+                    "/script/entry.sh", job["fuzzer"], job["prog"], str(job["run_id"]), str(job["time_sec"]),
+                ])
+            finally:
+                self._clean(slot)
+        except (CalledProcessError, OSError):
+            # a container in an unknown state is not reused
+            slot["mounts"] = None
+            raise
+        finally:
+            self.idle.put(slot)
+
+    def close(self):
+        for slot in self.slots:
+            if slot["mounts"] is not None:
+                subprocess.run(["docker", "rm", "-f", slot["name"]],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                slot["mounts"] = None
+
+
+def make_job(fuzzer, prog, run_id, time_sec, outdir, lr, gamma, clip, telemetry_sec=5, corpus_cache=None,
+             shadow=None, retries=0):
+    return {
+        "fuzzer": fuzzer,
+        "prog": prog,
+        "run_id": run_id,
+        "time_sec": time_sec,
+        "output": os.path.abspath(outdir),
+        "lr": lr,
+        "gamma": gamma,
+        "clip": clip,
+        "telemetry_sec": telemetry_sec,
+        "corpus_cache": os.path.abspath(corpus_cache) if corpus_cache else None,
+        "shadow": os.path.abspath(shadow) if shadow else None,
+        "retries": retries,
+    }
+
+
+def run_job_fresh(job, cname=None):
+    start_container(
+        fuzzer=job["fuzzer"],
+        prog=job["prog"],
+        run_id=job["run_id"],
+        time_sec=job["time_sec"],
+        outdir=job["output"],
+        lr=job["lr"],
+        gamma=job["gamma"],
+        clip=job["clip"],
+        telemetry_sec=job.get("telemetry_sec", 5),
+        corpus_cache=job.get("corpus_cache"),
+        shadow=job.get("shadow"),
+        cname=cname,
     )
+    cname = cname or f"{job['fuzzer']}_{job['prog']}_{job['run_id']}"
+    rc = wait_container(cname)
+    if rc != 0:
+        raise CalledProcessError(-1 if rc is None else rc, ["docker", "wait", cname])
+
+
+def run_pooled(jobs, pool):
+    # one thread per container; each blocks in `docker exec` for its job
+    failed = 0
+    with ThreadPoolExecutor(max_workers=len(pool.slots)) as ex:
+        futs = [(job, ex.submit(pool.run, job)) for job in jobs]
+        for job, fut in futs:
+            try:
+                fut.result()
+            except (CalledProcessError, OSError) as e:
+                print(f"[ERR] {job['fuzzer']}_{job['prog']}_{job['run_id']} failed: {e}")
+                failed += 1
+    return failed
+
+
+def atomic_write_json(path, obj):
+    tmp = f"{path}.tmp.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def init_queue(queue_dir):
+    for sub in (QUEUE_CLAIMS, QUEUE_DONE, QUEUE_STALE, QUEUE_FAILED):
+        os.makedirs(os.path.join(queue_dir, sub), exist_ok=True)
+
+
+def load_plan(queue_dir):
+    plan = read_json(os.path.join(queue_dir, QUEUE_PLAN))
+    if not plan:
+        return []
+    return plan["jobs"]
+
+
+def claim_path(queue_dir, job_id):
+    return os.path.join(queue_dir, QUEUE_CLAIMS, f"{job_id}.json")
+
+
+def done_path(queue_dir, job_id):
+    return os.path.join(queue_dir, QUEUE_DONE, f"{job_id}.json")
+
+
+def failed_path(queue_dir, job_id):
+    return os.path.join(queue_dir, QUEUE_FAILED, f"{job_id}.json")
+
+
+@contextmanager
+def plan_lock(queue_dir):
+    # same O_EXCL mechanism as the claims; a lock left by a crashed planner is
+    # broken after QUEUE_LOCK_STALE_SEC
+    path = os.path.join(queue_dir, QUEUE_LOCK)
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > QUEUE_LOCK_STALE_SEC:
+                    print(f"[QUEUE] breaking stale lock {path}")
+                    os.unlink(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.2)
+    try:
+        os.write(fd, f"{socket.gethostname()}-{os.getpid()}".encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def run_dir_of(job):
+    return os.path.join(job["output"], f"{job['fuzzer']}_{job['prog']}_{job['run_id']}")
+
+
+def add_jobs(queue_dir, fuzzers, prog, num_runs, time_sec, outdir, lr, gamma, clip,
+             telemetry_sec=5, corpus_cache=None, shadow=None, retries=0):
+    init_queue(queue_dir)
+    abs_out = os.path.abspath(outdir)
+    # concurrent `plan` calls would otherwise drop each other's jobs and reuse job ids
+    with plan_lock(queue_dir):
+        jobs = load_plan(queue_dir)
+        seen = {(j["output"], j["fuzzer"], j["prog"], j["run_id"]) for j in jobs}
+
+        added = 0
+        for fuzzer in fuzzers:
+            for run_id in range(num_runs):
+                if (abs_out, fuzzer, prog, run_id) in seen:
+                    continue
+                job = make_job(fuzzer, prog, run_id, time_sec, abs_out, lr, gamma, clip,
+                               telemetry_sec=telemetry_sec, corpus_cache=corpus_cache, shadow=shadow,
+                               retries=retries)
+                jobs.append({"job_id": f"{len(jobs):04d}_{fuzzer}_{prog}_{run_id}", **job})
+                added += 1
+
+        atomic_write_json(os.path.join(queue_dir, QUEUE_PLAN), {"jobs": jobs})
+    return added, len(jobs)
+
+
+def try_claim(queue_dir, job_id, worker_id):
+    token = uuid.uuid4().hex
+    try:
+        fd = os.open(claim_path(queue_dir, job_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return None
+    with os.fdopen(fd, "w") as f:
+        json.dump({"worker": worker_id, "token": token, "claimed_at": time.time()}, f)
+    return token
+
+
+def release_claim(path, token):
+    claim = read_json(path)
+    if claim and claim.get("token") == token:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def reclaim_stale(queue_dir, lease_sec):
+    claims_dir = os.path.join(queue_dir, QUEUE_CLAIMS)
+    now = time.time()
+    for name in sorted(os.listdir(claims_dir)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(claims_dir, name)
+        try:
+            age = now - os.path.getmtime(path)
+        except FileNotFoundError:
+            continue
+        if age < lease_sec:
+            continue
+
+        # rename is atomic: exactly one worker wins the stale lease
+        stale = os.path.join(queue_dir, QUEUE_STALE, f"{name}.{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(path, stale)
+        except FileNotFoundError:
+            continue
+        print(f"[QUEUE] reclaimed stale lease {name} (age={age:.0f}s)")
+
+
+def start_heartbeat(path, token, interval):
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            claim = read_json(path)
+            if not claim or claim.get("token") != token:
+                print(f"[WARN] lease lost: {path}")
+                return
+            os.utime(path)
+
+    threading.Thread(target=beat, daemon=True).start()
+    return stop
+
+
+def move_aside_partial_run(queue_dir, job):
+    run_dir = run_dir_of(job)
+    if not os.path.exists(run_dir):
+        return
+    dst = os.path.join(queue_dir, QUEUE_STALE, f"{job['job_id']}.{int(time.time())}")
+    print(f"[QUEUE] moving partial output {run_dir} -> {dst}")
+    shutil.move(run_dir, dst)
+
+
+def run_job_in_container(job):
+    cname = f"q{job['job_id']}"
+    # a crashed worker on this host may have left the container behind
+    subprocess.run(["docker", "rm", "-f", cname],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    run_job_fresh(job, cname=cname)
+
+
+def run_job_dry(job):
+    print(f"[DRY] {job['job_id']} -> {run_dir_of(job)}")
+    os.makedirs(run_dir_of(job), exist_ok=True)
+    time.sleep(1.0)
+
+
+def next_job(queue_dir, worker_id):
+    for job in load_plan(queue_dir):
+        job_id = job["job_id"]
+        if os.path.exists(done_path(queue_dir, job_id)):
+            continue
+        token = try_claim(queue_dir, job_id, worker_id)
+        if token is None:
+            continue
+        # the previous owner may have finished between our check and claim
+        if os.path.exists(done_path(queue_dir, job_id)):
+            release_claim(claim_path(queue_dir, job_id), token)
+            continue
+        return job, token
+    return None, None
+
+
+def queue_drained(queue_dir):
+    return all(
+        os.path.exists(done_path(queue_dir, j["job_id"]))
+        for j in load_plan(queue_dir)
+    )
+
+
+def run_worker(queue_dir, worker_id, lease_sec=120.0, poll_sec=10.0, run_job=run_job_in_container):
+    init_queue(queue_dir)
+    print(f"[QUEUE] worker={worker_id}, queue={os.path.abspath(queue_dir)}, lease={lease_sec}s")
+
+    n_jobs = 0
+    while True:
+        reclaim_stale(queue_dir, lease_sec)
+        job, token = next_job(queue_dir, worker_id)
+
+        if job is None:
+            if queue_drained(queue_dir):
+                break
+            time.sleep(poll_sec)
+            continue
+
+        job_id = job["job_id"]
+        cpath = claim_path(queue_dir, job_id)
+        print(f"[QUEUE] {worker_id} claimed {job_id}")
+
+        stop = start_heartbeat(cpath, token, max(1.0, lease_sec / 3))
+        t0 = time.time()
+        status = "ok"
+        error = None
+        try:
+            move_aside_partial_run(queue_dir, job)
+            run_job(job)
+        except (CalledProcessError, OSError) as e:
+            print(f"[ERR] {job_id} failed: {e}")
+            status = "failed"
+            error = str(e)
+        finally:
+            stop.set()
+
+        # earlier failed attempts are counted in failed/<job_id>.json; only the
+        # claim holder writes it, so there is no race on the count
+        fpath = failed_path(queue_dir, job_id)
+        attempts = (read_json(fpath) or {}).get("attempts", 0) + 1
+        n_jobs += 1
+        if status == "failed" and attempts <= job.get("retries", 0):
+            atomic_write_json(fpath, {"job_id": job_id, "attempts": attempts, "last_worker": worker_id,
+                                      "last_error": error, "end": time.time()})
+            release_claim(cpath, token)
+            print(f"[QUEUE] {worker_id} requeued {job_id} (attempt {attempts}/{job['retries'] + 1} failed)")
+            continue
+
+        atomic_write_json(done_path(queue_dir, job_id), {
+            "job_id": job_id,
+            "worker": worker_id,
+            "status": status,
+            "attempts": attempts,
+            "error": error,
+            "start": t0,
+            "end": time.time(),
+        })
+        release_claim(cpath, token)
+        print(f"[QUEUE] {worker_id} finished {job_id} ({status}, {time.time() - t0:.0f}s)")
+
+    print(f"[QUEUE] worker {worker_id} done: ran {n_jobs} job(s), queue drained")
+    return n_jobs
+
+
+def add_run_args(ap):
     ap.add_argument(
         "--fuzzer",
         choices=["AFL", "AFL-PPO", "both"],
@@ -70,12 +509,6 @@ def main():
         default=5,
         help="Number of runs per fuzzer",
     )
-    ap.add_argument(
-        "--max-parallel",
-        type=int,
-        default=2,
-        help="Max number of containers to run in parallel",
-    )
     ap.add_argument(
         "--time-sec",
         type=int,
@@ -107,19 +540,266 @@ def main():
         default=0.2,
         help="PPO clipping epsilon (default: 0.2)",
     )
+    ap.add_argument(
+        "--telemetry-sec",
+        type=int,
+        default=5,
+        help="CPU/RSS/IO sampling interval inside the container, 0 disables (default: 5)",
+    )
+    ap.add_argument(
+        "--corpus-cache",
+        type=str,
+        default=None,
+        help="Host dir for the afl-cmin/afl-tmin minimized seed cache (default: raw seeds)",
+    )
+    ap.add_argument(
+        "--shadow",
+        type=str,
+        default=None,
+        help="Host dir of *.pt policy checkpoints evaluated in shadow mode next to the live PPO policy",
+    )
+
+
+def add_pool_args(ap):
+    ap.add_argument(
+        "--pool",
+        action="store_true",
+        help="Run jobs with 'docker exec' in long-lived containers instead of one 'docker run' per run",
+    )
+    ap.add_argument(
+        "--pool-max-uses",
+        type=int,
+        default=20,
+        help="Recycle a pooled container after this many jobs (default: 20)",
+    )
+
+
+def fuzzers_of(arg):
+    if arg == "both":
+        return ["AFL", "AFL-PPO"]
+    return [arg]
+
+
+def plan_main(argv):
+    ap = argparse.ArgumentParser(
+        prog="reproduce.py plan",
+        description="Append AFL / AFL-PPO runs to a shared-directory job queue.",
+    )
+    ap.add_argument(
+        "--queue",
+        required=True,
+        help="Shared queue directory (plan.json, claims/, done/)",
+    )
+    ap.add_argument(
+        "--retries",
+        type=int,
+        default=1,
+        help="Times a failed job is requeued before it is recorded as failed (default: 1)",
+    )
+    add_run_args(ap)
+    args = ap.parse_args(argv)
+
+    added, total = add_jobs(
+        args.queue,
+        fuzzers_of(args.fuzzer),
+        args.prog,
+        args.num_runs,
+        args.time_sec,
+        args.output,
+        args.lr,
+        args.gamma,
+        args.clip,
+        telemetry_sec=args.telemetry_sec,
+        corpus_cache=args.corpus_cache,
+        shadow=args.shadow,
+        retries=args.retries,
+    )
+    print(f"[QUEUE] added {added} job(s), {total} in plan {os.path.abspath(args.queue)}")
+
+
+def worker_main(argv):
+    ap = argparse.ArgumentParser(
+        prog="reproduce.py worker",
+        description="Claim and run jobs from a shared-directory job queue until it is drained.",
+    )
+    ap.add_argument(
+        "--queue",
+        required=True,
+        help="Shared queue directory created by 'reproduce.py plan'",
+    )
+    ap.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Worker name recorded in claim/done files (default: host-pid)",
+    )
+    ap.add_argument(
+        "--lease-sec",
+        type=float,
+        default=120.0,
+        help="Claims without a heartbeat for this long are reclaimed (default: 120)",
+    )
+    ap.add_argument(
+        "--poll-sec",
+        type=float,
+        default=10.0,
+        help="Sleep between polls while other workers hold the remaining jobs",
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Do not start containers; simulate each job (for testing the queue)",
+    )
+    add_pool_args(ap)
+    args = ap.parse_args(argv)
+
+    pool = None
+    run_job = run_job_in_container
+    if args.dry_run:
+        run_job = run_job_dry
+    elif args.pool:
+        # a worker runs one job at a time, so one warm container is enough
+        pool = ContainerPool(1, max_uses=args.pool_max_uses, prefix=f"rlpool_{args.worker_id}")
+        run_job = pool.run
+
+    try:
+        run_worker(
+            args.queue,
+            args.worker_id,
+            lease_sec=args.lease_sec,
+            poll_sec=args.poll_sec,
+            run_job=run_job,
+        )
+    finally:
+        if pool:
+            pool.close()
+
+
+def bench_pool_main(argv):
+    ap = argparse.ArgumentParser(
+        prog="reproduce.py bench-pool",
+        description="Run the same short jobs with fresh containers and with a warm pool and compare job turnaround.",
+    )
+    add_run_args(ap)
+    ap.add_argument(
+        "--max-parallel",
+        type=int,
+        default=2,
+        help="Concurrent jobs (and pool size) in both modes",
+    )
+    ap.add_argument(
+        "--pool-max-uses",
+        type=int,
+        default=20,
+        help="Recycle a pooled container after this many jobs (default: 20)",
+    )
+    args = ap.parse_args(argv)
+
+    # "both" benchmarks AFL-PPO, which also starts the PPO server
+    fuzzer = fuzzers_of(args.fuzzer)[-1]
+    results = {}
+    for mode in ("fresh", "pool"):
+        outdir = os.path.join(os.path.abspath(args.output), mode)
+        shutil.rmtree(outdir, ignore_errors=True)
+        os.makedirs(outdir)
+        jobs = [make_job(fuzzer, args.prog, i, args.time_sec, outdir, args.lr, args.gamma, args.clip,
+                         telemetry_sec=args.telemetry_sec, corpus_cache=args.corpus_cache, shadow=args.shadow)
+                for i in range(args.num_runs)]
+
+        pool = ContainerPool(args.max_parallel, max_uses=args.pool_max_uses) if mode == "pool" else None
+        prefix = f"bench_{os.getpid()}"
+
+        def one(job):
+            t0 = time.time()
+            try:
+                if pool:
+                    pool.run(job)
+                else:
+                    run_job_fresh(job, cname=f"{prefix}_{job['run_id']}")
+                ok = True
+            except (CalledProcessError, OSError) as e:
+                print(f"[ERR] {mode} job {job['run_id']} failed: {e}")
+                ok = False
+            return time.time() - t0, ok
+
+        print(f"\n=== bench-pool: {mode}, {len(jobs)} x {fuzzer} {args.prog} {args.time_sec}s ===")
+        t0 = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=args.max_parallel) as ex:
+                done = list(ex.map(one, jobs))
+        finally:
+            if pool:
+                pool.close()
+        turnaround = [t for t, _ in done]
+        results[mode] = {
+            "jobs": len(jobs),
+            "failed": sum(1 for _, ok in done if not ok),
+            "makespan_sec": time.time() - t0,
+            "turnaround_sec": turnaround,
+            "turnaround_median": statistics.median(turnaround),
+            "overhead_median": statistics.median(turnaround) - args.time_sec,
+        }
+
+    print("\n| mode | jobs | failed | makespan (s) | turnaround median (s) | overhead / job (s) |")
+    print("| --- | --- | --- | --- | --- | --- |")
+    for mode, r in results.items():
+        print(f"| {mode} | {r['jobs']} | {r['failed']} | {r['makespan_sec']:.1f} | "
+              f"{r['turnaround_median']:.1f} | {r['overhead_median']:.1f} |")
+
+    out_path = os.path.join(os.path.abspath(args.output), "pool_bench.json")
+    atomic_write_json(out_path, {"args": vars(args), "fuzzer": fuzzer, "results": results})
+    print(f"[INFO] saved {out_path}")
+
 
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "plan":
+        return plan_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        return worker_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "bench-pool":
+        return bench_pool_main(sys.argv[2:])
+
+    ap = argparse.ArgumentParser(
+        description="Run AFL / AFL-PPO experiments in Docker.",
+        epilog="Subcommands: 'reproduce.py plan --queue DIR ...' enqueues runs, "
+               "'reproduce.py worker --queue DIR' drains a shared queue, "
+               "'reproduce.py bench-pool ...' compares fresh and pooled containers.",
+    )
+    add_run_args(ap)
+    ap.add_argument(
+        "--max-parallel",
+        type=int,
+        default=2,
+        help="Max number of containers to run in parallel",
+    )
+    add_pool_args(ap)
     args = ap.parse_args()
     os.makedirs(args.output, exist_ok=True)
 
-    if args.fuzzer == "both":
-        fuzzers = ["AFL", "AFL-PPO"]
-    else:
-        fuzzers = [args.fuzzer]
+    fuzzers = fuzzers_of(args.fuzzer)
 
     print(f"[INFO] image={IMAGE}, output={os.path.abspath(args.output)}")
     print(f"[INFO] fuzzers={fuzzers}, prog={args.prog}, num_runs={args.num_runs}")
     print(f"[INFO] max_parallel={args.max_parallel}, time_sec={args.time_sec}")
     print(f"[INFO] PPO hyperparams: lr={args.lr}, gamma={args.gamma}, clip={args.clip}")
+    if args.shadow:
+        print(f"[INFO] shadow policies: {os.path.abspath(args.shadow)}")
+
+    if args.pool:
+        print(f"[INFO] pool: {args.max_parallel} warm container(s), recycled every {args.pool_max_uses} job(s)")
+        pool = ContainerPool(args.max_parallel, max_uses=args.pool_max_uses)
+        try:
+            for fuzzer in fuzzers:
+                print(f"\n=== Running fuzzer={fuzzer} prog={args.prog} (pooled) ===")
+                jobs = [make_job(fuzzer, args.prog, run_id, args.time_sec, args.output, args.lr, args.gamma,
+                                 args.clip, telemetry_sec=args.telemetry_sec, corpus_cache=args.corpus_cache,
+                                 shadow=args.shadow)
+                        for run_id in range(args.num_runs)]
+                run_pooled(jobs, pool)
+        finally:
+            pool.close()
+        print("\n=== All runs finished ===")
+        print(f"Results under: {os.path.abspath(args.output)}")
+        return
 
     for fuzzer in fuzzers:
         print(f"\n=== Running fuzzer={fuzzer} prog={args.prog} ===")
@@ -129,7 +809,9 @@ def main():
             if len(running) >= args.max_parallel:
                 cname0 = running.pop(0)
                 print(f"[INFO] Waiting for {cname0} to finish...")
-                wait_container(cname0)
+                rc = wait_container(cname0)
+                if rc != 0:
+                    print(f"[WARN] {cname0} exited with {rc}")
 
             cname = start_container(
                 fuzzer=fuzzer,
@@ -140,12 +822,17 @@ def main():
                 lr=args.lr,
                 gamma=args.gamma,
                 clip=args.clip,
+                telemetry_sec=args.telemetry_sec,
+                corpus_cache=args.corpus_cache,
+                shadow=args.shadow,
             )
             running.append(cname)
 
         for cname in running:
             print(f"[INFO] Waiting for {cname} to finish...")
-            wait_container(cname)
+            rc = wait_container(cname)
+            if rc != 0:
+                print(f"[WARN] {cname} exited with {rc}")
 
     print("\n=== All runs finished ===")
     print(f"Results under: {os.path.abspath(args.output)}")
@@ -4,6 +4,29 @@ import re
 import json
 import statistics
 from glob import glob
+from functools import partial
+
+import numpy as np
+
+from run_loader import parallel_map, parse_plot_data, stream_ppo_log, add_jobs_arg
+from coverage_metrics import (
+    REL_THRESHOLDS_DEFAULT,
+    CHECKPOINTS_DEFAULT,
+    coverage_metrics,
+    parse_abs_thresholds,
+    parse_duration,
+)
+
+PARSER_VERSION = 3
+PPO_WINDOW = 1000
+CACHE_NAME = ".analyze_cache.npz"
+RUN_FILES = [
+    "fuzzer_stats",
+    "plot_data",
+    "ppo_log.csv",
+    "ppo_server.log",
+    "telemetry.csv",
+]
 
 def parse_fuzzer_stats(path):
     data = {}
@@ -26,44 +49,24 @@ def parse_fuzzer_stats(path):
     return data
 
 
-def parse_ppo_log(path):
-    if not os.path.exists(path):
+def time_to_first_new_path(plot, start_time=None):
+    # plot: parse_plot_data() result
+    if plot is None:
         return None
 
-    steps = []
-    rewards = []
-    probs = []
-
-    with open(path) as f:
-        header = f.readline().strip().split(",")
-        for line in f:
-            cols = line.strip().split(",")
-            if len(cols) < 2:
-                continue
-
-            try:
-                step = int(cols[0])
-                reward = float(cols[1])
-            except ValueError:
-                continue
-
-            steps.append(step)
-            rewards.append(reward)
+    paths = plot["paths_total"]
+    later = np.nonzero(paths > paths[0])[0]
+    if len(later) == 0:
+        return None
+    t = int(plot["unix_time"][later[0]])
+    # start_time includes calibration / dry run of the seed corpus
+    t0 = start_time if start_time is not None else int(plot["unix_time"][0])
+    return t - t0
 
-            if len(cols) >= 2 + 4:
-                try:
-                    p = [float(x) for x in cols[2:6]]
-                except ValueError:
-                    p = []
-            else:
-                p = []
-            probs.append(p)
 
-    return {
-        "steps": steps,
-        "rewards": rewards,
-        "probs": probs,
-    }
+def parse_ppo_log(path, window=PPO_WINDOW, keep_arrays=False):
+    # one pass over fixed-size chunks; per-step arrays only when keep_arrays=True
+    return stream_ppo_log(path, window=window, keep_arrays=keep_arrays)
 
 
 def parse_ppo_server_log(path):
@@ -82,6 +85,48 @@ def parse_ppo_server_log(path):
     return last_hist
 
 
+def parse_telemetry(path):
+    if not os.path.exists(path):
+        return None
+
+    last = {}
+    rss_peak = {}
+    load = []
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+        for line in f:
+            row = dict(zip(header, line.strip().split(",")))
+            if len(row) != len(header):
+                continue
+            try:
+                g = row["group"]
+                rss = int(row["rss_kb"])
+                load.append(float(row["load1"]))
+            except (KeyError, ValueError):
+                continue
+            last[g] = row
+            rss_peak[g] = max(rss_peak.get(g, 0), rss)
+
+    if not last:
+        return None
+
+    # counters are cumulative per process tree, so the last sample holds the totals
+    out = {}
+    cpu = {g: float(r["cpu_sec"]) for g, r in last.items()}
+    cpu_total = sum(cpu.values())
+    for g, r in last.items():
+        wall = float(r["t"])
+        out[f"{g}_cpu_sec"] = cpu[g]
+        out[f"{g}_cpu_share"] = cpu[g] / cpu_total if cpu_total > 0 else 0.0
+        out[f"{g}_cpu_util"] = cpu[g] / wall if wall > 0 else 0.0
+        out[f"{g}_rss_peak_kb"] = float(rss_peak[g])
+        out[f"{g}_read_bytes"] = float(r["read_bytes"])
+        out[f"{g}_write_bytes"] = float(r["write_bytes"])
+        out[f"{g}_ctxt_switches"] = float(int(r["vol_ctxt"]) + int(r["nonvol_ctxt"]))
+    out["host_load1_avg"] = sum(load) / len(load)
+    return out
+
+
 IMPORTANT_STATS = [
     "execs_done",
     "execs_per_sec",
@@ -92,6 +137,7 @@ IMPORTANT_STATS = [
     "cycles_done",
     "pending_total",
     "pending_favs",
+    "time_to_first_new_path",
 ]
 
 def safe_float(s):
@@ -112,6 +158,16 @@ def safe_int(s):
         return None
 
 
+def summarize(vals):
+    return {
+        "avg": sum(vals) / len(vals),
+        "median": statistics.median(vals),
+        "min": min(vals),
+        "max": max(vals),
+        "raw": vals,
+    }
+
+
 def aggregate_runs(stats_list):
     result = {}
 
@@ -127,34 +183,126 @@ def aggregate_runs(stats_list):
                 vals.append(v)
 
         if vals:
-            result[k] = {
-                "avg": sum(vals) / len(vals),
-                "median": statistics.median(vals),
-                "min": min(vals),
-                "max": max(vals),
-                "raw": vals,
-            }
+            result[k] = summarize(vals)
+
+    return result
+
 
+def aggregate_numeric(dicts):
+    # per-key summary over dicts of plain numbers (telemetry, coverage metrics)
+    result = {}
+    keys = sorted({k for d in dicts for k in d})
+    for k in keys:
+        vals = [d[k] for d in dicts if k in d]
+        result[k] = summarize(vals)
     return result
 
-def analyze_result_dir(base_dir):
+def file_signature(run_path):
+    sig = {}
+    for name in RUN_FILES:
+        try:
+            st = os.stat(os.path.join(run_path, name))
+        except FileNotFoundError:
+            sig[name] = None
+            continue
+        sig[name] = [st.st_size, st.st_mtime_ns]
+    return sig
+
+
+def parse_run(run_path, cov_opts=None):
+    stats = parse_fuzzer_stats(os.path.join(run_path, "fuzzer_stats"))
+    # parsed once for both time_to_first_new_path and the coverage metrics
+    plot = parse_plot_data(os.path.join(run_path, "plot_data"))
+    start_time = None
+    if stats:
+        start_time = safe_float(stats.get("start_time"))
+        ttfnp = time_to_first_new_path(plot, start_time)
+        if ttfnp is not None:
+            stats["time_to_first_new_path"] = str(ttfnp)
+
+    return {
+        "stats": stats,
+        "coverage": coverage_metrics(plot, start_time, **(cov_opts or {})),
+        "ppo": parse_ppo_log(os.path.join(run_path, "ppo_log.csv")),
+        "hist": parse_ppo_server_log(os.path.join(run_path, "ppo_server.log")),
+        "telemetry": parse_telemetry(os.path.join(run_path, "telemetry.csv")),
+    }
+
+
+def load_cached_run(cache_path, sig, cov_opts=None):
+    try:
+        with np.load(cache_path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("version") != PARSER_VERSION or meta.get("sig") != sig:
+                return None
+            if meta.get("cov_opts") != cov_opts:
+                return None
+            run = meta["run"]
+            if run["ppo"] is not None:
+                for k in meta["ppo_arrays"]:
+                    run["ppo"][k] = z[f"ppo_{k}"]
+            return run
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_cached_run(cache_path, sig, run, cov_opts=None):
+    ppo = run["ppo"] or {}
+    arrays = {k: v for k, v in ppo.items() if isinstance(v, np.ndarray)}
+    meta_run = dict(run)
+    if run["ppo"] is not None:
+        meta_run["ppo"] = {k: v for k, v in ppo.items() if k not in arrays}
+    meta = {
+        "version": PARSER_VERSION,
+        "sig": sig,
+        "cov_opts": cov_opts,
+        "ppo_arrays": sorted(arrays),
+        "run": meta_run,
+    }
+    arrays = {f"ppo_{k}": v for k, v in arrays.items()}
+
+    tmp = f"{cache_path}.tmp.{os.getpid()}.npz"
+    try:
+        np.savez(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"  [WARN] could not write parse cache: {e}")
+
+
+def load_run(run_path, use_cache=True, rebuild=False, cov_opts=None):
+    cache_path = os.path.join(run_path, CACHE_NAME)
+    sig = file_signature(run_path)
 
-    runs = sorted(glob(os.path.join(base_dir, "*")))
+    if use_cache and not rebuild:
+        run = load_cached_run(cache_path, sig, cov_opts)
+        if run is not None:
+            return run, True
+
+    run = parse_run(run_path, cov_opts)
+    if use_cache:
+        save_cached_run(cache_path, sig, run, cov_opts)
+    return run, False
+
+
+def analyze_result_dir(base_dir, use_cache=True, rebuild=False, jobs=1, cov_opts=None):
+
+    runs = [r for r in sorted(glob(os.path.join(base_dir, "*"))) if os.path.isdir(r)]
+    loaded = parallel_map(
+        partial(load_run, use_cache=use_cache, rebuild=rebuild, cov_opts=cov_opts), runs, jobs
+    )
 
     all_stats = []
+    coverage = []
     ppo_logs = []
     ppo_server_logs = []
+    telemetry = []
 
-    for run_path in runs:
-        if not os.path.isdir(run_path):
-            continue
-
+    for run_path, (run, cached) in zip(runs, loaded):
         name = os.path.basename(run_path)
 
-        print(f"\n=== Parsing {name} ===")
+        print(f"\n=== Parsing {name}{' (cached)' if cached else ''} ===")
 
-        st_path = os.path.join(run_path, "fuzzer_stats")
-        stats = parse_fuzzer_stats(st_path)
+        stats = run["stats"]
         all_stats.append(stats)
 
         if stats:
@@ -162,18 +310,26 @@ def analyze_result_dir(base_dir):
         else:
             print("  fuzzer_stats missing")
 
-        ppo_csv = os.path.join(run_path, "ppo_log.csv")
-        ppo_data = parse_ppo_log(ppo_csv)
+        cov = run["coverage"]
+        if cov:
+            print("  plot_data OK")
+            coverage.append(cov)
+
+        ppo_data = run["ppo"]
         if ppo_data:
             print("  ppo_log.csv OK")
             ppo_logs.append(ppo_data)
 
-        ppo_srv = os.path.join(run_path, "ppo_server.log")
-        hist = parse_ppo_server_log(ppo_srv)
+        hist = run["hist"]
         if hist:
             print("  ppo_server.log OK")
             ppo_server_logs.append(hist)
 
+        tel = run["telemetry"]
+        if tel:
+            print("  telemetry.csv OK")
+            telemetry.append(tel)
+
     print("\n==============================")
     print("Aggregate Fuzzer Stats")
     print("==============================")
@@ -181,6 +337,37 @@ def analyze_result_dir(base_dir):
     for k, v in agg.items():
         print(f"{k}: avg={v['avg']:.2f}, median={v['median']:.2f}, min={v['min']:.2f}, max={v['max']:.2f}")
 
+    if coverage:
+        print("\n==============================")
+        print("Coverage Efficiency (plot_data)")
+        print("==============================")
+        # unreached thresholds / checkpoints past the end of a run are None
+        cov_agg = aggregate_numeric([{k: v for k, v in c.items() if v is not None} for c in coverage])
+        for k in sorted({k for c in coverage for k in c}):
+            v = cov_agg.get(k)
+            if v is None:
+                print(f"{k}: not reached in any run")
+                continue
+            missing = len(coverage) - len(v["raw"])
+            note = f" ({missing} run(s) without a value)" if missing else ""
+            print(f"{k}: avg={v['avg']:.3f}, median={v['median']:.3f}, min={v['min']:.3f}, max={v['max']:.3f}{note}")
+        agg.update(cov_agg)
+
+    if telemetry:
+        print("\n==============================")
+        print("Resource Telemetry")
+        print("==============================")
+        tel_agg = aggregate_numeric(telemetry)
+        for g in ("afl", "ppo"):
+            if f"{g}_cpu_share" not in tel_agg:
+                continue
+            share = tel_agg[f"{g}_cpu_share"]["avg"] * 100.0
+            util = tel_agg[f"{g}_cpu_util"]["avg"]
+            rss = tel_agg[f"{g}_rss_peak_kb"]["max"] / 1024.0
+            print(f"{g}: cpu_share={share:.1f}%, cpu_util={util:.2f} cores, rss_peak={rss:.1f} MiB")
+        print(f"host load1: avg={tel_agg['host_load1_avg']['avg']:.2f}")
+        agg.update(tel_agg)
+
     with open(os.path.join(base_dir, "summary.json"), "w") as f:
         json.dump(agg, f, indent=2)
 
@@ -189,8 +376,12 @@ def analyze_result_dir(base_dir):
         print("PPO Log Analysis")
         print("==============================")
 
-        steps_len = [len(x["steps"]) for x in ppo_logs]
+        steps_len = [x["steps"] for x in ppo_logs]
         print(f"steps per run: {steps_len}")
+        reward_means = [x["reward_mean"] for x in ppo_logs]
+        reward_vars = [x["reward_var"] for x in ppo_logs]
+        print(f"reward mean per run: {[round(v, 4) for v in reward_means]}")
+        entropy_means = [x["entropy_mean"] for x in ppo_logs]
 
         final_hists = ppo_server_logs
         print("Final action histograms:", final_hists)
@@ -205,6 +396,16 @@ def analyze_result_dir(base_dir):
                     "steps_per_run": steps_len,
                     "final_action_hists": final_hists,
                     "avg_action_hist": avg_hist,
+                    "reward_mean_per_run": reward_means,
+                    "reward_var_per_run": reward_vars,
+                    "action_prob_means_per_run": [x["action_prob_means"] for x in ppo_logs],
+                    "entropy_mean_per_run": entropy_means,
+                    "reward_window": PPO_WINDOW,
+                    "windowed_reward_per_run": [x["window_reward"].tolist() for x in ppo_logs],
+                    "windowed_entropy_per_run": [
+                        [None if np.isnan(v) else v for v in x["window_entropy"].tolist()]
+                        for x in ppo_logs
+                    ],
                 }, f, indent=2)
 
     print("\n[OK] Done. summary.json and ppo_summary.json generated.")
@@ -214,6 +415,46 @@ if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser()
     ap.add_argument("--dir", required=True, help="Base directory containing run subdirectories")
+    ap.add_argument("--no-cache", action="store_true", help=f"Do not read or write per-run {CACHE_NAME}")
+    ap.add_argument("--rebuild", action="store_true", help="Re-parse every run and overwrite its cache")
+    ap.add_argument(
+        "--cov-thresholds",
+        type=float,
+        nargs="*",
+        default=REL_THRESHOLDS_DEFAULT,
+        help="time to reach these %% of each run's final bitmap_cvg / paths_total (default: 50 90 99)",
+    )
+    ap.add_argument(
+        "--abs-thresholds",
+        nargs="*",
+        default=[],
+        help="absolute thresholds, e.g. bitmap_cvg=2,3.5 paths_total=500,1000",
+    )
+    ap.add_argument(
+        "--checkpoints",
+        nargs="*",
+        default=CHECKPOINTS_DEFAULT,
+        help="report bitmap_cvg / paths_total at these times since start (default: 10m 30m 1h)",
+    )
+    ap.add_argument(
+        "--horizon",
+        default=None,
+        help="common time horizon for AUC / thresholds (e.g. 24h). Default: each run's own length",
+    )
+    add_jobs_arg(ap)
     args = ap.parse_args()
 
-    analyze_result_dir(args.dir)
+    try:
+        for c in args.checkpoints:
+            parse_duration(c)
+        cov_opts = {
+            "horizon": parse_duration(args.horizon) if args.horizon else None,
+            "rel_thresholds": args.cov_thresholds,
+            "abs_thresholds": parse_abs_thresholds(args.abs_thresholds),
+            "checkpoints": args.checkpoints,
+        }
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    analyze_result_dir(args.dir, use_cache=not args.no_cache, rebuild=args.rebuild,
+                       jobs=args.jobs, cov_opts=cov_opts)
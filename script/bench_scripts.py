@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+import numpy as np
+
+from synth_output import generate_tree
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GROW_CHOICES = ["runs", "duration", "ppo_steps", "queue", "configs"]
+
+
+def git_rev():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=SCRIPT_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(argv, log_path):
+    # wait4() gives this child's own rusage; ru_maxrss (KiB on Linux) already
+    # covers the worker processes it waited for
+    env = dict(os.environ, MPLBACKEND="Agg")
+    t0 = time.perf_counter()
+    with open(log_path, "a") as log:
+        log.write("$ " + " ".join(argv) + "\n")
+        log.flush()
+        p = subprocess.Popen(argv, stdout=log, stderr=subprocess.STDOUT, env=env)
+        _, status, ru = os.wait4(p.pid, 0)
+    p.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "wall_sec": time.perf_counter() - t0,
+        "cpu_sec": ru.ru_utime + ru.ru_stime,
+        "maxrss_kb": ru.ru_maxrss,
+        "rc": p.returncode,
+    }
+
+
+def script(name):
+    return [sys.executable, os.path.join(SCRIPT_DIR, name)]
+
+
+def cases(cfg_dirs, work, jobs):
+    # name -> (state to reset before each repeat, list of commands)
+    labels = [os.path.basename(d) for d in cfg_dirs]
+    ppo = [f"{os.path.basename(d)}={d}" for d in cfg_dirs if "PPO" in os.path.basename(d)]
+    store = os.path.join(work, "store")
+    out = {
+        "analyze_cold": ([], [script("analyze_results.py") + ["--dir", d, "--rebuild", "--jobs", str(jobs)]
+                              for d in cfg_dirs]),
+        "analyze_warm": ([], [script("analyze_results.py") + ["--dir", d, "--jobs", str(jobs)]
+                              for d in cfg_dirs]),
+        "compare_time_series": ([store], [script("compare_time_series.py") + [
+            "--cfg", *cfg_dirs, "--labels", *labels, "--out", os.path.join(work, "fig_ts"),
+            "--store", store, "--jobs", str(jobs)]]),
+    }
+    if ppo:
+        out["plot_ppo_stats"] = ([store], [script("plot_ppo_stats.py") + [
+            "--dirs", *ppo, "--outdir", os.path.join(work, "fig_ppo"), "--store", store, "--jobs", str(jobs)]])
+    return out
+
+
+def scaled(base, grow, k):
+    p = dict(base)
+    for name in grow:
+        if name == "configs":
+            p["afl_configs"] = int(p["afl_configs"] * k)
+            p["ppo_configs"] = int(p["ppo_configs"] * k)
+        else:
+            p[name] = int(p[name] * k)
+    return p
+
+
+def tree_size(root):
+    n = size = 0
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            n += 1
+            size += os.path.getsize(os.path.join(dirpath, f))
+    return n, size
+
+
+def run_scale(k, params, work, jobs, repeat, only):
+    root = os.path.join(work, "output")
+    shutil.rmtree(work, ignore_errors=True)
+    t0 = time.perf_counter()
+    cfg_dirs = generate_tree(root, **params)
+    n_files, n_bytes = tree_size(root)
+    print(f"[BENCH] scale x{k:g}: {len(cfg_dirs)} configs, {n_files} files, {n_bytes / 2**20:.1f} MiB "
+          f"(generated in {time.perf_counter() - t0:.1f}s)")
+
+    log_path = os.path.join(work, "bench.log")
+    res = []
+    for name, (reset, cmds) in cases(cfg_dirs, work, jobs).items():
+        if only and name not in only:
+            continue
+        samples = []
+        for _ in range(repeat):
+            for d in reset:
+                shutil.rmtree(d, ignore_errors=True)
+            ms = [measure(argv, log_path) for argv in cmds]
+            samples.append({
+                "wall_sec": sum(m["wall_sec"] for m in ms),
+                "cpu_sec": sum(m["cpu_sec"] for m in ms),
+                "maxrss_kb": max(m["maxrss_kb"] for m in ms),
+                "rc": max((m["rc"] for m in ms), key=abs),
+            })
+        row = {
+            "scale": k,
+            "case": name,
+            "wall_sec": statistics.median(s["wall_sec"] for s in samples),
+            "cpu_sec": statistics.median(s["cpu_sec"] for s in samples),
+            "maxrss_kb": max(s["maxrss_kb"] for s in samples),
+            "rc": max((s["rc"] for s in samples), key=abs),
+            "samples": samples,
+            "files": n_files,
+            "bytes": n_bytes,
+        }
+        if row["rc"] != 0:
+            print(f"[WARN] {name} exited with {row['rc']} (see {log_path})")
+        print(f"[BENCH]   {name:<20} {row['wall_sec']:8.2f}s wall  {row['cpu_sec']:8.2f}s cpu  "
+              f"{row['maxrss_kb'] / 1024:8.1f} MiB peak")
+        res.append(row)
+    return res
+
+
+def print_table(results, baseline=None):
+    base = {}
+    if baseline:
+        base = {(r["scale"], r["case"]): r for r in baseline["results"]}
+        print(f"\nbaseline: {baseline['commit']} ({baseline['date']})")
+    cols = ["scale", "case", "wall (s)", "cpu (s)", "peak RSS (MiB)"]
+    if base:
+        cols += ["wall vs base", "RSS vs base"]
+    print("\n| " + " | ".join(cols) + " |")
+    print("| " + " | ".join(["---"] * len(cols)) + " |")
+    for r in results:
+        row = [f"x{r['scale']:g}", r["case"], f"{r['wall_sec']:.2f}", f"{r['cpu_sec']:.2f}",
+               f"{r['maxrss_kb'] / 1024:.1f}"]
+        if base:
+            b = base.get((r["scale"], r["case"]))
+            row += ["N/A", "N/A"] if b is None else [f"{r['wall_sec'] / b['wall_sec']:.2f}x",
+                                                     f"{r['maxrss_kb'] / b['maxrss_kb']:.2f}x"]
+        print("| " + " | ".join(row) + " |")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Time the analysis scripts and measure their peak memory on growing synthetic output trees."
+    )
+    ap.add_argument("--scales", nargs="+", type=float, default=[1, 2, 4], help="size multipliers (default: 1 2 4)")
+    ap.add_argument("--grow", nargs="+", choices=GROW_CHOICES, default=["runs", "duration", "ppo_steps"],
+                    help="parameters multiplied by each scale (default: runs duration ppo_steps)")
+    ap.add_argument("--afl-configs", type=int, default=1, help="AFL configs at scale 1 (default: 1)")
+    ap.add_argument("--ppo-configs", type=int, default=1, help="AFL-PPO configs at scale 1 (default: 1)")
+    ap.add_argument("--runs", type=int, default=3, help="runs per config at scale 1 (default: 3)")
+    ap.add_argument("--duration", type=int, default=3600, help="run length in seconds at scale 1 (default: 3600)")
+    ap.add_argument("--ppo-steps", type=int, default=20000, help="ppo_log.csv rows at scale 1 (default: 20000)")
+    ap.add_argument("--queue", type=int, default=300, help="queue/ entries per run at scale 1 (default: 300)")
+    ap.add_argument("--cases", nargs="+", default=None,
+                    help="only these cases (analyze_cold analyze_warm compare_time_series plot_ppo_stats)")
+    ap.add_argument("--repeat", type=int, default=1, help="repeats per case; the median is reported (default: 1)")
+    ap.add_argument("--jobs", type=int, default=1, help="--jobs passed to every script (default: 1)")
+    ap.add_argument("--work", default=None, help="scratch directory for the trees (default: a temp dir, removed)")
+    ap.add_argument("--save", default=None, help="results JSON path (default: bench_<commit>.json)")
+    ap.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    args = ap.parse_args()
+
+    base_params = {
+        "afl_configs": args.afl_configs, "ppo_configs": args.ppo_configs, "runs": args.runs,
+        "duration": args.duration, "ppo_steps": args.ppo_steps, "queue": args.queue,
+    }
+    work = args.work or tempfile.mkdtemp(prefix="bench_")
+    commit = git_rev()
+
+    results = []
+    try:
+        for k in args.scales:
+            params = scaled(base_params, args.grow, k)
+            results += [dict(r, params=params) for r in
+                        run_scale(k, params, os.path.join(work, f"x{k:g}"), args.jobs, args.repeat, args.cases)]
+    finally:
+        if not args.work:
+            shutil.rmtree(work, ignore_errors=True)
+
+    doc = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "host": {"python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "cpus": os.cpu_count()},
+        "args": vars(args),
+        "results": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    save = args.save or f"bench_{commit}.json"
+    with open(save, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"\n[INFO] saved {save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
+from results_store import open_store, add_store_arg
+from coverage_metrics import is_coverage_metric
+from stats_compare import compare_all, sig_marker, stats_to_json
+
 METRICS_DEFAULT = [
     "paths_total",
     "bitmap_cvg",
@@ -14,15 +18,18 @@ METRICS_DEFAULT = [
     "pending_favs",
     "unique_crashes",
     "unique_hangs",
+    "time_to_first_new_path",
 ]
 
 
-def load_summary(dir_path):
-    path = os.path.join(dir_path, "summary.json")
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"summary.json not found in {dir_path}")
-    with open(path) as f:
-        return json.load(f)
+def load_summaries(store, keys):
+    summaries = []
+    for k in keys:
+        s = store.summary(k)
+        if s is None:
+            raise FileNotFoundError(f"summary.json not found for {k}")
+        summaries.append(s)
+    return summaries
 
 
 def collect_metric(summaries, metric):
@@ -94,7 +101,7 @@ def plot_metric_bar(metric, labels, values, outdir, title_prefix=""):
     print(f"[INFO] saved {out_path}")
 
 
-def print_markdown_table(metric, labels, values):
+def print_markdown_table(metric, labels, values, stats=None, m=0):
     baseline = values[0] if values and values[0] is not None else None
 
     header = ["metric"]
@@ -121,12 +128,49 @@ def print_markdown_table(metric, labels, values):
     print("| " + " | ".join(row_vals) + " |")
 
     if len(row_deltas) > 1:
-        delta_row = ["Δ vs " + labels[0] + " (%)"]
+        delta_row = ["Δ vs " + labels[0] + " (%)", ""]
         delta_row.extend(row_deltas[1:])
         print("| " + " | ".join(delta_row) + " |")
+
+    if stats is not None and len(labels) > 1:
+        p_row = [f"p (Mann-Whitney U vs {labels[0]})", ""]
+        a_row = [f"A12 vs {labels[0]}", ""]
+        ci_row = [f"{stats['ci']:g}% CI of Δ vs {labels[0]}", ""]
+        for i in range(1, len(labels)):
+            p = stats["p_mwu"][i, 0, m]
+            a12 = stats["a12"][i, 0, m]
+            lo, hi = stats["diff_ci_lo"][i, 0, m], stats["diff_ci_hi"][i, 0, m]
+            p_row.append("N/A" if np.isnan(p) else f"{p:.3g} {sig_marker(p)}".strip())
+            a_row.append("N/A" if np.isnan(a12) else f"{a12:.2f}")
+            ci_row.append("N/A" if np.isnan(lo) else f"[{lo:+.2f}, {hi:+.2f}]")
+        for row in (p_row, a_row, ci_row):
+            print("| " + " | ".join(row) + " |")
     print()
 
 
+def compare_summaries(summaries, labels, metrics, outdir, title_prefix="",
+                      n_boot=2000, ci=95.0, plots=True):
+    stats = compare_all(summaries, labels, metrics, n_boot=n_boot, ci=ci)
+
+    print(f"# Aggregate comparison ({title_prefix})\n")
+    print("significance: * p<0.05, ** p<0.01, *** p<0.001 (two-sided Mann-Whitney U on per-run values)\n")
+
+    for m, metric in enumerate(metrics):
+        values = collect_metric(summaries, metric)
+        print_markdown_table(metric, labels, values, stats, m)
+        if plots:
+            plot_metric_bar(metric, labels, values, outdir, title_prefix)
+    return stats
+
+
+def save_stats(stats, outdir):
+    os.makedirs(outdir, exist_ok=True)
+    stats_path = os.path.join(outdir, "stats.json")
+    with open(stats_path, "w") as f:
+        json.dump(stats_to_json(stats), f, indent=2)
+    print(f"[INFO] saved {stats_path}")
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument(
@@ -147,6 +191,12 @@ def main():
         default=METRICS_DEFAULT,
         help="metrics to compare (default: common AFL metrics)",
     )
+    ap.add_argument(
+        "--coverage-metrics",
+        action="store_true",
+        help="also compare every coverage-efficiency metric found in summary.json "
+             "(bitmap_cvg_* / paths_total_*: AUC, time-to-threshold, checkpoints)",
+    )
     ap.add_argument(
         "--outdir",
         required=True,
@@ -157,19 +207,34 @@ def main():
         default="",
         help="prefix for plot titles (e.g., readelf / objdump)",
     )
+    ap.add_argument(
+        "--n-boot",
+        type=int,
+        default=2000,
+        help="bootstrap resamples for the CI of the mean difference (default: 2000)",
+    )
+    ap.add_argument(
+        "--ci",
+        type=float,
+        default=95.0,
+        help="confidence level of the bootstrap interval in %% (default: 95)",
+    )
+    add_store_arg(ap)
     args = ap.parse_args()
 
     if len(args.dirs) != len(args.labels):
         raise SystemExit("len(dirs) != len(labels)")
 
-    summaries = [load_summary(d) for d in args.dirs]
+    store, keys = open_store(args.store, args.dirs, with_runs=False)
+    summaries = load_summaries(store, keys)
 
-    print(f"# Aggregate comparison ({args.title_prefix})\n")
+    if args.coverage_metrics:
+        found = sorted({k for s in summaries for k in s if is_coverage_metric(k)})
+        args.metrics = list(args.metrics) + [k for k in found if k not in args.metrics]
 
-    for metric in args.metrics:
-        values = collect_metric(summaries, metric)
-        print_markdown_table(metric, args.labels, values)
-        plot_metric_bar(metric, args.labels, values, args.outdir, args.title_prefix)
+    stats = compare_summaries(summaries, args.labels, args.metrics, args.outdir, args.title_prefix,
+                              n_boot=args.n_boot, ci=args.ci)
+    save_stats(stats, args.outdir)
 
 
 if __name__ == "__main__":
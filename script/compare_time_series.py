@@ -4,92 +4,55 @@ import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
-def parse_plot_data(path):
-    times = []
-    covs = []
-    epss = []
-
-    if not os.path.exists(path):
-        return times, covs, epss
-
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) < 11:
-                continue
-
-            try:
-                t_raw = int(parts[0])
-                map_size_str = parts[6]
-                if map_size_str.endswith("%"):
-                    map_size = float(map_size_str[:-1])
-                else:
-                    map_size = float(map_size_str)
-                execs_per_sec = float(parts[10])
-            except Exception:
-                continue
-
-            times.append(t_raw)
-            covs.append(map_size)
-            epss.append(execs_per_sec)
-
-    if not times:
-        return [], [], []
-
-    t0 = times[0]
-    times = [t - t0 for t in times]
-
-    return times, covs, epss
-
-
-def load_config_series(root_dir, bin_sec=5):
-    root_dir = os.path.abspath(root_dir)
-    subdirs = sorted(
-        d for d in os.listdir(root_dir)
-        if os.path.isdir(os.path.join(root_dir, d))
-    )
+from run_loader import add_jobs_arg
+from results_store import open_store, add_store_arg
+from resample import BAND_CHOICES, resample_runs, band_stats, lttb_indices
 
-    runs = []
-    for sd in subdirs:
-        pp = os.path.join(root_dir, sd, "plot_data")
-        t, c, e = parse_plot_data(pp)
-        if t:
-            runs.append((np.array(t, dtype=float),
-                         np.array(c, dtype=float),
-                         np.array(e, dtype=float)))
+def load_config_series(store, cfg, bin_sec=5, band="iqr"):
+    times = dict(store.series(cfg, "plot_data.unix_time"))
+    covs = dict(store.series(cfg, "plot_data.map_size"))
+    epss = dict(store.series(cfg, "plot_data.execs_per_sec"))
 
+    runs = [(run, t - t[0]) for run, t in times.items()]
     if not runs:
         return None, None, None
 
-    max_t = max(r[0][-1] for r in runs)
+    max_t = max(t[-1] for _, t in runs)
     grid = np.arange(0.0, max_t + bin_sec, bin_sec)
 
-    cov_sum = np.zeros_like(grid)
-    eps_sum = np.zeros_like(grid)
-    cnt = 0
+    # (runs x grid), NaN past the end of shorter runs instead of flat extrapolation
+    cov_mat = resample_runs([(t, covs[run]) for run, t in runs], grid)
+    eps_mat = resample_runs([(t, epss[run]) for run, t in runs], grid)
+
+    return grid, band_stats(cov_mat, band), band_stats(eps_mat, band)
+
+
+def slice_stats(st, mask):
+    return {k: v[mask] for k, v in st.items()}
 
-    for t, c, e in runs:
-        cov_interp = np.interp(grid, t, c)
-        eps_interp = np.interp(grid, t, e)
-        cov_sum += cov_interp
-        eps_sum += eps_interp
-        cnt += 1
 
-    cov_avg = cov_sum / cnt
-    eps_avg = eps_sum / cnt
+def plot_band(t, st, label, center="mean", max_points=2000, linewidth=1.0):
+    y = st[center]
+    idx = lttb_indices(t, y, max_points)
+    line, = plt.plot(t[idx], y[idx], linewidth=linewidth, label=label)
+    if "lo" in st:
+        # reuse the center line's LTTB indices so band and line stay aligned
+        plt.fill_between(t[idx], st["lo"][idx], st["hi"][idx],
+                         color=line.get_color(), alpha=0.2, linewidth=0)
 
-    return grid, cov_avg, eps_avg
 
+def load_all_series(store, cfgs, labels, bin_sec=5, band="iqr"):
+    return {
+        label: load_config_series(store, cfg, bin_sec=bin_sec, band=band)
+        for cfg, label in zip(cfgs, labels)
+    }
 
-def plot_coverage_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
+
+def plot_coverage_all(loaded, outdir, title_prefix, center="mean", max_points=2000):
     os.makedirs(outdir, exist_ok=True)
 
     series = {}
-    for cfg, label in zip(cfgs, labels):
-        t, cov, eps = load_config_series(cfg, bin_sec=bin_sec)
+    for label, (t, cov, eps) in loaded.items():
         if t is not None:
             series[label] = (t, cov)
 
@@ -108,10 +71,8 @@ def plot_coverage_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
 
         for label, (t, cov) in series.items():
             mask = (t >= xmin) & (t <= xmax)
-            t_slice = t[mask]
-            cov_slice = cov[mask]
-
-            plt.plot(t_slice, cov_slice, linewidth=2.3, label=label)
+            plot_band(t[mask], slice_stats(cov, mask), label,
+                      center=center, max_points=max_points, linewidth=2.3)
 
         plt.xlabel("time (sec)")
         plt.ylabel("bitmap coverage (%)")
@@ -134,14 +95,13 @@ def plot_coverage_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
     draw_plot(2000, max_t, "_zoom_2000_end")
 
 
-def plot_execs_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
+def plot_execs_all(loaded, outdir, title_prefix, center="mean", max_points=2000):
     os.makedirs(outdir, exist_ok=True)
 
     series = {}
-    for cfg, label in zip(cfgs, labels):
-        t, cov, eps = load_config_series(cfg, bin_sec=bin_sec)
+    for label, (t, cov, eps) in loaded.items():
         if t is None:
-            print(f"[WARN] no valid runs under {cfg}, skip")
+            print(f"[WARN] no valid runs for {label}, skip")
             continue
         series[label] = (t, eps)
 
@@ -152,7 +112,7 @@ def plot_execs_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
     plt.figure()
 
     for label, (t, eps) in series.items():
-        plt.plot(t, eps, label=label, linewidth=1.0)
+        plot_band(t, eps, label, center=center, max_points=max_points)
 
     max_t = max(v[0][-1] for v in series.values())
     xticks = np.arange(0, max_t + 1, 500)
@@ -160,7 +120,7 @@ def plot_execs_all(cfgs, labels, outdir, title_prefix, bin_sec=5):
 
     plt.xlabel("time (sec)")
     plt.ylabel("execs/sec")
-    plt.title(f"{title_prefix} – Execs/sec over time (avg across runs)")
+    plt.title(f"{title_prefix} – Execs/sec over time ({center} across runs)")
     plt.grid(True, alpha=0.3)
     plt.legend()
     plt.tight_layout()
@@ -203,6 +163,26 @@ def main():
         default=5,
         help="시간축 보간 간격 (초 단위, 기본 5초).",
     )
+    ap.add_argument(
+        "--center",
+        choices=["mean", "median"],
+        default="mean",
+        help="run 간 중심값 (기본 mean).",
+    )
+    ap.add_argument(
+        "--band",
+        choices=BAND_CHOICES,
+        default="iqr",
+        help="run 간 분산 음영: iqr(25-75%%), p10-p90, minmax, bootstrap(평균의 95%% CI), none (기본 iqr).",
+    )
+    ap.add_argument(
+        "--max-points",
+        type=int,
+        default=2000,
+        help="LTTB downsampling 후 커브당 최대 점 개수 (0이면 끔, 기본 2000).",
+    )
+    add_jobs_arg(ap)
+    add_store_arg(ap)
 
     args = ap.parse_args()
 
@@ -211,8 +191,13 @@ def main():
 
     title_prefix = args.title_prefix if args.title_prefix else "Coverage/Execs"
 
-    plot_coverage_all(args.cfg, args.labels, args.out, title_prefix, bin_sec=args.bin_sec)
-    plot_execs_all(args.cfg, args.labels, args.out, title_prefix, bin_sec=args.bin_sec)
+    store, keys = open_store(args.store, args.cfg, jobs=args.jobs)
+
+    loaded = load_all_series(store, keys, args.labels, bin_sec=args.bin_sec, band=args.band)
+
+    opts = dict(center=args.center, max_points=args.max_points)
+    plot_coverage_all(loaded, args.out, title_prefix, **opts)
+    plot_execs_all(loaded, args.out, title_prefix, **opts)
 
 
 if __name__ == "__main__":
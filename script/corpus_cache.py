@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def seed_files(seed_dir):
+    return sorted(
+        n for n in os.listdir(seed_dir)
+        if os.path.isfile(os.path.join(seed_dir, n)) and not n.startswith(".")
+    )
+
+
+def sha256_seeds(seed_dir):
+    h = hashlib.sha256()
+    for name in seed_files(seed_dir):
+        h.update(name.encode() + b"\0")
+        h.update(sha256_file(os.path.join(seed_dir, name)).encode())
+    return h.hexdigest()
+
+
+def cache_key(target, target_args, seed_dir):
+    h = hashlib.sha256()
+    h.update(sha256_file(target).encode())
+    h.update(" ".join(target_args).encode())
+    h.update(sha256_seeds(seed_dir).encode())
+    return h.hexdigest()[:32]
+
+
+def log(msg):
+    # stdout is reserved for the resulting corpus path
+    print(f"[CORPUS] {msg}", file=sys.stderr, flush=True)
+
+
+def run_cmin(afl_dir, seed_dir, out_dir, target, target_args):
+    cmd = [os.path.join(afl_dir, "afl-cmin"), "-m", "none",
+           "-i", seed_dir, "-o", out_dir, "--", target] + target_args
+    env = dict(os.environ, AFL_PATH=afl_dir)
+    subprocess.run(cmd, check=True, env=env,
+                   stdout=sys.stderr, stderr=subprocess.STDOUT)
+
+
+def run_tmin(afl_dir, src, dst, target, target_args):
+    cmd = [os.path.join(afl_dir, "afl-tmin"), "-m", "none",
+           "-i", src, "-o", dst, "--", target] + target_args
+    r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if r.returncode != 0 or not os.path.exists(dst):
+        # keep the unminimized input rather than losing coverage
+        shutil.copyfile(src, dst)
+        return False
+    return True
+
+
+def build_corpus(afl_dir, seed_dir, tmp_dir, target, target_args, jobs):
+    cmin_dir = os.path.join(tmp_dir, "cmin")
+    tmin_dir = os.path.join(tmp_dir, "corpus")
+    os.makedirs(tmin_dir)
+
+    t0 = time.time()
+    run_cmin(afl_dir, seed_dir, cmin_dir, target, target_args)
+    t_cmin = time.time() - t0
+
+    names = seed_files(cmin_dir)
+    log(f"afl-cmin kept {len(names)} input(s), running afl-tmin with {jobs} job(s)")
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=jobs) as ex:
+        ok = list(ex.map(
+            lambda n: run_tmin(afl_dir, os.path.join(cmin_dir, n),
+                               os.path.join(tmin_dir, n), target, target_args),
+            names,
+        ))
+    t_tmin = time.time() - t0
+
+    shutil.rmtree(cmin_dir)
+    return tmin_dir, {
+        "seed_count": len(seed_files(seed_dir)),
+        "seed_bytes": sum(os.path.getsize(os.path.join(seed_dir, n)) for n in seed_files(seed_dir)),
+        "cmin_count": len(names),
+        "tmin_ok": sum(ok),
+        "corpus_bytes": sum(os.path.getsize(os.path.join(tmin_dir, n)) for n in names),
+        "cmin_sec": t_cmin,
+        "tmin_sec": t_tmin,
+    }
+
+
+def make_readonly(path):
+    for root, dirs, files in os.walk(path):
+        for n in files:
+            os.chmod(os.path.join(root, n), 0o444)
+    for root, dirs, files in os.walk(path, topdown=False):
+        os.chmod(root, 0o555)
+
+
+def acquire_lock(lock_path, lock_timeout):
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            os.write(fd, f"{os.getpid()}\n".encode())
+            os.close(fd)
+            return True
+        except FileExistsError:
+            pass
+        try:
+            age = time.time() - os.path.getmtime(lock_path)
+        except FileNotFoundError:
+            continue
+        if age > lock_timeout:
+            log(f"removing stale lock {lock_path} (age={age:.0f}s)")
+            try:
+                os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+            continue
+        return False
+
+
+def get_corpus(cache_dir, afl_dir, seed_dir, target, target_args, jobs, lock_timeout):
+    os.makedirs(cache_dir, exist_ok=True)
+    key = cache_key(target, target_args, seed_dir)
+    entry = os.path.join(cache_dir, key)
+    corpus = os.path.join(entry, "corpus")
+    lock_path = os.path.join(cache_dir, f"{key}.lock")
+
+    while not os.path.isdir(corpus):
+        if not acquire_lock(lock_path, lock_timeout):
+            log(f"another run is preparing {key}, waiting...")
+            time.sleep(5)
+            continue
+
+        try:
+            if os.path.isdir(corpus):
+                break
+            log(f"preparing corpus {key} for {target} {' '.join(target_args)}")
+            tmp_dir = os.path.join(cache_dir, f".{key}.tmp.{os.getpid()}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+
+            _, meta = build_corpus(afl_dir, seed_dir, tmp_dir, target, target_args, jobs)
+            meta.update({
+                "key": key,
+                "target": target,
+                "target_sha256": sha256_file(target),
+                "target_args": target_args,
+                "seed_dir": seed_dir,
+                "seed_sha256": sha256_seeds(seed_dir),
+                "created": time.time(),
+            })
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+
+            make_readonly(tmp_dir)
+            os.rename(tmp_dir, entry)
+            log(f"cached {meta['cmin_count']}/{meta['seed_count']} input(s) "
+                f"({meta['seed_bytes']} -> {meta['corpus_bytes']} bytes) "
+                f"in {meta['cmin_sec'] + meta['tmin_sec']:.1f}s")
+        finally:
+            try:
+                os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+
+    return corpus
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Minimize a seed corpus once per (target binary, args) and cache it by content hash."
+    )
+    ap.add_argument("--cache", required=True, help="cache root directory")
+    ap.add_argument("--afl-dir", required=True, help="AFL build directory (afl-cmin / afl-tmin)")
+    ap.add_argument("--seeds", required=True, help="raw seed directory")
+    ap.add_argument("--target", required=True, help="instrumented target binary")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="parallel afl-tmin processes (default: all cores)",
+    )
+    ap.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=3600.0,
+        help="treat a preparation lock older than this (sec) as stale",
+    )
+    ap.add_argument("target_args", nargs=argparse.REMAINDER, help="target arguments (use @@ for the input)")
+    args = ap.parse_args()
+
+    target_args = args.target_args
+    if target_args and target_args[0] == "--":
+        target_args = target_args[1:]
+
+    corpus = get_corpus(
+        os.path.abspath(args.cache),
+        args.afl_dir,
+        os.path.abspath(args.seeds),
+        os.path.abspath(args.target),
+        target_args,
+        max(1, args.jobs),
+        args.lock_timeout,
+    )
+    print(corpus)
+
+
+if __name__ == "__main__":
+    main()
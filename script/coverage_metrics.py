@@ -0,0 +1,108 @@
+import re
+
+import numpy as np
+
+# plot_data column -> summary.json metric prefix
+COVERAGE_SERIES = {
+    "map_size": "bitmap_cvg",
+    "paths_total": "paths_total",
+}
+
+REL_THRESHOLDS_DEFAULT = [50.0, 90.0, 99.0]
+CHECKPOINTS_DEFAULT = ["10m", "30m", "1h"]
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(s):
+    m = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([smhd]?)\s*", s)
+    if not m:
+        raise ValueError(f"bad duration: {s!r} (expected e.g. 600, 10m, 1h)")
+    return float(m.group(1)) * _UNITS[m.group(2) or "s"]
+
+
+def parse_abs_thresholds(items):
+    # ["bitmap_cvg=2,3.5", "paths_total=500"] -> {"bitmap_cvg": [2.0, 3.5], ...}
+    out = {}
+    for item in items or []:
+        name, _, vals = item.partition("=")
+        if name not in COVERAGE_SERIES.values() or not vals:
+            raise ValueError(f"bad threshold spec: {item!r} (expected e.g. bitmap_cvg=2,3.5)")
+        out[name] = [float(v) for v in vals.split(",")]
+    return out
+
+
+def curve_metrics(t, y, t0, horizon, rel_thresholds, abs_thresholds, checkpoints):
+    # t: unix time (ascending), y: cumulative coverage; all times relative to t0
+    t = np.asarray(t, dtype=np.float64) - t0
+    y = np.asarray(y, dtype=np.float64)
+    if horizon is not None:
+        keep = t <= horizon
+        if not keep.any():
+            return {}
+        t, y = t[keep], y[keep]
+    y = np.maximum.accumulate(y)
+    t_end = horizon if horizon is not None else t[-1]
+    out = {}
+
+    # area under the step curve on [0, t_end]: value held until the next sample,
+    # last value held to the horizon, nothing counted before the first sample
+    edges = np.clip(np.append(t, max(t_end, t[-1])), 0.0, t_end)
+    auc = float((np.diff(edges) * y).sum())
+    y_final = float(y[-1])
+    out["auc_mean"] = auc / t_end if t_end > 0 else None
+    out["auc_norm"] = auc / (t_end * y_final) if t_end > 0 and y_final > 0 else None
+
+    thresholds = [y_final * p / 100.0 for p in rel_thresholds] + list(abs_thresholds)
+    names = [f"time_to_{p:g}pct_final" for p in rel_thresholds] + [f"time_to_{v:g}" for v in abs_thresholds]
+    if thresholds:
+        idx = np.searchsorted(y, np.array(thresholds), side="left")
+        for name, i in zip(names, idx):
+            out[name] = float(max(t[i], 0.0)) if i < len(y) else None
+
+    if checkpoints:
+        cps = np.array([c for _, c in checkpoints])
+        idx = np.searchsorted(t, cps, side="right") - 1
+        for (label, c), i in zip(checkpoints, idx):
+            # unknown before the first sample or after the run ended
+            out[f"at_{label}"] = float(y[i]) if i >= 0 and c <= t[-1] else None
+    return out
+
+
+def coverage_metrics(plot_data, start_time=None, horizon=None,
+                     rel_thresholds=REL_THRESHOLDS_DEFAULT, abs_thresholds=None,
+                     checkpoints=CHECKPOINTS_DEFAULT):
+    if plot_data is None:
+        return None
+    t = plot_data["unix_time"]
+    t0 = start_time if start_time is not None else float(t[0])
+    cps = [(c, parse_duration(c)) for c in checkpoints]
+    abs_thresholds = abs_thresholds or {}
+
+    out = {}
+    for col, prefix in COVERAGE_SERIES.items():
+        m = curve_metrics(t, plot_data[col], t0, horizon, rel_thresholds,
+                          abs_thresholds.get(prefix, []), cps)
+        for k, v in m.items():
+            out[f"{prefix}_{k}"] = v
+    return out
+
+
+def is_coverage_metric(name):
+    return any(
+        name.startswith(prefix + "_") and name[len(prefix) + 1:].startswith(("auc_", "time_to_", "at_"))
+        for prefix in COVERAGE_SERIES.values()
+    )
+
+
+def coverage_metric_names(rel_thresholds=REL_THRESHOLDS_DEFAULT, abs_thresholds=None,
+                          checkpoints=CHECKPOINTS_DEFAULT, horizon=None):
+    # the summary.json keys coverage_metrics() produces for these options
+    abs_thresholds = abs_thresholds or {}
+    names = []
+    for prefix in COVERAGE_SERIES.values():
+        names += [f"{prefix}_auc_mean", f"{prefix}_auc_norm"]
+        names += [f"{prefix}_time_to_{p:g}pct_final" for p in rel_thresholds]
+        names += [f"{prefix}_time_to_{v:g}" for v in abs_thresholds.get(prefix, [])]
+        names += [f"{prefix}_at_{c}" for c in checkpoints]
+    return names
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+import os
+import re
+import json
+import shlex
+import shutil
+import hashlib
+import argparse
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from run_loader import list_runs, parallel_map, add_jobs_arg
+from results_store import config_dirs, file_sig
+from coverage_metrics import CHECKPOINTS_DEFAULT, parse_duration
+
+INDEX_VERSION = 1
+INDEX_NAME = "index.json"
+KINDS = ["crashes", "hangs"]
+
+# "#3  0x0000555555 in bfd_getl32 (p=...) at libbfd.c:612" (gdb / ASan backtraces)
+FRAME_RE = re.compile(r"^\s*#\d+\s+(?:0x[0-9a-fA-F]+\s+in\s+)?([A-Za-z_][\w:.<>~]*)")
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest(), os.path.getsize(path)
+
+
+def input_files(run_dir, kind):
+    d = os.path.join(run_dir, kind)
+    if not os.path.isdir(d):
+        return []
+    # AFL leaves a README.txt next to the saved inputs
+    return sorted(
+        os.path.join(d, n) for n in os.listdir(d)
+        if n.startswith("id:") and os.path.isfile(os.path.join(d, n))
+    )
+
+
+def run_start_time(run_dir):
+    try:
+        with open(os.path.join(run_dir, "fuzzer_stats")) as f:
+            for line in f:
+                k, _, v = line.partition(":")
+                if k.strip() == "start_time":
+                    return float(v)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def load_index(path):
+    try:
+        with open(os.path.join(path, INDEX_NAME)) as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (FileNotFoundError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "files": {}, "objects": {}}
+
+
+def save_index(path, idx):
+    tmp = os.path.join(path, f".{INDEX_NAME}.tmp.{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(idx, f)
+    os.replace(tmp, os.path.join(path, INDEX_NAME))
+
+
+def object_path(index_dir, sha):
+    return os.path.join(index_dir, "objects", sha[:2], sha)
+
+
+def config_labels(cfg_dirs):
+    # the directory name, with parents prepended while names collide
+    # (out/readelf/AFL and out/objdump/AFL -> "readelf/AFL" and "objdump/AFL")
+    parts = [os.path.abspath(c).strip(os.sep).split(os.sep) for c in cfg_dirs]
+    for n in range(1, max(map(len, parts), default=0) + 1):
+        labels = ["/".join(p[-n:]) for p in parts]
+        if len(set(labels)) == len(labels):
+            return labels
+    return ["/".join(p) for p in parts]
+
+
+def update_index(index_dir, cfg_dirs, jobs=1, copy=True):
+    idx = load_index(index_dir)
+    files = idx["files"]
+    seen = set()
+    todo = []
+
+    for cfg_dir, cfg in zip(cfg_dirs, config_labels(cfg_dirs)):
+        cfg_dir = os.path.abspath(cfg_dir).rstrip(os.sep)
+        for run_dir in list_runs(cfg_dir):
+            start = run_start_time(run_dir)
+            for kind in KINDS:
+                for path in input_files(run_dir, kind):
+                    seen.add(path)
+                    sig = file_sig(path)
+                    old = files.get(path)
+                    # AFL writes each saved input once, so its mtime is the discovery time
+                    t = sig[1] / 1e9 - start if start is not None else None
+                    entry = {"cfg_dir": cfg_dir, "config": cfg, "run": os.path.basename(run_dir), "kind": kind, "sig": sig, "t": t}
+                    if old is not None and old["sig"] == sig:
+                        old.update(entry)
+                        continue
+                    files[path] = entry
+                    todo.append(path)
+
+    roots = tuple(os.path.join(os.path.abspath(c), "") for c in cfg_dirs)
+    for path in list(files):
+        if path.startswith(roots) and path not in seen:
+            del files[path]
+
+    hashed = parallel_map(sha256_file, todo, jobs)
+    for path, (sha, size) in zip(todo, hashed):
+        files[path]["sha"] = sha
+        idx["objects"].setdefault(sha, {"size": size, "buckets": {}})
+        if copy and not os.path.exists(object_path(index_dir, sha)):
+            os.makedirs(os.path.dirname(object_path(index_dir, sha)), exist_ok=True)
+            tmp = object_path(index_dir, sha) + f".tmp.{os.getpid()}"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, object_path(index_dir, sha))
+
+    print(f"[CRASH] {len(files)} input(s) indexed, {len(todo)} new or changed, "
+          f"{len(idx['objects'])} distinct")
+    return idx
+
+
+def stack_signature(output, frames):
+    names = []
+    for line in output.splitlines():
+        m = FRAME_RE.match(line)
+        if m:
+            names.append(m.group(1))
+            if len(names) == frames:
+                break
+    return "|".join(names) if names else None
+
+
+def replay(runner, path, entry, frames, timeout):
+    # runner is a command template; {input} {config} {run} {kind} are substituted
+    cmd = runner.format(input=shlex.quote(path), config=shlex.quote(entry["config"]),
+                        run=shlex.quote(entry["run"]), kind=entry["kind"])
+    try:
+        r = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                           timeout=timeout, errors="replace")
+    except subprocess.TimeoutExpired:
+        return "timeout"
+    return stack_signature(r.stdout, frames) or f"nostack:rc={r.returncode}"
+
+
+def bucket_objects(idx, index_dir, runner, frames=3, timeout=10.0, jobs=1):
+    # buckets are cached per object and per runner/frames setting
+    rkey = hashlib.sha256(f"{runner}\0{frames}".encode()).hexdigest()[:16]
+    example = {}
+    for path, e in idx["files"].items():
+        example.setdefault(e["sha"], (path, e))
+    todo = [sha for sha, o in idx["objects"].items()
+            if sha in example and rkey not in o["buckets"]]
+
+    def one(sha):
+        path, e = example[sha]
+        obj = object_path(index_dir, sha)
+        return replay(runner, obj if os.path.exists(obj) else path, e, frames, timeout)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as ex:
+        for sha, sig in zip(todo, ex.map(one, todo)):
+            idx["objects"][sha]["buckets"][rkey] = sig
+    print(f"[CRASH] replayed {len(todo)} input(s) with the runner")
+    return rkey
+
+
+def earliest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def summarize_kind(idx, kind, cfg_dirs, labels, rkey=None, checkpoints=()):
+    # entries are matched on the config's absolute path; labels are for display
+    per_cfg = {c: {"runs": {}, "shas": {}} for c in cfg_dirs}
+    for e in idx["files"].values():
+        if e["kind"] != kind or e.get("cfg_dir") not in per_cfg:
+            continue
+        c = per_cfg[e["cfg_dir"]]
+        c["runs"].setdefault(e["run"], []).append(e["t"])
+        c["shas"][e["sha"]] = earliest(c["shas"].get(e["sha"]), e["t"])
+
+    def key_of(sha):
+        return idx["objects"][sha]["buckets"].get(rkey) if rkey else sha
+
+    owners = {}
+    for cfg, c in per_cfg.items():
+        for sha in c["shas"]:
+            owners.setdefault(key_of(sha), set()).add(cfg)
+
+    out = {"union": len(owners), "configs": {}}
+    for (cfg, c), label in zip(per_cfg.items(), labels):
+        first_seen = {}
+        for sha, t in c["shas"].items():
+            k = key_of(sha)
+            first_seen[k] = earliest(first_seen.get(k), t)
+        keys = set(first_seen)
+        firsts = [min(t for t in ts if t is not None) for ts in c["runs"].values()
+                  if any(t is not None for t in ts)]
+        out["configs"][label] = {
+            "path": cfg,
+            "runs_with_any": len(c["runs"]),
+            "per_run_sum": sum(len(ts) for ts in c["runs"].values()),
+            "unique": len(keys),
+            "exclusive": sum(1 for k in keys if owners[k] == {cfg}),
+            "first_discovery_sec_min": min(firsts) if firsts else None,
+            "first_discovery_sec_median": statistics.median(firsts) if firsts else None,
+            # distinct crashes first found within each checkpoint
+            "found_by": {label: sum(1 for t in first_seen.values() if t is not None and t <= sec)
+                         for label, sec in checkpoints},
+            "first_seen_sec": first_seen,
+        }
+    return out
+
+
+def fmt_sec(v):
+    return "N/A" if v is None else f"{v:.0f}"
+
+
+def print_report(report, configs, checkpoints):
+    for kind, by in report.items():
+        for level, res in by.items():
+            print(f"\n## {kind} ({level}), union across configs = {res['union']}\n")
+            cols = ["config", "runs w/ any", "Σ per run", "unique", "exclusive",
+                    "first (min s)", "first (median s)"] + [f"by {label}" for label, _ in checkpoints]
+            print("| " + " | ".join(cols) + " |")
+            print("| " + " | ".join(["---"] * len(cols)) + " |")
+            for cfg in configs:
+                c = res["configs"][cfg]
+                row = [cfg, c["runs_with_any"], c["per_run_sum"], c["unique"], c["exclusive"],
+                       fmt_sec(c["first_discovery_sec_min"]), fmt_sec(c["first_discovery_sec_median"])]
+                row += [c["found_by"][label] for label, _ in checkpoints]
+                print("| " + " | ".join(str(v) for v in row) + " |")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Deduplicate crashes / hangs across runs and configs with a persistent content-addressed index."
+    )
+    ap.add_argument("--index", required=True, help="index directory (index.json + objects/)")
+    ap.add_argument("--root", help="output root; every subdirectory is a config")
+    ap.add_argument("--cfg", nargs="+", default=[], help="individual config directories")
+    ap.add_argument("--no-copy", action="store_true", help="do not copy inputs into <index>/objects")
+    ap.add_argument(
+        "--runner",
+        default=None,
+        help="replay command template for stack bucketing, e.g. "
+             "'gdb -batch -ex run -ex bt --args /setup/bin/AFL/readelf -a {input}' "
+             "(placeholders: {input} {config} {run} {kind})",
+    )
+    ap.add_argument("--frames", type=int, default=3, help="top stack frames in a bucket signature (default: 3)")
+    ap.add_argument("--replay-timeout", type=float, default=10.0, help="seconds per replay (default: 10)")
+    ap.add_argument(
+        "--checkpoints",
+        nargs="*",
+        default=CHECKPOINTS_DEFAULT,
+        help="also count distinct crashes first found within these times (default: 10m 30m 1h)",
+    )
+    add_jobs_arg(ap)
+    args = ap.parse_args()
+
+    try:
+        checkpoints = [(c, parse_duration(c)) for c in args.checkpoints]
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    cfgs = [os.path.abspath(c).rstrip(os.sep) for c in args.cfg]
+    if args.root:
+        cfgs += config_dirs(args.root)
+    cfgs = list(dict.fromkeys(cfgs))
+    if not cfgs:
+        raise SystemExit("nothing to index (use --root or --cfg)")
+    configs = config_labels(cfgs)
+
+    os.makedirs(args.index, exist_ok=True)
+    idx = update_index(args.index, cfgs, jobs=args.jobs, copy=not args.no_copy)
+
+    rkey = None
+    if args.runner:
+        rkey = bucket_objects(idx, args.index, args.runner, args.frames, args.replay_timeout,
+                              jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1))
+    save_index(args.index, idx)
+
+    report = {}
+    for kind in KINDS:
+        report[kind] = {"input": summarize_kind(idx, kind, cfgs, configs, checkpoints=checkpoints)}
+        if rkey:
+            report[kind]["stack"] = summarize_kind(idx, kind, cfgs, configs, rkey, checkpoints)
+
+    print_report(report, configs, checkpoints)
+    out_path = os.path.join(args.index, "report.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[INFO] saved {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+import os
+import json
+import shlex
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from run_loader import list_runs, parallel_map, add_jobs_arg
+from results_store import config_dirs, file_sig
+from crash_index import sha256_file
+
+MAP_SIZE = 1 << 16  # AFL MAP_SIZE_POW2 = 16
+STUB_EDGES = 4096
+HASHES_NAME = "hashes.json"
+
+# popcount of every byte value, for counting bits in packed maps without unpacking
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int64)
+
+
+def popcount(packed):
+    return int(POPCOUNT[packed].sum())
+
+
+def queue_files(run_dir):
+    d = os.path.join(run_dir, "queue")
+    if not os.path.isdir(d):
+        return []
+    return sorted(
+        os.path.join(d, n) for n in os.listdir(d)
+        if n.startswith("id:") and os.path.isfile(os.path.join(d, n))
+    )
+
+
+def parse_showmap(text):
+    # afl-showmap -o: one "edge_id:hit_count" per line
+    ids = [int(line.split(":", 1)[0]) for line in text.splitlines() if ":" in line]
+    return np.array(ids, dtype=np.int64)
+
+
+def read_trace(out):
+    # the temp file exists before the tracer runs, so a tracer that failed to
+    # start leaves it empty; an instrumented target always hits at least one
+    # edge, so an empty map is a failure, not "no coverage"
+    with open(out) as f:
+        ids = parse_showmap(f.read())
+    return ids if len(ids) else None
+
+
+def showmap_tracer(afl_dir, target, target_args, timeout_ms=1000):
+    showmap = os.path.join(afl_dir, "afl-showmap")
+
+    def trace(path):
+        args = [path if a == "@@" else a for a in target_args]
+        with tempfile.NamedTemporaryFile(prefix="showmap.", delete=False) as tmp:
+            out = tmp.name
+        try:
+            # non-zero exit (crash / timeout) still leaves the map of what ran
+            subprocess.run([showmap, "-q", "-m", "none", "-t", str(timeout_ms), "-o", out, "--", target] + args,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=timeout_ms / 1000.0 + 5)
+            return read_trace(out)
+        except (subprocess.TimeoutExpired, OSError):
+            return None
+        finally:
+            try:
+                os.unlink(out)
+            except FileNotFoundError:
+                pass
+
+    h = hashlib.sha256()
+    for part in (sha256_file(target)[0], " ".join(target_args), str(timeout_ms)):
+        h.update(part.encode() + b"\0")
+    return trace, "showmap-" + h.hexdigest()[:16]
+
+
+def cmd_tracer(template, timeout_ms=1000):
+    # any command that writes afl-showmap style "id:count" lines to {output}
+    def trace(path):
+        with tempfile.NamedTemporaryFile(prefix="trace.", delete=False) as tmp:
+            out = tmp.name
+        try:
+            subprocess.run(template.format(input=shlex.quote(path), output=shlex.quote(out)), shell=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=timeout_ms / 1000.0 + 5)
+            return read_trace(out)
+        except (subprocess.TimeoutExpired, OSError):
+            return None
+        finally:
+            try:
+                os.unlink(out)
+            except FileNotFoundError:
+                pass
+
+    return trace, "cmd-" + hashlib.sha256(template.encode()).hexdigest()[:16]
+
+
+def stub_tracer():
+    # deterministic edges from consecutive byte pairs; lets the pipeline run
+    # without the Docker image or an instrumented target
+    def trace(path):
+        with open(path, "rb") as f:
+            b = np.frombuffer(f.read(), dtype=np.uint8).astype(np.int64)
+        if len(b) < 2:
+            return b % STUB_EDGES
+        return (b[:-1] * 131 + b[1:]) % STUB_EDGES
+
+    return trace, "stub"
+
+
+def pack_edges(ids):
+    bits = np.zeros(MAP_SIZE, dtype=bool)
+    bits[ids[(ids >= 0) & (ids < MAP_SIZE)]] = True
+    return np.packbits(bits)
+
+
+def trace_path(cache_dir, tracer_key, sha):
+    return os.path.join(cache_dir, tracer_key, sha[:2], f"{sha}.npy")
+
+
+def load_traces(cache_dir, tracer_key, trace, inputs, jobs):
+    # inputs: sha -> example path; returns (sha -> packed map (MAP_SIZE / 8 bytes),
+    # shas the tracer failed on). Failures are not cached, so the next run retries them
+    maps = {}
+    todo = []
+    for sha, path in inputs.items():
+        p = trace_path(cache_dir, tracer_key, sha)
+        if os.path.exists(p):
+            maps[sha] = np.load(p)
+        else:
+            todo.append((sha, path))
+
+    def one(item):
+        sha, path = item
+        ids = trace(path)
+        if ids is None:
+            return sha, None
+        packed = pack_edges(ids)
+        p = trace_path(cache_dir, tracer_key, sha)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        tmp = f"{p}.tmp.{os.getpid()}.{sha[:8]}.npy"
+        np.save(tmp, packed)
+        os.replace(tmp, p)
+        return sha, packed
+
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as ex:
+        for i, (sha, packed) in enumerate(ex.map(one, todo), 1):
+            if packed is None:
+                failed.add(sha)
+            else:
+                maps[sha] = packed
+            if i % 1000 == 0:
+                print(f"[EDGE] traced {i}/{len(todo)}")
+    print(f"[EDGE] {len(inputs)} distinct input(s): {len(inputs) - len(todo)} cached, {len(todo)} traced")
+    if failed:
+        print(f"[WARN] tracer failed on {len(failed)} input(s) (timeout / missing binary / empty map); "
+              f"they are left out of the edge sets and retried next time")
+    return maps, failed
+
+
+def load_hashes(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, HASHES_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_hashes(cache_dir, hashes):
+    tmp = os.path.join(cache_dir, f".{HASHES_NAME}.tmp.{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(hashes, f)
+    os.replace(tmp, os.path.join(cache_dir, HASHES_NAME))
+
+
+def collect_inputs(cache_dir, cfg_dirs, jobs):
+    # (config, run, path, sha) for every queue entry; hashes are reused while
+    # the file signature is unchanged, and dropped once the input is gone
+    known = load_hashes(cache_dir)
+    entries = []
+    for cfg_dir in cfg_dirs:
+        cfg = os.path.basename(cfg_dir.rstrip(os.sep))
+        for run_dir in list_runs(cfg_dir):
+            entries += [(cfg, os.path.basename(run_dir), p, file_sig(p)) for p in queue_files(run_dir)]
+
+    todo = [p for _, _, p, sig in entries if known.get(p, {}).get("sig") != sig]
+    for p, (sha, _) in zip(todo, parallel_map(sha256_file, todo, jobs)):
+        known[p] = {"sha": sha}
+    for _, _, p, sig in entries:
+        known[p]["sig"] = sig
+    seen = {p for _, _, p, _ in entries}
+    roots = tuple(os.path.join(os.path.abspath(c), "") for c in cfg_dirs)
+    for p in list(known):
+        if p not in seen and (p.startswith(roots) or not os.path.exists(p)):
+            del known[p]
+    save_hashes(cache_dir, known)
+    print(f"[EDGE] {len(entries)} queue entries, {len(todo)} newly hashed")
+    return [(cfg, run, p, known[p]["sha"]) for cfg, run, p, _ in entries]
+
+
+def edge_sets(entries, maps, configs):
+    # OR-reduce each run's packed maps, then the runs of each config; only one
+    # run's (entries x bytes) matrix is materialized at a time
+    run_shas = {}
+    for cfg, run, _, sha in entries:
+        run_shas.setdefault((cfg, run), set())
+        if sha in maps:
+            run_shas[(cfg, run)].add(sha)
+    per_run = {k: np.bitwise_or.reduce(np.stack([maps[s] for s in sorted(v)]), axis=0) if v
+               else np.zeros(MAP_SIZE // 8, dtype=np.uint8)
+               for k, v in run_shas.items()}
+
+    per_cfg = np.zeros((len(configs), MAP_SIZE // 8), dtype=np.uint8)
+    for i, cfg in enumerate(configs):
+        for (c, _), m in per_run.items():
+            if c == cfg:
+                per_cfg[i] |= m
+    return per_cfg, per_run
+
+
+def summarize(entries, per_cfg, per_run, configs, failed=()):
+    union = np.bitwise_or.reduce(per_cfg, axis=0)
+    inter = np.bitwise_and.reduce(per_cfg, axis=0)
+    out = {
+        "map_size": MAP_SIZE,
+        "union_edges": popcount(union),
+        "intersection_edges": popcount(inter),
+        "failed_inputs": sorted(p for _, _, p, sha in entries if sha in failed),
+        "configs": {},
+        "pairwise_exclusive": {},
+    }
+    for i, cfg in enumerate(configs):
+        others = np.bitwise_or.reduce(np.delete(per_cfg, i, axis=0), axis=0) if len(configs) > 1 \
+            else np.zeros_like(per_cfg[i])
+        runs = {r: popcount(m) for (c, r), m in per_run.items() if c == cfg}
+        out["configs"][cfg] = {
+            "runs": len(runs),
+            "queue_entries": sum(1 for e in entries if e[0] == cfg),
+            "distinct_inputs": len({e[3] for e in entries if e[0] == cfg}),
+            "failed_entries": sum(1 for e in entries if e[0] == cfg and e[3] in failed),
+            "edges": popcount(per_cfg[i]),
+            "exclusive_edges": popcount(per_cfg[i] & ~others),
+            "edges_per_run": runs,
+            "edges_per_run_mean": float(np.mean(list(runs.values()))) if runs else None,
+        }
+        for j, other in enumerate(configs):
+            if i != j:
+                out["pairwise_exclusive"][f"{cfg} - {other}"] = popcount(per_cfg[i] & ~per_cfg[j])
+    return out
+
+
+def print_summary(res, configs):
+    print(f"\n## edge coverage (union over all configs = {res['union_edges']}, "
+          f"in every config = {res['intersection_edges']})\n")
+    print("| config | runs | queue entries | distinct | trace failed | edges (union) | edges / run (mean) | exclusive |")
+    print("| --- | --- | --- | --- | --- | --- | --- | --- |")
+    for cfg in configs:
+        c = res["configs"][cfg]
+        mean = "N/A" if c["edges_per_run_mean"] is None else f"{c['edges_per_run_mean']:.1f}"
+        print(f"| {cfg} | {c['runs']} | {c['queue_entries']} | {c['distinct_inputs']} | {c['failed_entries']} | "
+              f"{c['edges']} | {mean} | {c['exclusive_edges']} |")
+    if res["failed_inputs"]:
+        print(f"\n[WARN] {len(res['failed_inputs'])} queue entries could not be traced and are not counted "
+              f"(listed in edge_report.json 'failed_inputs'), e.g. {res['failed_inputs'][0]}")
+    if len(configs) > 2:
+        print("\npairwise (edges in A not in B):")
+        for k, v in res["pairwise_exclusive"].items():
+            print(f"  {k}: {v}")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Replay every queue/ entry through one instrumented target and compare edge sets across configs."
+    )
+    ap.add_argument("--cache", required=True, help="trace cache directory (packed bitmaps keyed by input hash)")
+    ap.add_argument("--out", required=True, help="output directory for edge_report.json / edge_maps.npz")
+    ap.add_argument("--root", help="output root; every subdirectory is a config")
+    ap.add_argument("--cfg", nargs="+", default=[], help="individual config directories")
+    ap.add_argument("--tracer", choices=["showmap", "cmd", "stub"], default="showmap",
+                    help="afl-showmap (default), a custom command, or a stub tracer needing no target")
+    ap.add_argument("--afl-dir", default="/fuzzer/AFL", help="directory containing afl-showmap")
+    ap.add_argument("--target", help="instrumented target used for every config (e.g. /setup/bin/AFL/readelf)")
+    ap.add_argument("--target-args", default="-a @@", help="target arguments, @@ = input (default: '-a @@')")
+    ap.add_argument("--cmd", help="--tracer cmd template writing 'id:count' lines to {output} for {input}")
+    ap.add_argument("--timeout-ms", type=int, default=1000, help="per-input execution timeout (default: 1000)")
+    add_jobs_arg(ap)
+    args = ap.parse_args()
+
+    cfgs = [os.path.abspath(c) for c in args.cfg]
+    if args.root:
+        cfgs += config_dirs(args.root)
+    if not cfgs:
+        raise SystemExit("nothing to trace (use --root or --cfg)")
+    configs = [os.path.basename(c.rstrip(os.sep)) for c in cfgs]
+    if len(set(configs)) != len(configs):
+        raise SystemExit("config directory names must be unique")
+
+    if args.tracer == "showmap":
+        if not args.target:
+            raise SystemExit("--tracer showmap needs --target")
+        trace, key = showmap_tracer(args.afl_dir, os.path.abspath(args.target),
+                                    shlex.split(args.target_args), args.timeout_ms)
+    elif args.tracer == "cmd":
+        if not args.cmd:
+            raise SystemExit("--tracer cmd needs --cmd")
+        trace, key = cmd_tracer(args.cmd, args.timeout_ms)
+    else:
+        trace, key = stub_tracer()
+
+    os.makedirs(args.cache, exist_ok=True)
+    entries = collect_inputs(args.cache, cfgs, args.jobs)
+    inputs = {}
+    for _, _, path, sha in entries:
+        inputs.setdefault(sha, path)
+    maps, failed = load_traces(args.cache, key, trace, inputs,
+                               jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1))
+
+    per_cfg, per_run = edge_sets(entries, maps, configs)
+    res = summarize(entries, per_cfg, per_run, configs, failed)
+    res["tracer"] = key
+    print_summary(res, configs)
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "edge_report.json"), "w") as f:
+        json.dump(res, f, indent=2)
+    np.savez(os.path.join(args.out, "edge_maps.npz"), configs=np.array(configs), packed=per_cfg)
+    print(f"\n[INFO] saved {os.path.join(args.out, 'edge_report.json')} and edge_maps.npz")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,8 @@ export AFL_SEED=$((1234 + RUN_ID))
 export RL_LR="${RL_LR:-1e-4}"
 export RL_GAMMA="${RL_GAMMA:-0.99}"
 export RL_CLIP="${RL_CLIP:-0.2}"
+TELEMETRY_SEC="${TELEMETRY_SEC:-5}"
+CORPUS_CACHE="${CORPUS_CACHE:-}"
 
 echo "[ENTRY] RL_LR=${RL_LR}, RL_GAMMA=${RL_GAMMA}, RL_CLIP=${RL_CLIP}"
 
@@ -67,6 +69,18 @@ else
   exit 1
 fi
 
+if [ -n "${CORPUS_CACHE}" ]; then
+  echo "[ENTRY] preparing minimized corpus in ${CORPUS_CACHE}..."
+  if CACHED_DIR="$(python3 "${SCRIPT_DIR}/corpus_cache.py" \
+      --cache "${CORPUS_CACHE}" --afl-dir "$(dirname "${AFL_BIN}")" \
+      --seeds "${INPUT_DIR}" --target "${TARGET_BIN}" -- ${TARGET_ARGS} \
+      2>"${OUTDIR}/corpus_cache.log")"; then
+    INPUT_DIR="${CACHED_DIR}"
+  else
+    echo "[ENTRY] corpus preparation failed, using raw seeds (see corpus_cache.log)"
+  fi
+fi
+
 echo "[ENTRY] starting afl-fuzz..."
 echo "[ENTRY] INPUT_DIR=${INPUT_DIR}"
 echo "[ENTRY] TARGET_BIN=${TARGET_BIN} ${TARGET_ARGS}"
@@ -74,13 +88,31 @@ echo "[ENTRY] TARGET_BIN=${TARGET_BIN} ${TARGET_ARGS}"
 timeout "${TIME_SEC}" \
   "${AFL_BIN}" -m none -d -i "${INPUT_DIR}" -o "${OUTDIR}" -- \
   "${TARGET_BIN}" ${TARGET_ARGS} \
-  >"${OUTDIR}/afl_fuzz.log" 2>&1 || true
+  >"${OUTDIR}/afl_fuzz.log" 2>&1 &
+AFL_PID=$!
+
+TELEMETRY_PID=""
+if [ "${TELEMETRY_SEC}" != "0" ]; then
+  echo "[ENTRY] sampling telemetry every ${TELEMETRY_SEC}s"
+  python3 "${SCRIPT_DIR}/telemetry.py" --out "${OUTDIR}/telemetry.csv" \
+    --interval "${TELEMETRY_SEC}" "afl=${AFL_PID}" "ppo=${SERVER_PID}" \
+    >"${OUTDIR}/telemetry.log" 2>&1 &
+  TELEMETRY_PID=$!
+fi
+
+wait "${AFL_PID}" || true
 
 echo "[ENTRY] afl-fuzz finished."
 
 if [ "${FUZZER}" = "AFL-PPO" ] && [ -n "${SERVER_PID}" ]; then
   echo "[ENTRY] stopping PPO server (PID=${SERVER_PID})"
   kill "${SERVER_PID}" 2>/dev/null || true
+  # let it flush ppo_shadow.bin and write ppo_ckpt.pt before the container exits
+  wait "${SERVER_PID}" || true
+fi
+
+if [ -n "${TELEMETRY_PID}" ]; then
+  wait "${TELEMETRY_PID}" || true
 fi
 
 echo "[ENTRY] done."
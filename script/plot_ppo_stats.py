@@ -1,45 +1,16 @@
 #!/usr/bin/env python3
 import os
-import json
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
+from run_loader import add_jobs_arg
+from results_store import ResultsStore, add_store_arg
+from ppo_timeline import config_timelines, stack_timelines
 
-def load_summary(path):
-    with open(path, "r") as f:
-        return json.load(f)
 
-
-def load_rewards_from_root(root_dir):
-    rewards_all_runs = []
-
-    for name in sorted(os.listdir(root_dir)):
-        run_dir = os.path.join(root_dir, name)
-        if not os.path.isdir(run_dir):
-            continue
-
-        csv_path = os.path.join(run_dir, "ppo_log.csv")
-        if not os.path.exists(csv_path):
-            continue
-
-        rewards = []
-        with open(csv_path, "r") as f:
-            header = f.readline()
-            for line in f:
-                cols = line.strip().split(",")
-                if len(cols) < 2:
-                    continue
-                try:
-                    r = float(cols[1])
-                except ValueError:
-                    continue
-                rewards.append(r)
-
-        if rewards:
-            rewards_all_runs.append(rewards)
-
-    return rewards_all_runs
+def load_rewards(store, cfg):
+    return [r for _, r in store.series(cfg, "ppo_log.reward") if len(r) > 0]
 
 
 def moving_average(x, window):
@@ -51,47 +22,66 @@ def moving_average(x, window):
     return np.convolve(x, w, mode="valid")
 
 
-def main():
-    ap = argparse.ArgumentParser(
-        description="Plot PPO stats (action histogram / steps_per_run / reward) from ppo_summary.json + ppo_log.csv"
-    )
-    ap.add_argument(
-        "--dirs",
-        nargs="+",
-        required=True,
-        help="각 항목은 label=dir 형식 (예: ppo_base=AFL-PPO-readelf)",
-    )
-    ap.add_argument(
-        "--outdir",
-        required=True,
-        help="PNG를 저장할 출력 디렉토리",
-    )
-    ap.add_argument(
-        "--reward-window",
-        type=int,
-        default=50,
-        help="reward curve moving-average window size (default: 50 steps)",
-    )
-    args = ap.parse_args()
+def nanmean_rows(mat):
+    with np.errstate(invalid="ignore"):
+        cnt = (~np.isnan(mat)).sum(axis=0)
+        return np.where(cnt > 0, np.nansum(mat, axis=0) / np.maximum(cnt, 1), np.nan)
+
+
+def plot_timelines(labels, timelines, outdir):
+    panels = [
+        ("decision_rate", "decisions / sec"),
+        ("reward", "reward (mean per plot_data row)"),
+        ("map_size", "bitmap coverage (%)"),
+        ("paths_total", "paths_total"),
+    ]
+    fig, axes = plt.subplots(len(panels), 1, figsize=(7, 2.2 * len(panels)), sharex=True)
+    for label, (grid, mats) in zip(labels, timelines):
+        if grid is None:
+            continue
+        for ax, (name, _) in zip(axes, panels):
+            ax.plot(grid / 3600.0, nanmean_rows(mats[name]), label=label)
+    for ax, (_, ylabel) in zip(axes, panels):
+        ax.set_ylabel(ylabel, fontsize=8)
+    axes[0].set_title("PPO decisions vs coverage (wall-clock aligned, avg over runs)")
+    axes[0].legend(fontsize=8)
+    axes[-1].set_xlabel("time (hours)")
+    fig.tight_layout()
+    out_path = os.path.join(outdir, "ppo_timeline.png")
+    fig.savefig(out_path)
+    plt.close(fig)
+    print(f"[INFO] saved {out_path}")
+
+    fig, axes = plt.subplots(2, 2, figsize=(8, 5), sharex=True, sharey=True)
+    for label, (grid, mats) in zip(labels, timelines):
+        if grid is None:
+            continue
+        for i, ax in enumerate(axes.flat):
+            ax.plot(grid / 3600.0, nanmean_rows(mats[f"frac_a{i}"]), label=label)
+    for i, ax in enumerate(axes.flat):
+        ax.set_title(f"A{i}", fontsize=9)
+    axes[0, 0].set_ylabel("fraction of decisions")
+    axes[1, 0].set_xlabel("time (hours)")
+    axes[0, 0].legend(fontsize=8)
+    fig.tight_layout()
+    out_path = os.path.join(outdir, "ppo_action_mix_time.png")
+    fig.savefig(out_path)
+    plt.close(fig)
+    print(f"[INFO] saved {out_path}")
 
-    os.makedirs(args.outdir, exist_ok=True)
 
-    labels = []
+def render_ppo_stats(store, labels, cfgs, outdir, reward_window=50, bin_sec=60):
+    os.makedirs(outdir, exist_ok=True)
     all_steps = []
     all_avg_actions = []
     all_rewards = []
+    timelines = []
 
-    for item in args.dirs:
-        if "=" not in item:
-            raise SystemExit(f"bad --dirs item: {item} (label=dir 형태로 써라)")
-        label, d = item.split("=", 1)
-        labels.append(label)
-
-        sum_path = os.path.join(d, "ppo_summary.json")
-        if not os.path.exists(sum_path):
-            raise SystemExit(f"{sum_path} not found")
-
-        data = load_summary(sum_path)
+    for label, cfg in zip(labels, cfgs):
+        d = store.index["configs"][cfg]["path"]
+        data = store.ppo_summary(cfg)
+        if data is None:
+            raise SystemExit(f"ppo_summary.json not found for {d}")
 
         steps = data.get("steps_per_run", [])
         steps = [s for s in steps if s > 0]
@@ -101,13 +91,21 @@ def main():
         if avg_hist is None:
             hists = data.get("final_action_hists", [])
             if not hists:
-                raise SystemExit(f"{sum_path}: no avg_action_hist or final_action_hists")
+                raise SystemExit(f"{d}: no avg_action_hist or final_action_hists")
             avg_hist = list(np.mean(hists, axis=0))
         all_avg_actions.append(np.array(avg_hist, dtype=float))
 
-        rewards_runs = load_rewards_from_root(d)
+        rewards_runs = load_rewards(store, cfg)
         all_rewards.append(rewards_runs)
 
+        aligned = config_timelines(store, cfg)
+        grid, mats = stack_timelines(aligned, bin_sec)
+        timelines.append((grid, mats))
+        if grid is not None:
+            out_path = os.path.join(outdir, f"ppo_timeline_{label}.npz")
+            np.savez(out_path, t=grid, runs=np.array([r for r, _ in aligned]), **mats)
+            print(f"[INFO] saved {out_path} ({len(aligned)} run(s) with timestamps)")
+
     actions = np.arange(4)
     width = 0.8 / max(len(labels), 1)
 
@@ -120,7 +118,7 @@ def main():
     plt.title("PPO action histogram (avg)")
     plt.legend()
     plt.tight_layout()
-    out_path = os.path.join(args.outdir, "ppo_action_hist_all.png")
+    out_path = os.path.join(outdir, "ppo_action_hist_all.png")
     plt.savefig(out_path)
     plt.close()
     print(f"[INFO] saved {out_path}")
@@ -130,7 +128,7 @@ def main():
     plt.ylabel("steps per run")
     plt.title("PPO steps per run (per variant)")
     plt.tight_layout()
-    out_path = os.path.join(args.outdir, "ppo_steps_boxplot.png")
+    out_path = os.path.join(outdir, "ppo_steps_boxplot.png")
     plt.savefig(out_path)
     plt.close()
     print(f"[INFO] saved {out_path}")
@@ -149,7 +147,7 @@ def main():
             global_min = 0
 
         if global_min > 0:
-            window = args.reward_window
+            window = reward_window
             if global_min <= window:
                 window = max(1, global_min // 4)
 
@@ -158,7 +156,7 @@ def main():
             for label, rewards_runs in zip(labels, all_rewards):
                 if not rewards_runs:
                     continue
-                arr = np.array([r[:global_min] for r in rewards_runs], dtype=float)
+                arr = np.stack([r[:global_min] for r in rewards_runs])
                 mean_reward = arr.mean(axis=0)
                 smoothed = moving_average(mean_reward, window)
                 xs = np.arange(len(smoothed))
@@ -169,7 +167,7 @@ def main():
             plt.title("PPO reward curve (avg over runs)")
             plt.legend()
             plt.tight_layout()
-            out_path = os.path.join(args.outdir, "ppo_reward_curve.png")
+            out_path = os.path.join(outdir, "ppo_reward_curve.png")
             plt.savefig(out_path)
             plt.close()
             print(f"[INFO] saved {out_path}")
@@ -187,13 +185,62 @@ def main():
             plt.ylabel("average reward per run")
             plt.title("PPO reward (per run average)")
             plt.tight_layout()
-            out_path = os.path.join(args.outdir, "ppo_reward_boxplot.png")
+            out_path = os.path.join(outdir, "ppo_reward_boxplot.png")
             plt.savefig(out_path)
             plt.close()
             print(f"[INFO] saved {out_path}")
 
+    if any(grid is not None for grid, _ in timelines):
+        plot_timelines(labels, timelines, outdir)
+    else:
+        print("[INFO] no timestamped ppo_log.csv found, skipping wall-clock aligned plots")
+
     print("[INFO] done.")
 
 
+def main():
+    ap = argparse.ArgumentParser(
+        description="Plot PPO stats (action histogram / steps_per_run / reward) from ppo_summary.json + ppo_log.csv"
+    )
+    ap.add_argument(
+        "--dirs",
+        nargs="+",
+        required=True,
+        help="각 항목은 label=dir 형식 (예: ppo_base=AFL-PPO-readelf)",
+    )
+    ap.add_argument(
+        "--outdir",
+        required=True,
+        help="PNG를 저장할 출력 디렉토리",
+    )
+    ap.add_argument(
+        "--reward-window",
+        type=int,
+        default=50,
+        help="reward curve moving-average window size (default: 50 steps)",
+    )
+    ap.add_argument(
+        "--bin-sec",
+        type=int,
+        default=60,
+        help="time grid (sec) for the wall-clock aligned PPO / coverage series (default: 60)",
+    )
+    add_jobs_arg(ap)
+    add_store_arg(ap)
+    args = ap.parse_args()
+
+    store = ResultsStore(args.store)
+    labels, cfgs = [], []
+    for item in args.dirs:
+        if "=" not in item:
+            raise SystemExit(f"bad --dirs item: {item} (label=dir 형태로 써라)")
+        label, d = item.split("=", 1)
+        labels.append(label)
+        cfgs.append(store.resolve(d, jobs=args.jobs))
+
+    render_ppo_stats(store, labels, cfgs, args.outdir,
+                     reward_window=args.reward_window, bin_sec=args.bin_sec)
+
+
 if __name__ == "__main__":
     main()
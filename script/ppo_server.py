@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 
 import os
+import glob
+import math
+import time
+import signal
 import socket
 import struct
 import csv
+import statistics
+from collections import deque
 
 import torch
 import torch.nn as nn
@@ -16,26 +22,213 @@ N_ACTIONS = 4
 MSG_FMT = "d" + "d" * STATE_DIM
 RESP_FMT = "i"
 
+# protocol v2: a client sends a MSG_FMT-sized hello (PROTO_HELLO + its highest version
+# in state[0]) first and gets RESP_FMT = -version back, followed for v2 by HELLO_V2_FMT
+# (GAMMA); a v1 server answers with an action >= 0 instead. In v2 a request also says
+# how many decisions the last action was held for, and its reward is the discounted
+# sum over the hold, sum(GAMMA**k * r_k); the reply carries the next hold.
+PROTO_VERSION = 2
+PROTO_HELLO = b"AFLRLHEL"
+HELLO_V2_FMT = "d"
+MSG_FMT_V2 = "dd" + "d" * STATE_DIM
+RESP_FMT_V2 = "iif"
+
 LR = float(os.environ.get("RL_LR", "1e-4"))
 GAMMA = float(os.environ.get("RL_GAMMA", "0.99"))
 CLIP = float(os.environ.get("RL_CLIP", "0.2"))
 
+HOLD_MAX = int(os.environ.get("RL_HOLD_MAX", "16"))
+HOLD_MS = float(os.environ.get("RL_HOLD_MS", "2000"))
+HOLD_WINDOW = max(1, int(os.environ.get("RL_HOLD_WINDOW", "64")))
+
+# comma-separated checkpoint files / directories of *.pt evaluated next to the live policy
+SHADOW = os.environ.get("RL_SHADOW", "")
+SHADOW_LOG = "ppo_shadow.bin"
+SHADOW_MAGIC = b"PPOSHD01"
+MAX_SHADOWS = 32
+CKPT_OUT = os.environ.get("RL_CKPT_OUT", "ppo_ckpt.pt")
+
 print(f"[PPO] Hyperparams: LR={LR}, GAMMA={GAMMA}, CLIP={CLIP}", flush=True)
+print(f"[PPO] Hold (protocol v2 only): max={HOLD_MAX}, max_ms={HOLD_MS}, window={HOLD_WINDOW}", flush=True)
 
 LOG_CSV = "ppo_log.csv"
 csv_f = open(LOG_CSV, "w", newline="")
 csv_writer = csv.writer(csv_f)
-csv_writer.writerow(["step", "reward", "a0", "a1", "a2", "a3"])
+csv_writer.writerow(["step", "reward", "a0", "a1", "a2", "a3", "action", "t_mono", "t_epoch", "serve_us",
+                     "held", "hold"])
 csv_f.flush()
 
 
-def log_step(step, reward, actions):
+def log_step(step, reward, actions, action, t_mono, t_epoch, serve_us, held, hold):
 
-    row = [step, reward] + list(actions)
+    # t_mono orders decisions without clock jumps, t_epoch joins them with plot_data;
+    # serve_us is the time from a complete request to the chosen action (update + inference);
+    # reward covers the `held` decisions of the previous action (discounted within the hold in v2),
+    # `hold` is what this reply grants
+    row = [step, reward] + list(actions) + [action, f"{t_mono:.6f}", f"{t_epoch:.6f}", f"{serve_us:.0f}",
+                                            held, hold]
     csv_writer.writerow(row)
     csv_f.flush()
 
 
+def recv_exact(conn, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def choose_hold(probs, recent_rewards):
+    # hold = HOLD_MAX ** (certainty * stability): 1 while the policy is undecided or the
+    # per-decision reward is noisy, up to HOLD_MAX when it is near-deterministic and flat
+    if HOLD_MAX <= 1 or len(recent_rewards) < recent_rewards.maxlen:
+        return 1
+    p = probs.clamp_min(1e-12)
+    entropy = -(p * p.log()).sum().item()
+    certainty = max(0.0, 1.0 - entropy / math.log(N_ACTIONS))
+    mean = statistics.fmean(recent_rewards)
+    sd = statistics.pstdev(recent_rewards, mean)
+    stability = 1.0 / (1.0 + sd / (abs(mean) + 1e-8))
+    return max(1, min(HOLD_MAX, int(round(HOLD_MAX ** (certainty * stability)))))
+
+
+def shadow_paths(spec):
+    paths = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if os.path.isdir(part):
+            paths += sorted(glob.glob(os.path.join(part, "*.pt")))
+        else:
+            paths.append(part)
+    return paths
+
+
+def mlp_layers(state_dict):
+    # [(W, b), ...] of an nn.Sequential of Linear / ReLU, in order
+    idx = sorted(int(k.split(".")[-2]) for k, v in state_dict.items() if k.endswith(".weight") and v.dim() == 2)
+    prefix = next(k for k in state_dict if k.endswith(".weight")).rsplit(".", 2)[0]
+    return [(state_dict[f"{prefix}.{i}.weight"].float(), state_dict[f"{prefix}.{i}.bias"].float()) for i in idx]
+
+
+def load_shadow(path):
+    ck = torch.load(path, map_location="cpu", weights_only=True)
+    policy = mlp_layers(ck.get("policy", ck))
+    value = mlp_layers(ck["value"]) if "value" in ck else None
+    if policy[0][0].shape[1] != STATE_DIM or policy[-1][0].shape[0] != N_ACTIONS:
+        raise ValueError(f"policy is not {STATE_DIM} -> {N_ACTIONS}")
+    if value is not None and (value[0][0].shape[1] != STATE_DIM or value[-1][0].shape[0] != 1):
+        raise ValueError(f"value net is not {STATE_DIM} -> 1")
+    return policy, value
+
+
+class ShadowBank:
+    # all shadow policy / value MLPs with the same hidden sizes are stacked into
+    # [G, in, out] weights and evaluated together with one baddbmm per layer; the
+    # value head is zero-padded to N_ACTIONS outputs so it can share a group
+
+    def __init__(self, paths):
+        self.names = []
+        groups = {}
+        for path in paths[:MAX_SHADOWS]:
+            try:
+                policy, value = load_shadow(path)
+            except (OSError, RuntimeError, ValueError, KeyError, StopIteration) as e:
+                print(f"[PPO] WARNING: skipping shadow {path}: {e}", flush=True)
+                continue
+            k = len(self.names)
+            self.names.append(os.path.splitext(os.path.basename(path))[0])
+            for kind, layers in ((0, policy), (1, value)):
+                if layers is None:
+                    continue
+                w_last, b_last = layers[-1]
+                pad = N_ACTIONS - w_last.shape[0]
+                layers = layers[:-1] + [(torch.cat([w_last, w_last.new_zeros(pad, w_last.shape[1])]),
+                                         torch.cat([b_last, b_last.new_zeros(pad)]))]
+                key = tuple(tuple(w.shape) for w, _ in layers)
+                groups.setdefault(key, []).append((k, kind, layers))
+        if len(paths) > MAX_SHADOWS:
+            print(f"[PPO] WARNING: only the first {MAX_SHADOWS} shadows are used", flush=True)
+
+        self.groups = []
+        for members in groups.values():
+            weights = [(torch.stack([m[2][i][0].t() for m in members]),
+                        torch.stack([m[2][i][1] for m in members]).unsqueeze(1))
+                       for i in range(len(members[0][2]))]
+            rows = [(k, kind) for k, kind, _ in members]
+            self.groups.append((weights, rows))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __call__(self, state):
+        logits = torch.zeros(len(self.names), N_ACTIONS)
+        values = torch.full((len(self.names),), float("nan"))
+        for weights, rows in self.groups:
+            h = state.expand(len(rows), 1, STATE_DIM)
+            for i, (w, b) in enumerate(weights):
+                h = torch.baddbmm(b, h, w)
+                if i < len(weights) - 1:
+                    h = torch.relu(h)
+            for j, (k, kind) in enumerate(rows):
+                if kind == 0:
+                    logits[k] = h[j, 0]
+                else:
+                    values[k] = h[j, 0, 0]
+        return torch.softmax(logits, dim=-1), values
+
+
+class ShadowLog:
+    # header: SHADOW_MAGIC, <II (shadows, actions), then <H length + utf-8 name per shadow
+    # record: <IBI step, live action, agreement bitmask (shadow argmax == live action),
+    #         live probs (e) + live value (f), then probs (e) + value (f) per shadow
+
+    def __init__(self, path, names, flush_every=256):
+        self.f = open(path, "wb")
+        self.f.write(SHADOW_MAGIC + struct.pack("<II", len(names), N_ACTIONS))
+        for name in names:
+            raw = name.encode()
+            self.f.write(struct.pack("<H", len(raw)) + raw)
+        self.rec = struct.Struct("<IBI" + ("e" * N_ACTIONS + "f") * (len(names) + 1))
+        self.buf = bytearray()
+        self.pending = 0
+        self.flush_every = flush_every
+
+    def write(self, step, action, live_probs, live_value, probs, values):
+        agree = 0
+        for k, a in enumerate(probs.argmax(dim=-1).tolist()):
+            if a == action:
+                agree |= 1 << k
+        fields = [step, action, agree] + live_probs + [live_value]
+        for p, v in zip(probs.tolist(), values.tolist()):
+            fields += p + [v]
+        self.buf += self.rec.pack(*fields)
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.f.write(self.buf)
+        self.f.flush()
+        self.buf.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+
+def on_sigterm(signum, frame):
+    # entry.sh stops the server with kill; unwind through the finally block so
+    # the logs are flushed and the checkpoint is written (installed once the
+    # loop runs: before that there is nothing to save, so the default is fine)
+    raise KeyboardInterrupt
+
+
 class PolicyNet(nn.Module):
     def __init__(self):
         super().__init__()
@@ -83,36 +276,73 @@ def main():
     opt_p = optim.Adam(policy.parameters(), lr=LR)
     opt_v = optim.Adam(value.parameters(), lr=LR)
 
+    shadows = None
+    shadow_log = None
+    if SHADOW:
+        shadows = ShadowBank(shadow_paths(SHADOW))
+        if len(shadows):
+            shadow_log = ShadowLog(SHADOW_LOG, shadows.names)
+            print(f"[PPO] Shadow policies ({len(shadows)}, {len(shadows.groups)} batch group(s)): "
+                  f"{', '.join(shadows.names)}", flush=True)
+
+    msg_fmt = MSG_FMT
     msg_size = struct.calcsize(MSG_FMT)
+    proto = 1
 
     last_state = None
     last_action = None
 
     action_hist = [0 for _ in range(N_ACTIONS)]
     step_counter = 0
+    held_total = 0
+    recent_rewards = deque(maxlen=HOLD_WINDOW)
 
     try:
+        signal.signal(signal.SIGTERM, on_sigterm)
         while True:
-            buf = b""
-            while len(buf) < msg_size:
-                chunk = conn.recv(msg_size - len(buf))
-                if not chunk:
-                    print("[PPO] EOF from client", flush=True)
-                    return
-                buf += chunk
-
-            unpacked = struct.unpack(MSG_FMT, buf)
+            buf = recv_exact(conn, msg_size)
+            if buf is None:
+                print("[PPO] EOF from client", flush=True)
+                return
+            t_recv = time.monotonic()
+
+            if step_counter == 0 and proto == 1 and buf[:len(PROTO_HELLO)] == PROTO_HELLO:
+                client_version = int(struct.unpack(MSG_FMT, buf)[1])
+                proto = max(1, min(PROTO_VERSION, client_version))
+                if proto >= 2:
+                    msg_fmt = MSG_FMT_V2
+                    msg_size = struct.calcsize(MSG_FMT_V2)
+                print(f"[PPO] Client speaks protocol v{client_version}, using v{proto}", flush=True)
+                ack = struct.pack(RESP_FMT, -proto)
+                if proto >= 2:
+                    ack += struct.pack(HELLO_V2_FMT, GAMMA)
+                conn.sendall(ack)
+                continue
+
+            unpacked = struct.unpack(msg_fmt, buf)
             reward_prev = unpacked[0]
-            state_vec = unpacked[1:]
+            if proto >= 2:
+                held = max(1, int(unpacked[1]))
+                state_vec = unpacked[2:]
+            else:
+                held = 1
+                state_vec = unpacked[1:]
 
             state = torch.tensor(state_vec, dtype=torch.float32).unsqueeze(0)
 
+            with torch.no_grad():
+                v_next = value(state)
+
             if last_state is not None and last_action is not None:
-                with torch.no_grad():
-                    v_next = value(state)
+                # per-decision reward rate: the discounted sum over the discount weights
+                recent_rewards.append(reward_prev * (1.0 - GAMMA) / (1.0 - GAMMA ** held) if GAMMA < 1.0 and held > 1
+                                      else reward_prev / held)
+                held_total += held
 
+                # a held action is one transition over `held` decisions (semi-MDP target:
+                # the client already discounted the rewards inside the hold)
                 v = value(last_state)
-                td_target = reward_prev + GAMMA * v_next
+                td_target = reward_prev + (GAMMA ** held) * v_next
                 advantage = (td_target - v).detach()
 
                 v_loss = (td_target - v).pow(2).mean()
@@ -142,6 +372,7 @@ def main():
                 probs = torch.softmax(logits, dim=-1)
                 dist = torch.distributions.Categorical(probs)
                 action = dist.sample().item()
+            hold = choose_hold(probs[0], recent_rewards) if proto >= 2 else 1
 
             if 0 <= action < N_ACTIONS:
                 action_hist[action] += 1
@@ -149,29 +380,60 @@ def main():
                 print(f"[PPO] WARNING: invalid action {action}", flush=True)
 
             step_counter += 1
+            t_mono = time.monotonic()
+            t_epoch = time.time()
 
             probs_list = probs[0].tolist()
-            log_step(step_counter, reward_prev, probs_list)
+            log_step(step_counter, reward_prev, probs_list, action, t_mono, t_epoch, (t_mono - t_recv) * 1e6,
+                     held, hold)
 
             if step_counter % 100 == 0:
-                print(f"[PPO] step={step_counter}, actions={action_hist}", flush=True)
+                if proto >= 2:
+                    print(f"[PPO] step={step_counter}, actions={action_hist}, "
+                          f"decisions/step={held_total / max(step_counter - 1, 1):.2f}", flush=True)
+                else:
+                    print(f"[PPO] step={step_counter}, actions={action_hist}", flush=True)
 
             last_state = state
             last_action = action
 
-            resp = struct.pack(RESP_FMT, int(action))
+            if proto >= 2:
+                resp = struct.pack(RESP_FMT_V2, int(action), hold, HOLD_MS if hold > 1 else 0.0)
+            else:
+                resp = struct.pack(RESP_FMT, int(action))
             conn.sendall(resp)
 
+            # shadows are scored after the reply, off afl-fuzz's critical path
+            if shadow_log is not None:
+                with torch.no_grad():
+                    s_probs, s_values = shadows(state)
+                shadow_log.write(step_counter, action, probs_list, v_next.item(), s_probs, s_values)
+
     except KeyboardInterrupt:
         print("\n[PPO] KeyboardInterrupt, shutting down.", flush=True)
 
     finally:
+        # a second kill (entry.sh right after client EOF) must not abort the saves below
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
         print("[PPO] FINAL actions hist:", action_hist, flush=True)
         try:
             csv_f.flush()
             csv_f.close()
         except Exception:
             pass
+        if shadow_log is not None:
+            try:
+                shadow_log.close()
+            except Exception:
+                pass
+        if CKPT_OUT and step_counter > 0:
+            # same layout ShadowBank loads, so a run's final policy can shadow later runs
+            try:
+                torch.save({"policy": policy.state_dict(), "value": value.state_dict(), "step": step_counter,
+                            "hyper": {"lr": LR, "gamma": GAMMA, "clip": CLIP}}, CKPT_OUT)
+                print(f"[PPO] Saved checkpoint {CKPT_OUT} (step={step_counter})", flush=True)
+            except Exception as e:
+                print(f"[PPO] WARNING: checkpoint not saved: {e}", flush=True)
         try:
             conn.close()
         except Exception:
@@ -0,0 +1,104 @@
+import numpy as np
+
+from run_loader import PPO_PROB_COLS
+from resample import resample_runs
+
+TIMELINE_SERIES = ["map_size", "paths_total", "decision_rate", "reward"] + [
+    f"frac_{c}" for c in PPO_PROB_COLS
+]
+
+
+def align_run(plot_data, tl):
+    # join one run's decisions onto its plot_data rows by wall-clock time:
+    # row k owns the decisions in (unix_time[k-1], unix_time[k]]
+    pd_t = plot_data["unix_time"]
+    t, step, reward = tl["t"], tl["step"], tl["reward"]
+    rows = len(pd_t)
+
+    idx = np.searchsorted(pd_t, t, side="left")
+    keep = idx < rows
+    idx, reward = idx[keep], reward[keep]
+    n = np.bincount(idx, minlength=rows).astype(np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_reward = np.bincount(idx, weights=reward, minlength=rows) / n
+
+        # decision rate from the step counter rather than row counts, so it
+        # stays correct when ppo_log.csv only holds every k-th decision
+        last = np.searchsorted(t, pd_t, side="right") - 1
+        step_at = np.where(last >= 0, step[np.maximum(last, 0)], 0).astype(np.float64)
+        rate = np.full(rows, np.nan)
+        rate[1:] = np.diff(step_at) / np.diff(pd_t)
+
+        n_act = len(PPO_PROB_COLS)
+        action = tl.get("action")
+        if action is not None:
+            a = action[keep]
+            ok = (a >= 0) & (a < n_act)
+            mix = np.bincount(idx[ok] * n_act + a[ok], minlength=rows * n_act).reshape(rows, n_act)
+            mix = mix / mix.sum(axis=1, keepdims=True)
+        elif tl.get("probs") is not None:
+            # older logs without the sampled action: expected mix from the policy
+            p = tl["probs"][keep]
+            mix = np.stack([np.bincount(idx, weights=p[:, i], minlength=rows) for i in range(n_act)], axis=1)
+            mix = mix / n[:, None]
+        else:
+            mix = np.full((rows, n_act), np.nan)
+
+    out = {
+        "unix_time": pd_t,
+        "map_size": plot_data["map_size"],
+        "paths_total": plot_data["paths_total"],
+        "decisions": n,
+        "decision_rate": rate,
+        "reward": mean_reward,
+    }
+    for i, c in enumerate(PPO_PROB_COLS):
+        out[f"frac_{c}"] = mix[:, i]
+    return out
+
+
+def run_timeline(series):
+    # series: store arrays of one run ("plot_data.*" / "ppo_log.*")
+    if "ppo_log.t" not in series or "plot_data.unix_time" not in series:
+        return None
+    plot_data = {k.split(".", 1)[1]: v for k, v in series.items() if k.startswith("plot_data.")}
+    tl = {
+        "t": series["ppo_log.t"],
+        "step": series["ppo_log.step"],
+        "reward": series["ppo_log.reward"].astype(np.float64),
+        "action": series.get("ppo_log.action"),
+        "probs": series.get("ppo_log.probs"),
+    }
+    return align_run(plot_data, tl)
+
+
+def config_timelines(store, cfg):
+    out = []
+    for run in store.runs(cfg):
+        aligned = run_timeline(store.run_series(cfg, run))
+        if aligned is not None:
+            out.append((run, aligned))
+    return out
+
+
+def stack_timelines(aligned_runs, bin_sec):
+    # resample every run onto one grid of seconds since its first plot_data row
+    if not aligned_runs:
+        return None, {}
+    rel = [a["unix_time"] - a["unix_time"][0] for _, a in aligned_runs]
+    t_max = max(float(r[-1]) for r in rel)
+    grid = np.arange(0.0, t_max + bin_sec, bin_sec)
+    mats = {}
+    for name in TIMELINE_SERIES:
+        runs = []
+        for r, (_, a) in zip(rel, aligned_runs):
+            ok = ~np.isnan(a[name])
+            runs.append((r[ok], a[name][ok]))
+        # rows stay in run order; a run without this series keeps an all-NaN row
+        mat = np.full((len(runs), len(grid)), np.nan)
+        has = [i for i, (t, _) in enumerate(runs) if len(t)]
+        if has:
+            mat[has] = resample_runs([runs[i] for i in has], grid)
+        mats[name] = mat
+    return grid, mats
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+import os
+import json
+import argparse
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from run_loader import list_runs, parallel_map, parse_plot_data, parse_ppo_timeline, add_jobs_arg, PPO_PROB_COLS
+from results_store import config_dirs
+from analyze_results import parse_fuzzer_stats
+from coverage_metrics import parse_duration
+
+# AFL stage names (describe_op) grouped into the mutation families of fuzz_one()
+FAMILIES = ["bitflip", "arith", "interest", "extras", "havoc", "splice", "other"]
+FAMILY_PREFIX = [("flip", "bitflip"), ("arith", "arith"), ("int", "interest"), ("ext_", "extras"),
+                 ("havoc", "havoc"), ("splice", "splice")]
+
+
+def family_of(op):
+    for prefix, fam in FAMILY_PREFIX:
+        if op.startswith(prefix):
+            return fam
+    return "other"
+
+
+def parse_queue(queue_dir):
+    # "id:000123,src:000045,op:havoc,rep:8,+cov" / "id:000007,src:000001+000003,op:splice,rep:2"
+    # / "id:000000,orig:seed" / "id:000300,sync:fuzzer02,src:000012"
+    names, mtimes = [], []
+    with os.scandir(queue_dir) as it:
+        for e in it:
+            if e.name.startswith("id:") and e.is_file():
+                names.append(e.name)
+                mtimes.append(e.stat().st_mtime)
+
+    n = len(names)
+    ids = np.empty(n, dtype=np.int64)
+    src = np.full(n, -1, dtype=np.int64)
+    cov = np.zeros(n, dtype=bool)
+    op_code = np.empty(n, dtype=np.int16)
+    ops = {}
+    for i, name in enumerate(names):
+        fields = name.split(",")
+        ids[i] = int(fields[0][3:])
+        op = None
+        for f in fields[1:]:
+            k, _, v = f.partition(":")
+            if k == "src":
+                # splice: first parent is the one being mutated
+                src[i] = int(v.split("+", 1)[0])
+            elif k == "op":
+                op = v
+            elif k == "orig":
+                op = "orig"
+            elif k == "sync":
+                op = "sync"
+            elif k == "+cov":
+                cov[i] = True
+        op_code[i] = ops.setdefault(op or "unknown", len(ops))
+    return ids, src, cov, op_code, list(ops), np.array(mtimes, dtype=np.float64)
+
+
+def lineage_depth(parent):
+    # parent: row index of each entry's parent (-1 for roots); pointer jumping
+    # costs one vectorized pass per generation instead of a walk per entry
+    depth = np.zeros(len(parent), dtype=np.int64)
+    p = parent.copy()
+    while True:
+        live = p >= 0
+        if not live.any():
+            return depth
+        depth[live] += 1
+        p[live] = parent[p[live]]
+
+
+def discovery_times(ids, mtime, plot):
+    # afl-fuzz's trim_case() rewrites a queue file the first time it is fuzzed,
+    # so mtime is often the trim time. plot_data gives a second upper bound:
+    # entry id:N exists once paths_total > N. The earlier of the two is used.
+    if plot is None:
+        return mtime, 0
+    order = np.argsort(plot["unix_time"], kind="stable")
+    t = plot["unix_time"][order]
+    total = np.maximum.accumulate(plot["paths_total"][order])
+    row = np.searchsorted(total, ids, side="right")
+    t_plot = np.where(row < len(t), t[np.minimum(row, len(t) - 1)], np.inf)
+    found = np.minimum(mtime, t_plot)
+    return found, int((t_plot < mtime).sum())
+
+
+def run_lineage(run_dir):
+    qdir = os.path.join(run_dir, "queue")
+    if not os.path.isdir(qdir):
+        return None
+    ids, src, cov, op_code, ops, mtime = parse_queue(qdir)
+    if len(ids) == 0:
+        return None
+
+    order = np.argsort(ids)
+    ids, src, cov, op_code, mtime = ids[order], src[order], cov[order], op_code[order], mtime[order]
+    # parent ids -> row indices (ids are sorted; a missing parent becomes a root)
+    pos = np.searchsorted(ids, src)
+    pos_c = np.minimum(pos, len(ids) - 1)
+    parent = np.where((src >= 0) & (ids[pos_c] == src), pos_c, -1)
+
+    mtime, from_plot = discovery_times(ids, mtime, parse_plot_data(os.path.join(run_dir, "plot_data")))
+
+    stats = parse_fuzzer_stats(os.path.join(run_dir, "fuzzer_stats")) or {}
+    try:
+        start = float(stats["start_time"])
+    except (KeyError, ValueError):
+        start = float(mtime.min())
+    try:
+        end = float(stats["last_update"])
+    except (KeyError, ValueError):
+        end = float(mtime.max())
+
+    out = {
+        "run": os.path.basename(run_dir),
+        "t": mtime - start,
+        "duration": max(end - start, float((mtime - start).max())),
+        "parent": parent,
+        "depth": lineage_depth(parent),
+        "cov": cov,
+        "op": np.array(ops)[op_code],
+        "t_from_plot": from_plot,
+        "action_t": None,
+        "action": None,
+    }
+    tl = parse_ppo_timeline(os.path.join(run_dir, "ppo_log.csv"))
+    if tl is not None and tl["t"] is not None and tl["action"] is not None:
+        out["action_t"] = tl["t"] - start
+        out["action"] = tl["action"]
+    return out
+
+
+def is_new_path(r):
+    # seeds (orig) and imported entries (sync) were not found by this run's mutations
+    return ~np.isin(r["op"], ["orig", "sync"])
+
+
+def op_counts(runs):
+    counts, cov = {}, {}
+    for r in runs:
+        new = is_new_path(r)
+        ops, inv = np.unique(r["op"][new], return_inverse=True)
+        n = np.bincount(inv, minlength=len(ops))
+        c = np.bincount(inv, weights=r["cov"][new], minlength=len(ops))
+        for op, k, kc in zip(ops, n, c):
+            counts[op] = counts.get(op, 0) + int(k)
+            cov[op] = cov.get(op, 0) + int(kc)
+    return counts, cov
+
+
+def depth_stats(runs):
+    all_depth = np.concatenate([r["depth"] for r in runs])
+    hist = np.bincount(all_depth)
+    per_run_mean = [float(r["depth"].mean()) for r in runs]
+    per_run_max = [int(r["depth"].max()) for r in runs]
+    return {
+        "hist": hist.tolist(),
+        "mean": float(all_depth.mean()),
+        "median": float(np.median(all_depth)),
+        "max_per_run_mean": float(np.mean(per_run_max)),
+        "mean_per_run": per_run_mean,
+    }
+
+
+def seed_age_stats(runs, age_bin):
+    # children found while their parent was k*age_bin .. (k+1)*age_bin old,
+    # divided by the seed-time spent at that age (seeds found late are only
+    # exposed to the younger bins)
+    n_bins = int(np.ceil(max(r["duration"] for r in runs) / age_bin)) or 1
+    children = np.zeros(n_bins)
+    exposure = np.zeros(n_bins)
+    for r in runs:
+        new = is_new_path(r) & (r["parent"] >= 0)
+        age = r["t"][new] - r["t"][r["parent"][new]]
+        k = np.clip((np.maximum(age, 0) // age_bin).astype(np.int64), 0, n_bins - 1)
+        children += np.bincount(k, minlength=n_bins)
+        alive = np.maximum(r["duration"] - r["t"], 0) / age_bin
+        full = np.minimum(alive.astype(np.int64), n_bins)
+        # every seed covers its first `full` bins completely, then a fraction of the next
+        exposure += np.cumsum(np.bincount(full, minlength=n_bins + 1)[::-1])[::-1][1:]
+        part = full < n_bins
+        exposure += np.bincount(full[part], weights=alive[part] - full[part], minlength=n_bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = children / exposure
+    return {
+        "bin_sec": age_bin,
+        "children": children.astype(np.int64).tolist(),
+        "seed_bins": exposure.tolist(),
+        "paths_per_seed_bin": [None if np.isnan(v) else float(v) for v in rate],
+    }
+
+
+def window_matrix(runs, window):
+    # rows = (run, window) with at least one new path and one decision;
+    # columns = family share of new paths, action share of decisions
+    fams, acts = [], []
+    fam_idx = {f: i for i, f in enumerate(FAMILIES)}
+    n_act = len(PPO_PROB_COLS)
+    for r in runs:
+        if r["action"] is None:
+            continue
+        new = is_new_path(r)
+        n_win = int(np.ceil(r["duration"] / window)) or 1
+        w = np.clip((r["t"][new] // window).astype(np.int64), 0, n_win - 1)
+        ops, inv = np.unique(r["op"][new], return_inverse=True)
+        f = np.array([fam_idx[family_of(op)] for op in ops], dtype=np.int64)[inv]
+        fc = np.bincount(w * len(FAMILIES) + f, minlength=n_win * len(FAMILIES)).reshape(n_win, -1)
+
+        a, at = r["action"], r["action_t"]
+        ok = (a >= 0) & (a < n_act) & (at >= 0)
+        wa = np.clip((at[ok] // window).astype(np.int64), 0, n_win - 1)
+        ac = np.bincount(wa * n_act + a[ok], minlength=n_win * n_act).reshape(n_win, -1)
+
+        keep = (fc.sum(axis=1) > 0) & (ac.sum(axis=1) > 0)
+        fams.append(fc[keep] / fc[keep].sum(axis=1, keepdims=True))
+        acts.append(ac[keep] / ac[keep].sum(axis=1, keepdims=True))
+    if not fams:
+        return None, None
+    return np.concatenate(fams), np.concatenate(acts)
+
+
+def action_family_corr(runs, window):
+    fam, act = window_matrix(runs, window)
+    if fam is None or len(fam) < 3:
+        return None
+    corr = {}
+    for i, a in enumerate(PPO_PROB_COLS):
+        corr[a] = {}
+        for j, f in enumerate(FAMILIES):
+            x, y = act[:, i], fam[:, j]
+            if x.std() == 0 or y.std() == 0:
+                corr[a][f] = None
+            else:
+                corr[a][f] = float(np.corrcoef(x, y)[0, 1])
+    return {"window_sec": window, "windows": int(len(fam)), "pearson": corr}
+
+
+def config_lineage(runs, age_bin, window):
+    counts, cov = op_counts(runs)
+    fam = {f: 0 for f in FAMILIES}
+    for op, n in counts.items():
+        fam[family_of(op)] += n
+    total = sum(counts.values())
+    return {
+        "runs": len(runs),
+        "queue_entries": int(sum(len(r["t"]) for r in runs)),
+        # entries whose mtime was later than plot_data's paths_total step (trimmed
+        # after discovery); the rest keep mtime, which can still lag by up to one
+        # plot_data interval when both bounds are late
+        "discovery_from_plot_data": int(sum(r["t_from_plot"] for r in runs)),
+        "new_paths": total,
+        "new_paths_per_run": total / len(runs),
+        "ops": {op: {"paths": n, "share": n / total if total else None, "cov": cov[op]}
+                for op, n in sorted(counts.items(), key=lambda kv: -kv[1])},
+        "families": {f: {"paths": n, "share": n / total if total else None} for f, n in fam.items()},
+        "depth": depth_stats(runs),
+        "seed_age": seed_age_stats(runs, age_bin),
+        "action_corr": action_family_corr(runs, window),
+    }
+
+
+def fmt(v, spec=".2f"):
+    return "N/A" if v is None else format(v, spec)
+
+
+def print_report(res, labels):
+    print("\n## new paths per mutation family (share of paths found by mutation)\n")
+    print("| config | runs | new paths / run | " + " | ".join(FAMILIES) + " | depth mean | depth max (run avg) |")
+    print("| --- " * (len(FAMILIES) + 5) + "|")
+    for label in labels:
+        c = res[label]
+        row = [label, str(c["runs"]), f"{c['new_paths_per_run']:.0f}"]
+        row += [fmt(c["families"][f]["share"]) for f in FAMILIES]
+        row += [f"{c['depth']['mean']:.1f}", f"{c['depth']['max_per_run_mean']:.1f}"]
+        print("| " + " | ".join(row) + " |")
+
+    for label in labels:
+        sa = res[label]["seed_age"]
+        print(f"\n## {label}: new paths per seed by seed age (bin = {sa['bin_sec']:g}s)\n")
+        print("| seed age bin | children | seed-bins of exposure | paths / seed / bin |")
+        print("| --- | --- | --- | --- |")
+        for k, (ch, ex, rate) in enumerate(zip(sa["children"], sa["seed_bins"], sa["paths_per_seed_bin"])):
+            print(f"| {k} | {ch} | {ex:.1f} | {fmt(rate, '.3f')} |")
+
+        corr = res[label]["action_corr"]
+        if corr is None:
+            continue
+        print(f"\n## {label}: Pearson r, action share vs mutation-family share "
+              f"({corr['windows']} windows of {corr['window_sec']:g}s)\n")
+        print("| action | " + " | ".join(FAMILIES) + " |")
+        print("| --- " * (len(FAMILIES) + 1) + "|")
+        for a, row in corr["pearson"].items():
+            print(f"| {a} | " + " | ".join(fmt(row[f]) for f in FAMILIES) + " |")
+
+
+def plot_families(res, labels, outdir):
+    x = np.arange(len(FAMILIES))
+    width = 0.8 / max(1, len(labels))
+    plt.figure(figsize=(10, 5))
+    for i, label in enumerate(labels):
+        share = [res[label]["families"][f]["share"] or 0.0 for f in FAMILIES]
+        plt.bar(x + i * width - 0.4 + width / 2, share, width, label=label)
+    plt.xticks(x, FAMILIES)
+    plt.ylabel("share of new paths")
+    plt.title("New paths per mutation family")
+    plt.legend()
+    plt.grid(axis="y", alpha=0.3)
+    plt.tight_layout()
+    out_path = os.path.join(outdir, "lineage_families.png")
+    plt.savefig(out_path)
+    plt.close()
+    print(f"[INFO] saved {out_path}")
+
+
+def plot_depth(res, labels, outdir):
+    plt.figure(figsize=(10, 5))
+    for label in labels:
+        hist = np.array(res[label]["depth"]["hist"], dtype=np.float64)
+        plt.plot(np.arange(len(hist)), hist / hist.sum(), marker=".", label=label)
+    plt.xlabel("lineage depth (generations from a seed)")
+    plt.ylabel("fraction of queue entries")
+    plt.title("Queue lineage depth")
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    out_path = os.path.join(outdir, "lineage_depth.png")
+    plt.savefig(out_path)
+    plt.close()
+    print(f"[INFO] saved {out_path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Queue lineage per config: new paths per mutation operator, lineage depth, "
+                    "productivity by seed age, and correlation with the PPO action mix."
+    )
+    ap.add_argument("--root", help="output root; every subdirectory is a config")
+    ap.add_argument("--cfg", nargs="+", default=[], help="individual config directories")
+    ap.add_argument("--out", required=True, help="output directory (lineage.json + PNGs)")
+    ap.add_argument("--window", default="10m", help="time window for the action / operator correlation (default: 10m)")
+    ap.add_argument("--age-bin", default="1h", help="seed age bin (default: 1h)")
+    add_jobs_arg(ap)
+    args = ap.parse_args()
+
+    try:
+        window = parse_duration(args.window)
+        age_bin = parse_duration(args.age_bin)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    cfgs = [os.path.abspath(c) for c in args.cfg]
+    if args.root:
+        cfgs += config_dirs(args.root)
+    if not cfgs:
+        raise SystemExit("nothing to analyze (use --root or --cfg)")
+    labels = [os.path.basename(c.rstrip(os.sep)) for c in cfgs]
+
+    res = {}
+    for label, cfg in zip(labels, cfgs):
+        runs = [r for r in parallel_map(run_lineage, list_runs(cfg), args.jobs) if r is not None]
+        if not runs:
+            print(f"[WARN] {label}: no queue/ entries found")
+            continue
+        res[label] = config_lineage(runs, age_bin, window)
+        print(f"[LINEAGE] {label}: {len(runs)} run(s), {res[label]['queue_entries']} queue entries "
+              f"({res[label]['discovery_from_plot_data']} dated from plot_data: mtime was a later trim)")
+    labels = [l for l in labels if l in res]
+    if not labels:
+        raise SystemExit("no queue/ data")
+
+    print_report(res, labels)
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, "lineage.json")
+    with open(out_path, "w") as f:
+        json.dump(res, f, indent=2)
+    print(f"\n[INFO] saved {out_path}")
+    plot_families(res, labels, args.out)
+    plot_depth(res, labels, args.out)
+
+
+if __name__ == "__main__":
+    main()
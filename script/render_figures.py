@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from results_store import ResultsStore
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_NAME = ".render_state.json"
+COMMON_CODE = ["render_figures.py", "results_store.py", "run_loader.py"]
+
+# kind -> parameter defaults, config-level input files, whether per-run series
+# are read, source files drawn from, files always written, and a rough cost
+# (heavy figures are started first)
+KINDS = {
+    "metric_bar": {
+        "defaults": {"metric": None, "title_prefix": ""},
+        "inputs": ["summary.json"],
+        "runs": False,
+        "code": ["compare_multi_from_summary.py"],
+        "outputs": lambda s: [f"{s['metric']}.png"],
+        "cost": 1,
+    },
+    "coverage": {
+        "defaults": {"title_prefix": "Coverage/Execs", "bin_sec": 5, "band": "iqr",
+                     "center": "mean", "max_points": 2000},
+        "inputs": [],
+        "runs": True,
+        "code": ["compare_time_series.py", "resample.py"],
+        "outputs": lambda s: ["coverage_full.png", "coverage_zoom_0_800.png", "coverage_zoom_2000_end.png"],
+        "cost": 5,
+    },
+    "execs": {
+        "defaults": {"title_prefix": "Coverage/Execs", "bin_sec": 5, "band": "iqr",
+                     "center": "mean", "max_points": 2000},
+        "inputs": [],
+        "runs": True,
+        "code": ["compare_time_series.py", "resample.py"],
+        "outputs": lambda s: ["execs_per_sec_over_time.png"],
+        "cost": 3,
+    },
+    "ppo_stats": {
+        "defaults": {"reward_window": 50, "bin_sec": 60},
+        "inputs": ["ppo_summary.json"],
+        "runs": True,
+        "code": ["plot_ppo_stats.py", "ppo_timeline.py", "resample.py"],
+        "outputs": lambda s: ["ppo_action_hist_all.png", "ppo_steps_boxplot.png"],
+        "cost": 8,
+    },
+}
+
+
+def normalize_spec(spec, outdir):
+    kind = spec.get("kind")
+    if kind not in KINDS:
+        raise SystemExit(f"unknown figure kind {kind!r} (choices: {', '.join(KINDS)})")
+    out = dict(KINDS[kind]["defaults"])
+    out.update(spec)
+    if len(out.get("dirs", [])) != len(out.get("labels", [])) or not out.get("dirs"):
+        raise SystemExit(f"{kind}: dirs and labels must be non-empty and of equal length")
+    if kind == "metric_bar" and not out["metric"]:
+        raise SystemExit("metric_bar: metric is required")
+    out["dirs"] = [os.path.abspath(d) for d in out["dirs"]]
+    out["outdir"] = os.path.abspath(os.path.join(outdir, out.get("outdir", ".")))
+    return out
+
+
+def load_specs(path):
+    with open(path) as f:
+        doc = json.load(f)
+    if isinstance(doc, list):
+        doc = {"figures": doc}
+    return doc
+
+
+def spec_id(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def code_sig(names):
+    h = hashlib.sha256()
+    for name in sorted(set(names + COMMON_CODE)):
+        with open(os.path.join(SCRIPT_DIR, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()
+
+
+def fingerprint(spec, keys, store, code):
+    # inputs are the store's own source signatures (summary / ppo_summary /
+    # per-run plot_data + ppo_log size and mtime), refreshed by ingest
+    entries = []
+    for key in keys:
+        e = store.index["configs"][key]
+        inp = {n: e.get(f"{n}.sig") for n in KINDS[spec["kind"]]["inputs"]}
+        if KINDS[spec["kind"]]["runs"]:
+            inp["runs"] = {r: v["sig"] for r, v in sorted(e["runs"].items())}
+        entries.append(inp)
+    blob = json.dumps({"spec": spec, "inputs": entries, "code": code}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def describe(spec, root):
+    name = f"{spec['kind']}:{os.path.relpath(spec['outdir'], root)}"
+    return f"{name}/{spec['metric']}" if spec["kind"] == "metric_bar" else name
+
+
+def outputs_exist(spec):
+    return all(os.path.exists(os.path.join(spec["outdir"], n)) for n in KINDS[spec["kind"]]["outputs"](spec))
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def draw(store, spec, keys):
+    kind = spec["kind"]
+    if kind == "metric_bar":
+        from compare_multi_from_summary import load_summaries, collect_metric, plot_metric_bar
+        values = collect_metric(load_summaries(store, keys), spec["metric"])
+        plot_metric_bar(spec["metric"], spec["labels"], values, spec["outdir"], spec["title_prefix"])
+    elif kind in ("coverage", "execs"):
+        from compare_time_series import load_all_series, plot_coverage_all, plot_execs_all
+        loaded = load_all_series(store, keys, spec["labels"], bin_sec=spec["bin_sec"], band=spec["band"])
+        plot = plot_coverage_all if kind == "coverage" else plot_execs_all
+        plot(loaded, spec["outdir"], spec["title_prefix"], center=spec["center"], max_points=spec["max_points"])
+    elif kind == "ppo_stats":
+        from plot_ppo_stats import render_ppo_stats
+        render_ppo_stats(store, spec["labels"], keys, spec["outdir"],
+                         reward_window=spec["reward_window"], bin_sec=spec["bin_sec"])
+
+
+def render_one(task):
+    sid, spec, keys, store_path = task
+    t0 = time.time()
+    try:
+        # workers only read the store; ingest already happened in the parent
+        draw(ResultsStore(store_path), spec, keys)
+        return sid, None, time.time() - t0
+    except (Exception, SystemExit) as e:
+        return sid, f"{type(e).__name__}: {e}", time.time() - t0
+
+
+def read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_state(path, state):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def plan_figures(specs, store_path, ingest_jobs=1):
+    # ingest every config once, with runs only where a figure needs them
+    store = ResultsStore(store_path)
+    need_runs = {}
+    for spec in specs:
+        for d in spec["dirs"]:
+            need_runs[d] = need_runs.get(d, False) or KINDS[spec["kind"]]["runs"]
+    keys_of = {d: store.ingest(d, jobs=ingest_jobs, with_runs=r) for d, r in need_runs.items()}
+
+    code = {k: code_sig(v["code"]) for k, v in KINDS.items()}
+    tasks = []
+    for spec in specs:
+        keys = [keys_of[d] for d in spec["dirs"]]
+        tasks.append((spec_id(spec), spec, keys, fingerprint(spec, keys, store, code[spec["kind"]])))
+    return tasks
+
+
+def render_all(tasks, store_path, outdir, jobs, force=False):
+    state_path = os.path.join(outdir, STATE_NAME)
+    state = read_state(state_path)
+    stale = [t for t in tasks if force or state.get(t[0]) != t[3] or not outputs_exist(t[1])]
+    print(f"[RENDER] {len(stale)} of {len(tasks)} figure spec(s) stale")
+    if not stale:
+        return 0
+
+    # heavy figures first so the pool is not left waiting on one straggler
+    stale.sort(key=lambda t: -KINDS[t[1]["kind"]]["cost"])
+    work = [(sid, spec, keys, store_path) for sid, spec, keys, _ in stale]
+    fps = {sid: fp for sid, _, _, fp in stale}
+    names = {sid: describe(spec, outdir) for sid, spec, _, _ in stale}
+
+    failed = 0
+    jobs = min(jobs, len(work))
+    if jobs <= 1:
+        _init_worker()
+        results = map(render_one, work)
+    else:
+        ex = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker)
+        results = (f.result() for f in as_completed([ex.submit(render_one, w) for w in work]))
+
+    for sid, err, sec in results:
+        if err:
+            failed += 1
+            print(f"[WARN] {names[sid]} failed after {sec:.1f}s: {err}")
+            state.pop(sid, None)
+        else:
+            print(f"[RENDER] {names[sid]} done in {sec:.1f}s")
+            state[sid] = fps[sid]
+        write_state(state_path, state)
+
+    if jobs > 1:
+        ex.shutdown()
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Render a declarative list of figure specs in parallel, skipping figures whose inputs are unchanged."
+    )
+    ap.add_argument("--spec", required=True, help="JSON figure spec file (see README 5.5)")
+    ap.add_argument("--outdir", default=None, help="output root (overrides \"outdir\" in the spec file)")
+    ap.add_argument("--store", default=None,
+                    help="results store directory (default: \"store\" in the spec file, else <outdir>/.store)")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="parallel render processes (0 = all cores, default: 0)",
+    )
+    ap.add_argument("--force", action="store_true", help="re-render every figure")
+    ap.add_argument("--dry-run", action="store_true", help="only list stale figures")
+    args = ap.parse_args()
+
+    doc = load_specs(args.spec)
+    outdir = os.path.abspath(args.outdir or doc.get("outdir") or ".")
+    store_path = args.store or doc.get("store") or os.path.join(outdir, ".store")
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    os.makedirs(outdir, exist_ok=True)
+
+    specs = [normalize_spec(s, outdir) for s in doc.get("figures", [])]
+    tasks = plan_figures(specs, store_path, ingest_jobs=jobs)
+
+    if args.dry_run:
+        state = read_state(os.path.join(outdir, STATE_NAME))
+        for sid, spec, _, fp in tasks:
+            fresh = state.get(sid) == fp and outputs_exist(spec)
+            print(f"{'fresh' if fresh else 'STALE'}  {describe(spec, outdir)}")
+        return
+
+    failed = render_all(tasks, os.path.abspath(store_path), outdir, jobs, force=args.force)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import render_figures as rf
+from results_store import ResultsStore, RUN_SOURCES, file_sig
+from run_loader import list_runs
+from analyze_results import file_signature
+from compare_multi_from_summary import METRICS_DEFAULT
+from coverage_metrics import (
+    REL_THRESHOLDS_DEFAULT,
+    CHECKPOINTS_DEFAULT,
+    coverage_metric_names,
+    parse_abs_thresholds,
+    parse_duration,
+)
+
+STATE_NAME = ".report_state.json"
+ANALYZE_CODE = ["analyze_results.py", "coverage_metrics.py", "run_loader.py"]
+TABLE_CODE = ["compare_multi_from_summary.py", "stats_compare.py", "results_store.py"]
+
+
+def sha(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+
+def node(nid, deps=(), run=None, local=False, fp=None, outputs=None, log=None, dry=None):
+    # run: (fn, args) executed in the pool, or in this process when local=True;
+    # fp: () -> fingerprint, evaluated once every dep is built (None = always run);
+    # dry: () -> True if an always-run node would change something (--dry-run)
+    return {"id": nid, "deps": list(deps), "run": run, "local": local,
+            "fp": fp, "outputs": outputs or [], "log": log, "dry": dry}
+
+
+def store_stale(store, cfg_dir):
+    entry = store.index["configs"].get(store.key_for(cfg_dir))
+    if entry is None:
+        return True
+    runs = {os.path.basename(r): r for r in list_runs(cfg_dir)}
+    if set(runs) != set(entry["runs"]):
+        return True
+    return any(
+        entry["runs"][name]["sig"] != {s: file_sig(os.path.join(r, s)) for s in RUN_SOURCES}
+        for name, r in runs.items()
+    )
+
+
+def _with_log(log_path, fn, *args):
+    t0 = time.time()
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, "w") as f, contextlib.redirect_stdout(f):
+            fn(*args)
+        return None, time.time() - t0
+    except (Exception, SystemExit) as e:
+        return f"{type(e).__name__}: {e}", time.time() - t0
+
+
+def do_analyze(cfg_dir, cov_opts):
+    from analyze_results import analyze_result_dir
+    analyze_result_dir(cfg_dir, cov_opts=cov_opts)
+
+
+def do_table(store_path, keys, labels, metrics, outdir, title, n_boot, ci):
+    from compare_multi_from_summary import load_summaries, compare_summaries, save_stats
+    summaries = load_summaries(ResultsStore(store_path), keys)
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, "table.md"), "w") as f:
+        with contextlib.redirect_stdout(f):
+            stats = compare_summaries(summaries, labels, metrics, outdir, title,
+                                      n_boot=n_boot, ci=ci, plots=False)
+    save_stats(stats, outdir)
+
+
+def do_figure(store_path, spec, keys):
+    rf.draw(ResultsStore(store_path), spec, keys)
+
+
+def analyze_fp(cfg_dir, cov_opts, code):
+    runs = {os.path.basename(r): file_signature(r) for r in list_runs(cfg_dir)}
+    return sha({"code": code, "opts": cov_opts, "runs": runs})
+
+
+def summary_sigs(store, keys):
+    return [[store.index["configs"][k].get(f"{n}.sig") for n in ("summary.json", "ppo_summary.json")]
+            for k in keys]
+
+
+def load_report_config(path):
+    with open(path) as f:
+        doc = json.load(f)
+    a = doc.get("analyze", {})
+    try:
+        cov_opts = {
+            "horizon": parse_duration(a["horizon"]) if a.get("horizon") else None,
+            "rel_thresholds": [float(x) for x in a.get("cov_thresholds", REL_THRESHOLDS_DEFAULT)],
+            "abs_thresholds": parse_abs_thresholds(a.get("abs_thresholds", [])),
+            "checkpoints": a.get("checkpoints", CHECKPOINTS_DEFAULT),
+        }
+        for c in cov_opts["checkpoints"]:
+            parse_duration(c)
+    except ValueError as e:
+        raise SystemExit(f"{path}: {e}")
+    doc["cov_opts"] = cov_opts
+    for t in doc.get("targets", []):
+        if not t.get("name") or not t.get("configs"):
+            raise SystemExit(f"{path}: every target needs a name and configs")
+        for c in t["configs"]:
+            c["dir"] = os.path.abspath(c["dir"])
+    return doc
+
+
+def build_graph(doc, outdir, store_path, store, ingest_jobs):
+    cov_opts = doc["cov_opts"]
+    cmp_opts = {"n_boot": 2000, "ci": 95.0}
+    cmp_opts.update(doc.get("compare", {}))
+    ts_opts = doc.get("time_series", {})
+    ppo_opts = doc.get("ppo", {})
+    logs = os.path.join(outdir, "logs")
+
+    code_analyze = rf.code_sig(ANALYZE_CODE)
+    code_table = rf.code_sig(TABLE_CODE)
+    code_fig = {k: rf.code_sig(v["code"]) for k, v in rf.KINDS.items()}
+
+    nodes = {}
+    dirs = {c["dir"] for t in doc["targets"] for c in t["configs"]}
+    for d in sorted(dirs):
+        k = store.key_for(d)
+        nodes[f"analyze:{k}"] = node(
+            f"analyze:{k}",
+            run=(do_analyze, (d, cov_opts)),
+            fp=lambda d=d: analyze_fp(d, cov_opts, code_analyze),
+            outputs=[os.path.join(d, "summary.json")],
+            log=os.path.join(logs, f"analyze_{k.replace('/', '__')}.log"),
+        )
+        # store updates stay in this process (one writer for index.json)
+        nodes[f"ingest:{k}"] = node(
+            f"ingest:{k}", local=True,
+            run=(store.ingest, (d, ingest_jobs, None, True)),
+            dry=lambda d=d: store_stale(store, d),
+        )
+        nodes[f"summary:{k}"] = node(
+            f"summary:{k}", deps=[f"analyze:{k}", f"ingest:{k}"], local=True,
+            run=(store.ingest, (d, 1, None, False)),
+        )
+
+    for t in doc["targets"]:
+        name = t["name"]
+        labels = [c["label"] for c in t["configs"]]
+        cdirs = [c["dir"] for c in t["configs"]]
+        keys = [store.key_for(d) for d in cdirs]
+        summ_deps = [f"summary:{k}" for k in keys]
+
+        metrics = list(t.get("metrics", METRICS_DEFAULT))
+        if t.get("coverage_metrics", True):
+            metrics += [m for m in coverage_metric_names(**cov_opts) if m not in metrics]
+
+        sum_dir = os.path.join(outdir, name, "summary")
+        table_params = {"labels": labels, "metrics": metrics, "title": name, **cmp_opts}
+        nodes[f"table:{name}"] = node(
+            f"table:{name}", deps=summ_deps,
+            run=(do_table, (store_path, keys, labels, metrics, sum_dir, name,
+                            cmp_opts["n_boot"], cmp_opts["ci"])),
+            fp=lambda keys=keys, p=table_params: sha({"code": code_table, "p": p,
+                                                      "in": summary_sigs(store, keys)}),
+            outputs=[os.path.join(sum_dir, "table.md"), os.path.join(sum_dir, "stats.json")],
+            log=os.path.join(logs, f"table_{name}.log"),
+        )
+
+        specs = [{"kind": "metric_bar", "metric": m, "title_prefix": name, "outdir": "summary"}
+                 for m in metrics]
+        specs += [dict(ts_opts, kind=k, title_prefix=name, outdir="time_series") for k in ("coverage", "execs")]
+        ppo_cfgs = [(l, d) for l, d in zip(labels, cdirs)
+                    if any(os.path.exists(os.path.join(r, "ppo_log.csv")) for r in list_runs(d))]
+        if ppo_cfgs:
+            specs.append(dict(ppo_opts, kind="ppo_stats", outdir="ppo",
+                              labels=[l for l, _ in ppo_cfgs], dirs=[d for _, d in ppo_cfgs]))
+
+        for spec in specs:
+            spec.setdefault("labels", labels)
+            spec.setdefault("dirs", cdirs)
+            spec = rf.normalize_spec(spec, os.path.join(outdir, name))
+            skeys = [store.key_for(d) for d in spec["dirs"]]
+            kind = rf.KINDS[spec["kind"]]
+            # coverage / execs only need the parsed runs, so they do not wait for analyze
+            deps = [f"summary:{k}" for k in skeys] if kind["inputs"] else [f"ingest:{k}" for k in skeys]
+            nid = f"fig:{name}:{rf.describe(spec, os.path.join(outdir, name))}"
+            nodes[nid] = node(
+                nid, deps=deps,
+                run=(do_figure, (store_path, spec, skeys)),
+                fp=lambda spec=spec, skeys=skeys: rf.fingerprint(spec, skeys, store, code_fig[spec["kind"]]),
+                outputs=[os.path.join(spec["outdir"], n) for n in kind["outputs"](spec)],
+                log=os.path.join(logs, nid.replace(":", "_").replace("/", "_") + ".log"),
+            )
+    return nodes
+
+
+def is_fresh(n, state, fp):
+    return fp is not None and state.get(n["id"]) == fp and all(os.path.exists(o) for o in n["outputs"])
+
+
+def run_graph(nodes, state_path, jobs, force=False, dry_run=False):
+    state = rf.read_state(state_path)
+    pending = dict(nodes)
+    built, failed = set(), set()
+    n_run = 0
+    running = {}
+    fps = {}
+    stale_up = set()
+    ex = None
+
+    def finish(nid, err, sec):
+        nonlocal n_run
+        if err:
+            failed.add(nid)
+            print(f"[WARN] {nid} failed after {sec:.1f}s: {err}")
+        else:
+            built.add(nid)
+            if nodes[nid]["fp"] is not None:
+                state[nid] = fps[nid]
+                rf.write_state(state_path, state)
+            if not nodes[nid]["local"]:
+                n_run += 1
+                print(f"[REPORT] {nid} done in {sec:.1f}s")
+
+    while pending or running:
+        progressed = False
+        for nid in sorted(pending):
+            n = pending[nid]
+            if not all(d in built or d in failed for d in n["deps"]):
+                continue
+            del pending[nid]
+            progressed = True
+            if any(d in failed for d in n["deps"]):
+                failed.add(nid)
+                print(f"[WARN] {nid} skipped (upstream failed)")
+                continue
+
+            if dry_run:
+                if n["fp"] is None:
+                    # always-run store updates: stale only if they would pick up a change
+                    if set(n["deps"]) & stale_up or (n["dry"] and n["dry"]()):
+                        stale_up.add(nid)
+                    built.add(nid)
+                    continue
+                try:
+                    fresh = not force and not (set(n["deps"]) & stale_up) and is_fresh(n, state, n["fp"]())
+                except KeyError:
+                    # config not in the store yet
+                    fresh = False
+                if not fresh:
+                    stale_up.add(nid)
+                print(f"{'fresh' if fresh else 'STALE'}  {nid}")
+                built.add(nid)
+                continue
+
+            if n["fp"] is not None:
+                fps[nid] = n["fp"]()
+                if not force and is_fresh(n, state, fps[nid]):
+                    built.add(nid)
+                    continue
+
+            fn, args = n["run"]
+            if n["local"]:
+                t0 = time.time()
+                try:
+                    fn(*args)
+                    finish(nid, None, time.time() - t0)
+                except (Exception, SystemExit) as e:
+                    finish(nid, f"{type(e).__name__}: {e}", time.time() - t0)
+                continue
+
+            if ex is None:
+                ex = ProcessPoolExecutor(max_workers=jobs, initializer=rf._init_worker)
+            running[ex.submit(_with_log, n["log"], fn, *args)] = nid
+            print(f"[REPORT] {nid} started")
+
+        if dry_run:
+            if not progressed:
+                break
+            continue
+        if progressed and not running:
+            continue
+        if not running:
+            break
+        done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        for f in done:
+            err, sec = f.result()
+            finish(running.pop(f), err, sec)
+
+    if ex is not None:
+        ex.shutdown()
+    for nid in pending:
+        print(f"[WARN] {nid} not built (dependency cycle?)")
+    return n_run, len(failed)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Build the whole report (analyze -> tables -> figures) as a dependency graph, "
+                    "rebuilding only artifacts whose inputs or parameters changed."
+    )
+    ap.add_argument("--config", required=True, help="report config JSON (see README 5.6)")
+    ap.add_argument("--outdir", default=None, help="report root (overrides \"outdir\" in the config)")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="parallel worker processes for independent stages (0 = all cores, default: 0)",
+    )
+    ap.add_argument("--force", action="store_true", help="rebuild every artifact")
+    ap.add_argument("--dry-run", action="store_true", help="only list fresh / stale artifacts")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    doc = load_report_config(args.config)
+    outdir = os.path.abspath(args.outdir or doc.get("outdir") or "report")
+    store_path = os.path.abspath(doc.get("store") or os.path.join(outdir, ".store"))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    os.makedirs(outdir, exist_ok=True)
+
+    store = ResultsStore(store_path)
+    nodes = build_graph(doc, outdir, store_path, store, ingest_jobs=jobs)
+    n_run, n_failed = run_graph(nodes, os.path.join(outdir, STATE_NAME), jobs,
+                                force=args.force, dry_run=args.dry_run)
+    if args.dry_run:
+        return
+
+    print(f"[REPORT] {n_run} artifact(s) rebuilt, {n_failed} failed, "
+          f"{time.time() - t0:.2f}s total -> {outdir} (logs in {os.path.join(outdir, 'logs')})")
+    if n_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
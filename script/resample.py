@@ -0,0 +1,127 @@
+import warnings
+
+import numpy as np
+
+BAND_CHOICES = ["iqr", "p10-p90", "minmax", "bootstrap", "none"]
+
+
+def resample_runs(runs, grid):
+    # runs: list of (t, y) with t ascending. Returns a (runs x grid) matrix,
+    # NaN wherever the grid lies outside a run's own [t_first, t_last].
+    runs = [(np.asarray(t, dtype=np.float64), np.asarray(y, dtype=np.float64))
+            for t, y in runs if len(t) > 0]
+    grid = np.asarray(grid, dtype=np.float64)
+    if not runs:
+        return np.empty((0, len(grid)))
+
+    lens = np.array([len(t) for t, _ in runs])
+    t_first = np.array([t[0] for t, _ in runs])
+    t_last = np.array([t[-1] for t, _ in runs])
+    t_all = np.concatenate([t for t, _ in runs])
+    y_all = np.concatenate([y for _, y in runs])
+
+    # shift each run into its own disjoint key range so one searchsorted
+    # over the flattened runs resolves every (run, grid point) pair
+    lo = min(t_all.min(), grid.min())
+    span = max(t_all.max(), grid.max()) - lo + 1.0
+    run_idx = np.repeat(np.arange(len(runs)), lens)
+    keys = (t_all - lo) + run_idx * span
+    query = (grid[None, :] - lo) + np.arange(len(runs))[:, None] * span
+
+    starts = np.concatenate([[0], np.cumsum(lens)[:-1]])
+    ends = starts + lens - 1
+    i1 = np.searchsorted(keys, query, side="left")
+    i1 = np.clip(i1, starts[:, None], ends[:, None])
+    i0 = np.clip(i1 - 1, starts[:, None], ends[:, None])
+
+    t0, t1 = t_all[i0], t_all[i1]
+    y0, y1 = y_all[i0], y_all[i1]
+    dt = t1 - t0
+    w = np.divide(grid[None, :] - t0, dt, out=np.zeros_like(dt), where=dt > 0)
+    out = y0 + (y1 - y0) * np.clip(w, 0.0, 1.0)
+
+    outside = (grid[None, :] < t_first[:, None]) | (grid[None, :] > t_last[:, None])
+    out[outside] = np.nan
+    return out
+
+
+def nan_quantiles(mat, qs):
+    # column-wise quantiles ignoring NaN (linear interpolation, same as
+    # np.nanpercentile) without nanpercentile's per-column Python loop
+    srt = np.sort(mat, axis=0)  # NaN sorts last
+    n = (~np.isnan(mat)).sum(axis=0)
+    cols = np.arange(mat.shape[1])
+    out = []
+    for q in qs:
+        pos = q * np.maximum(n - 1, 0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+        frac = pos - lo
+        v = srt[lo, cols] * (1.0 - frac) + srt[hi, cols] * frac
+        v[n == 0] = np.nan
+        out.append(v)
+    return out
+
+
+def bootstrap_mean_ci(mat, n_boot=1000, ci=95.0, seed=0):
+    # resampling runs with replacement == multinomial weights per bootstrap
+    # sample, so every replicate mean is one matrix product
+    rng = np.random.default_rng(seed)
+    n_runs = mat.shape[0]
+    w = rng.multinomial(n_runs, np.full(n_runs, 1.0 / n_runs), size=n_boot).astype(np.float64)
+    valid = ~np.isnan(mat)
+    num = w @ np.where(valid, mat, 0.0)
+    den = w @ valid.astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = num / den
+    alpha = (100.0 - ci) / 200.0
+    lo, hi = nan_quantiles(means, [alpha, 1.0 - alpha])
+    return lo, hi
+
+
+def band_stats(mat, band="iqr", n_boot=1000):
+    count = (~np.isnan(mat)).sum(axis=0)
+    with warnings.catch_warnings():
+        # all-NaN grid columns (no run covers that time) are expected
+        warnings.simplefilter("ignore", RuntimeWarning)
+        stats = {
+            "mean": np.nanmean(mat, axis=0),
+            "median": nan_quantiles(mat, [0.5])[0],
+            "count": count,
+        }
+        if band == "iqr":
+            stats["lo"], stats["hi"] = nan_quantiles(mat, [0.25, 0.75])
+        elif band == "p10-p90":
+            stats["lo"], stats["hi"] = nan_quantiles(mat, [0.10, 0.90])
+        elif band == "minmax":
+            stats["lo"], stats["hi"] = np.nanmin(mat, axis=0), np.nanmax(mat, axis=0)
+        elif band == "bootstrap":
+            stats["lo"], stats["hi"] = bootstrap_mean_ci(mat, n_boot=n_boot)
+    return stats
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets (Steinarsson 2013); NaNs are skipped
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.flatnonzero(~np.isnan(y))
+    n = len(ok)
+    if n_out <= 0 or n <= n_out or n_out < 3:
+        return ok
+
+    xs, ys = x[ok], y[ok]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0] = 0
+    picked[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        s, e = edges[i], max(edges[i + 1], edges[i] + 1)
+        ns, ne = e, min(max(edges[i + 2] if i + 2 < len(edges) else n, e + 1), n)
+        cx, cy = xs[ns:ne].mean(), ys[ns:ne].mean()
+        bx, by = xs[s:e], ys[s:e]
+        area = np.abs((xs[a] - cx) * (by - ys[a]) - (xs[a] - bx) * (cy - ys[a]))
+        a = s + int(np.argmax(area))
+        picked[i + 1] = a
+    return ok[picked]
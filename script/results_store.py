@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+import os
+import json
+import argparse
+
+import numpy as np
+
+from run_loader import (
+    PLOT_DATA_COLUMNS,
+    list_runs,
+    parallel_map,
+    parse_plot_data,
+    parse_ppo_timeline,
+    add_jobs_arg,
+)
+
+STORE_VERSION = 2
+INDEX_NAME = "index.json"
+
+RUN_SOURCES = ["plot_data", "ppo_log.csv"]
+CONFIG_SOURCES = ["summary.json", "ppo_summary.json"]
+
+
+def file_sig(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def read_run_series(run_dir):
+    series = {}
+    data = parse_plot_data(os.path.join(run_dir, "plot_data"))
+    if data is not None:
+        for col in PLOT_DATA_COLUMNS:
+            series[f"plot_data.{col}"] = data[col]
+
+    tl = parse_ppo_timeline(os.path.join(run_dir, "ppo_log.csv"))
+    if tl is not None:
+        series["ppo_log.reward"] = tl["reward"].astype(np.float32)
+        series["ppo_log.step"] = tl["step"]
+        if tl["action"] is not None:
+            series["ppo_log.action"] = tl["action"].astype(np.int8)
+        if tl["probs"] is not None:
+            series["ppo_log.probs"] = tl["probs"].astype(np.float32)
+        if tl["t"] is not None:
+            series["ppo_log.t"] = tl["t"]
+    return series
+
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# config -> run -> series; with path=None the store is in-memory only, which
+# still parses every source file at most once per process
+class ResultsStore:
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path) if path else None
+        self.index = {"version": STORE_VERSION, "configs": {}}
+        self._arrays = {}
+        self._reserved = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            idx = read_json(os.path.join(self.path, INDEX_NAME))
+            if idx and idx.get("version") == STORE_VERSION:
+                self.index = idx
+
+    def _config_dir(self, config):
+        # keys of same-named configs contain "/" (see key_for); keep one directory level
+        return os.path.join(self.path, config.replace("/", "__"))
+
+    def _run_file(self, config, run):
+        return os.path.join(self._config_dir(config), f"{run}.npz")
+
+    def key_for(self, cfg_dir):
+        # the directory name, or "<parent>/<name>" (then more parents) when another
+        # directory with the same name is already in the store, e.g. out/readelf/AFL
+        # and out/objdump/AFL -> "AFL" and "objdump/AFL"
+        cfg_dir = os.path.abspath(cfg_dir).rstrip(os.sep)
+        if cfg_dir in self._reserved:
+            return self._reserved[cfg_dir]
+        taken = {k: e["path"] for k, e in self.index["configs"].items()}
+        for path, k in self._reserved.items():
+            taken[k] = path
+        for k, path in taken.items():
+            if path == cfg_dir:
+                self._reserved[cfg_dir] = k
+                return k
+        parts = cfg_dir.strip(os.sep).split(os.sep)
+        for n in range(1, len(parts) + 1):
+            key = "/".join(parts[-n:])
+            if key not in taken:
+                self._reserved[cfg_dir] = key
+                return key
+        raise SystemExit(f"no free store key for {cfg_dir}")
+
+    def _save_index(self):
+        if not self.path:
+            return
+        tmp = os.path.join(self.path, f".{INDEX_NAME}.tmp.{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, INDEX_NAME))
+
+    def configs(self):
+        return sorted(self.index["configs"])
+
+    def runs(self, config):
+        return sorted(self.index["configs"][config]["runs"])
+
+    def ingest(self, cfg_dir, jobs=1, key=None, with_runs=True):
+        cfg_dir = os.path.abspath(cfg_dir).rstrip(os.sep)
+        key = key or self.key_for(cfg_dir)
+        configs = self.index["configs"]
+        if key in configs and configs[key]["path"] != cfg_dir:
+            raise SystemExit(f"config name {key} already used by {configs[key]['path']}")
+
+        entry = configs.setdefault(key, {"path": cfg_dir, "runs": {}})
+        entry["path"] = cfg_dir
+
+        for name in CONFIG_SOURCES:
+            src = os.path.join(cfg_dir, name)
+            entry[name] = read_json(src)
+            entry[f"{name}.sig"] = file_sig(src)
+
+        if not with_runs:
+            self._save_index()
+            return key
+
+        run_dirs = list_runs(cfg_dir)
+        stale = []
+        for run_dir in run_dirs:
+            run = os.path.basename(run_dir)
+            sig = {s: file_sig(os.path.join(run_dir, s)) for s in RUN_SOURCES}
+            old = entry["runs"].get(run)
+            if old is None or old["sig"] != sig:
+                stale.append((run_dir, sig))
+
+        present = {os.path.basename(r) for r in run_dirs}
+        for run in list(entry["runs"]):
+            if run not in present:
+                del entry["runs"][run]
+                self._arrays.pop((key, run), None)
+
+        parsed = parallel_map(read_run_series, [r for r, _ in stale], jobs)
+        for (run_dir, sig), series in zip(stale, parsed):
+            run = os.path.basename(run_dir)
+            entry["runs"][run] = {"sig": sig, "series": sorted(series)}
+            self._arrays[(key, run)] = series
+            if self.path:
+                os.makedirs(self._config_dir(key), exist_ok=True)
+                tmp = os.path.join(self._config_dir(key), f".{run}.tmp.{os.getpid()}.npz")
+                np.savez(tmp, **series)
+                os.replace(tmp, self._run_file(key, run))
+
+        self._save_index()
+        if stale:
+            print(f"[STORE] {key}: parsed {len(stale)}/{len(run_dirs)} run(s)")
+        return key
+
+    def resolve(self, cfg, jobs=1, with_runs=True):
+        configs = self.index["configs"]
+        if cfg in configs and not os.path.isdir(cfg):
+            return cfg
+        if os.path.isdir(cfg):
+            # re-ingesting an unchanged config only stats the source files
+            return self.ingest(cfg, jobs=jobs, with_runs=with_runs)
+        raise SystemExit(f"{cfg}: neither a config in the store nor a directory")
+
+    def _load_run(self, config, run):
+        arrays = self._arrays.get((config, run))
+        if arrays is None:
+            with np.load(self._run_file(config, run), allow_pickle=False) as z:
+                arrays = {k: z[k] for k in z.files}
+            self._arrays[(config, run)] = arrays
+        return arrays
+
+    def series(self, config, name):
+        out = []
+        for run in self.runs(config):
+            if name not in self.index["configs"][config]["runs"][run]["series"]:
+                continue
+            out.append((run, self._load_run(config, run)[name]))
+        return out
+
+    def run_series(self, config, run):
+        return self._load_run(config, run)
+
+    def summary(self, config):
+        return self.index["configs"][config].get("summary.json")
+
+    def ppo_summary(self, config):
+        return self.index["configs"][config].get("ppo_summary.json")
+
+
+def open_store(path, cfgs, jobs=1, with_runs=True):
+    store = ResultsStore(path)
+    keys = [store.resolve(c, jobs=jobs, with_runs=with_runs) for c in cfgs]
+    return store, keys
+
+
+def add_store_arg(ap):
+    ap.add_argument(
+        "--store",
+        default=None,
+        help="results store directory (see results_store.py ingest); "
+             "dirs are ingested into it incrementally. Default: in-memory",
+    )
+
+
+def config_dirs(root):
+    return [r for r in list_runs(root) if list_runs(r) or os.path.exists(os.path.join(r, "summary.json"))]
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Ingest experiment output into a columnar store (one .npz per run, indexed by config/run/series)."
+    )
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    ap_in = sub.add_parser("ingest", help="parse new / changed runs into the store")
+    ap_in.add_argument("--store", required=True, help="store directory")
+    ap_in.add_argument("--root", help="output root; every subdirectory is a config")
+    ap_in.add_argument("--cfg", nargs="+", default=[], help="individual config directories")
+    add_jobs_arg(ap_in)
+
+    ap_ls = sub.add_parser("ls", help="list configs / runs / series in the store")
+    ap_ls.add_argument("--store", required=True, help="store directory")
+
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        cfgs = list(args.cfg)
+        if args.root:
+            cfgs += config_dirs(args.root)
+        if not cfgs:
+            raise SystemExit("nothing to ingest (use --root or --cfg)")
+        store = ResultsStore(args.store)
+        for c in cfgs:
+            store.ingest(c, jobs=args.jobs)
+        print(f"[STORE] {len(store.configs())} config(s) in {store.path}")
+        return
+
+    store = ResultsStore(args.store)
+    for cfg in store.configs():
+        entry = store.index["configs"][cfg]
+        names = sorted({s for r in entry["runs"].values() for s in r["series"]})
+        print(f"{cfg}: {len(entry['runs'])} run(s), path={entry['path']}")
+        print(f"  summary.json={'yes' if entry.get('summary.json') else 'no'}, "
+              f"ppo_summary.json={'yes' if entry.get('ppo_summary.json') else 'no'}")
+        print(f"  series: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    main()
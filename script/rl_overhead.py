@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import argparse
+import warnings
+import subprocess
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from run_loader import list_runs, parallel_map, parse_plot_data, parse_ppo_timeline, add_jobs_arg
+from analyze_results import parse_fuzzer_stats
+from coverage_metrics import parse_duration
+
+
+def run_series(run_dir):
+    pd = parse_plot_data(os.path.join(run_dir, "plot_data"))
+    if pd is None:
+        return None
+    stats = parse_fuzzer_stats(os.path.join(run_dir, "fuzzer_stats")) or {}
+    try:
+        start = float(stats["start_time"])
+    except (KeyError, ValueError):
+        start = float(pd["unix_time"][0])
+    out = {
+        "t": pd["unix_time"] - start,
+        "execs_per_sec": pd["execs_per_sec"],
+        "map_size": pd["map_size"],
+        "ppo_t": None,
+        "ppo_step": None,
+        "serve_us": None,
+    }
+    tl = parse_ppo_timeline(os.path.join(run_dir, "ppo_log.csv"))
+    if tl is not None and tl["t"] is not None:
+        out["ppo_t"] = tl["t"] - start
+        out["ppo_step"] = tl["step"]
+        out["serve_us"] = tl["serve_us"]
+    return out
+
+
+def bin_mean(t, y, n_bins, bin_sec):
+    k = (t // bin_sec).astype(np.int64)
+    ok = (k >= 0) & (k < n_bins) & ~np.isnan(y)
+    n = np.bincount(k[ok], minlength=n_bins)
+    s = np.bincount(k[ok], weights=y[ok], minlength=n_bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, s / n, np.nan)
+
+
+def decision_rate(r, n_bins, bin_sec):
+    # decisions per second from step increments, so a log that keeps only
+    # every k-th decision still counts all of them
+    rate = np.full(n_bins, np.nan)
+    if r["ppo_t"] is None or len(r["ppo_t"]) == 0:
+        return rate
+    dstep = np.diff(r["ppo_step"], prepend=0).astype(np.float64)
+    k = (r["ppo_t"] // bin_sec).astype(np.int64)
+    ok = (k >= 0) & (k < n_bins)
+    rate = np.bincount(k[ok], weights=dstep[ok], minlength=n_bins) / bin_sec
+    # bins past the end of the run's plot_data are not observed
+    covered = np.arange(n_bins) * bin_sec < r["t"][-1]
+    return np.where(covered, rate, np.nan)
+
+
+def config_bins(runs, n_bins, bin_sec):
+    execs = np.stack([bin_mean(r["t"], r["execs_per_sec"], n_bins, bin_sec) for r in runs])
+    cov = np.stack([bin_mean(r["t"], r["map_size"], n_bins, bin_sec) for r in runs])
+    rate = np.stack([decision_rate(r, n_bins, bin_sec) for r in runs])
+    # coverage never drops within a run; bins after a run ended stay NaN
+    cov = np.where(np.isnan(cov), np.nan, np.fmax.accumulate(cov, axis=1))
+    with warnings.catch_warnings():
+        # bins no run reached (and AFL runs' decision rate) are all-NaN columns
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        out = {
+            "execs_per_sec": np.nanmean(execs, axis=0),
+            "map_size": np.nanmean(cov, axis=0),
+            "decision_rate": np.nanmean(rate, axis=0),
+        }
+    serve = [r["serve_us"] for r in runs if r["serve_us"] is not None]
+    serve_t = [r["ppo_t"] for r in runs if r["serve_us"] is not None]
+    out["serve_us"] = np.concatenate(serve) if serve else None
+    if serve:
+        out["serve_us_bins"] = bin_mean(np.concatenate(serve_t), out["serve_us"], n_bins, bin_sec)
+    return out
+
+
+def attribution(afl, ppo, bin_sec, skip_bins):
+    # only bins where both configs have throughput and PPO made decisions
+    sel = np.zeros(len(afl["execs_per_sec"]), dtype=bool)
+    sel[skip_bins:] = True
+    sel &= ~np.isnan(afl["execs_per_sec"]) & ~np.isnan(ppo["execs_per_sec"])
+    sel &= ppo["decision_rate"] > 0
+    if not sel.any():
+        return None
+
+    e_afl = float(np.mean(afl["execs_per_sec"][sel]))
+    e_ppo = float(np.mean(ppo["execs_per_sec"][sel]))
+    rate = float(np.mean(ppo["decision_rate"][sel]))
+    gap = e_afl - e_ppo
+    # AFL wall time each decision costs, judged by the throughput gap alone
+    cost_ms = gap / (e_afl * rate) * 1e3
+
+    out = {
+        "bins": int(sel.sum()),
+        "execs_per_sec_afl": e_afl,
+        "execs_per_sec_ppo": e_ppo,
+        "gap_execs_per_sec": gap,
+        "gap_rel": gap / e_afl if e_afl > 0 else None,
+        "decision_rate": rate,
+        "execs_lost_per_decision": gap / rate,
+        "cost_per_decision_ms": cost_ms,
+        "serve_ms_mean": None,
+        "serve_ms_p50": None,
+        "serve_ms_p99": None,
+        "blocking_execs_per_sec": None,
+        "blocking_share": None,
+        "scheduling_execs_per_sec": None,
+    }
+
+    if ppo.get("serve_us") is not None and len(ppo["serve_us"]):
+        s = ppo["serve_us"][~np.isnan(ppo["serve_us"])] / 1e3
+        serve_ms = float(s.mean())
+        out.update(serve_ms_mean=serve_ms, serve_ms_p50=float(np.percentile(s, 50)),
+                   serve_ms_p99=float(np.percentile(s, 99)))
+        # blocked for serve_ms per decision -> that fraction of AFL's throughput is gone;
+        # the rest of the gap is what scheduling itself changes (slower seeds, stages ...)
+        blocking = e_afl * rate * serve_ms / 1e3
+        out["blocking_execs_per_sec"] = blocking
+        out["blocking_share"] = blocking / gap if gap > 0 else None
+        out["scheduling_execs_per_sec"] = gap - blocking
+
+    # break-even: the lead in coverage, turned into saved time, spread over the
+    # decisions made until PPO reached AFL's final coverage
+    common = ~np.isnan(afl["map_size"]) & ~np.isnan(ppo["map_size"])
+    out.update(afl_final_map_size=None, ppo_reach_sec=None, headroom_ms=None, break_even_ms=None)
+    if common.any():
+        last = int(np.nonzero(common)[0][-1])
+        target = afl["map_size"][last]
+        reach = np.nonzero(ppo["map_size"][: last + 1] >= target)[0]
+        out["afl_final_map_size"] = float(target)
+        if len(reach):
+            r = int(reach[0])
+            decisions = float(np.nansum(ppo["decision_rate"][: r + 1]) * bin_sec)
+            saved = (last - r) * bin_sec
+            out["ppo_reach_sec"] = (r + 1) * bin_sec
+            if decisions > 0:
+                out["headroom_ms"] = saved / decisions * 1e3
+                out["break_even_ms"] = cost_ms + out["headroom_ms"]
+    return out
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def fmt(v, spec=".2f"):
+    return "N/A" if v is None else format(v, spec)
+
+
+def print_report(target, res):
+    print(f"\n## RL overhead: {target} (vs {res['afl']})\n")
+    rows = [
+        ("execs/sec AFL", "execs_per_sec_afl", ".1f"),
+        ("execs/sec AFL-PPO", "execs_per_sec_ppo", ".1f"),
+        ("gap (execs/sec)", "gap_execs_per_sec", ".1f"),
+        ("gap (relative)", "gap_rel", ".1%"),
+        ("decisions / sec", "decision_rate", ".2f"),
+        ("execs lost / decision", "execs_lost_per_decision", ".1f"),
+        ("cost / decision (ms)", "cost_per_decision_ms", ".3f"),
+        ("server latency mean (ms)", "serve_ms_mean", ".3f"),
+        ("server latency p99 (ms)", "serve_ms_p99", ".3f"),
+        ("gap from blocking (execs/sec)", "blocking_execs_per_sec", ".1f"),
+        ("blocking share of gap", "blocking_share", ".1%"),
+        ("gap from scheduling (execs/sec)", "scheduling_execs_per_sec", ".1f"),
+        ("PPO reaches AFL final cvg (s)", "ppo_reach_sec", ".0f"),
+        ("break-even cost / decision (ms)", "break_even_ms", ".3f"),
+    ]
+    labels = list(res["configs"])
+    print("| metric | " + " | ".join(labels) + " |")
+    print("| --- " * (len(labels) + 1) + "|")
+    for name, key, spec in rows:
+        print(f"| {name} | " + " | ".join(fmt(res["configs"][l][key], spec) for l in labels) + " |")
+
+
+def plot_overhead(grid, afl, ppos, target, outdir):
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 7), sharex=True)
+    ax1.plot(grid / 3600, afl["execs_per_sec"], label="AFL", color="black")
+    for label, p in ppos.items():
+        ax1.plot(grid / 3600, p["execs_per_sec"], label=label)
+        ax2.plot(grid / 3600, p["decision_rate"], label=label)
+    ax1.set_ylabel("execs/sec")
+    ax1.set_title(f"{target}: throughput vs PPO decision rate")
+    ax1.legend()
+    ax1.grid(alpha=0.3)
+    ax2.set_ylabel("decisions/sec")
+    ax2.set_xlabel("time since start (h)")
+    ax2.grid(alpha=0.3)
+    plt.tight_layout()
+    out_path = os.path.join(outdir, "rl_overhead.png")
+    plt.savefig(out_path)
+    plt.close()
+    print(f"[INFO] saved {out_path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Attribute the execs/sec gap between AFL and AFL-PPO to decision blocking vs scheduling."
+    )
+    ap.add_argument("--afl", required=True, help="AFL baseline config directory")
+    ap.add_argument("--ppo", nargs="+", required=True, help="AFL-PPO config directories (same target)")
+    ap.add_argument("--target", default=None, help="target name for the report / history (default: --afl basename)")
+    ap.add_argument("--out", required=True, help="output directory (rl_overhead.json / .npz / .png)")
+    ap.add_argument("--bin-sec", type=int, default=60, help="time bin in seconds (default: 60)")
+    ap.add_argument("--skip", default="5m", help="ignore the first part of each run (calibration), default: 5m")
+    ap.add_argument("--history", default=None, help="append one JSON line per PPO config to this file")
+    add_jobs_arg(ap)
+    args = ap.parse_args()
+
+    try:
+        skip_bins = int(np.ceil(parse_duration(args.skip) / args.bin_sec))
+    except ValueError as e:
+        raise SystemExit(str(e))
+    target = args.target or os.path.basename(os.path.abspath(args.afl).rstrip(os.sep))
+
+    cfgs = [os.path.abspath(args.afl)] + [os.path.abspath(p) for p in args.ppo]
+    loaded = {}
+    for cfg in cfgs:
+        runs = [r for r in parallel_map(run_series, list_runs(cfg), args.jobs) if r is not None]
+        if not runs:
+            raise SystemExit(f"no plot_data under {cfg}")
+        loaded[cfg] = runs
+        print(f"[OVERHEAD] {os.path.basename(cfg)}: {len(runs)} run(s)")
+
+    t_max = max(float(r["t"][-1]) for runs in loaded.values() for r in runs)
+    n_bins = int(t_max // args.bin_sec) + 1
+    grid = np.arange(n_bins) * args.bin_sec + args.bin_sec / 2
+
+    afl = config_bins(loaded[cfgs[0]], n_bins, args.bin_sec)
+    ppos, res = {}, {"target": target, "afl": os.path.basename(cfgs[0]), "bin_sec": args.bin_sec,
+                     "skip_sec": skip_bins * args.bin_sec, "configs": {}}
+    for cfg in cfgs[1:]:
+        label = os.path.basename(cfg)
+        ppos[label] = config_bins(loaded[cfg], n_bins, args.bin_sec)
+        a = attribution(afl, ppos[label], args.bin_sec, skip_bins)
+        if a is None:
+            print(f"[WARN] {label}: no overlapping bins with decisions (timestamped ppo_log.csv needed)")
+            continue
+        res["configs"][label] = a
+    if not res["configs"]:
+        raise SystemExit("nothing to attribute")
+
+    print_report(target, res)
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, "rl_overhead.json")
+    with open(out_path, "w") as f:
+        json.dump(res, f, indent=2)
+    arrays = {"t": grid, "afl_execs_per_sec": afl["execs_per_sec"]}
+    for i, (label, p) in enumerate(ppos.items()):
+        arrays[f"ppo{i}_execs_per_sec"] = p["execs_per_sec"]
+        arrays[f"ppo{i}_decision_rate"] = p["decision_rate"]
+        if "serve_us_bins" in p:
+            arrays[f"ppo{i}_serve_us"] = p["serve_us_bins"]
+    np.savez(os.path.join(args.out, "rl_overhead.npz"), labels=np.array(list(ppos)), **arrays)
+    print(f"\n[INFO] saved {out_path} and rl_overhead.npz")
+    plot_overhead(grid, afl, ppos, target, args.out)
+
+    if args.history:
+        stamp = {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": git_rev(), "target": target, "afl": res["afl"]}
+        with open(args.history, "a") as f:
+            for label, a in res["configs"].items():
+                f.write(json.dumps({**stamp, "ppo": label, **a}) + "\n")
+        print(f"[INFO] appended {len(res['configs'])} line(s) to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
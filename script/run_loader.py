@@ -0,0 +1,289 @@
+import io
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+PLOT_DATA_COLUMNS = [
+    "unix_time",
+    "cycles_done",
+    "cur_path",
+    "paths_total",
+    "pending_total",
+    "pending_favs",
+    "map_size",
+    "unique_crashes",
+    "unique_hangs",
+    "max_depth",
+    "execs_per_sec",
+]
+
+
+def list_runs(root_dir):
+    root_dir = os.path.abspath(root_dir)
+    return [
+        os.path.join(root_dir, d)
+        for d in sorted(os.listdir(root_dir))
+        if os.path.isdir(os.path.join(root_dir, d))
+    ]
+
+
+def parallel_map(fn, items, jobs=1):
+    items = list(items)
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        return [fn(x) for x in items]
+    # Executor.map yields in submission order, so results stay deterministic
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        return list(ex.map(fn, items, chunksize=max(1, len(items) // (jobs * 4))))
+
+
+def _plot_data_rows_slow(text):
+    rows = []
+    for line in text.splitlines():
+        parts = line.split(",")
+        if len(parts) < len(PLOT_DATA_COLUMNS):
+            continue
+        try:
+            rows.append([float(p) for p in parts[:len(PLOT_DATA_COLUMNS)]])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(-1, len(PLOT_DATA_COLUMNS))
+
+
+def parse_plot_data(path):
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        text = "".join(l for l in f if l.strip() and not l.startswith("#"))
+    text = text.replace("%", "")
+    if not text:
+        return None
+
+    try:
+        arr = np.loadtxt(io.StringIO(text), delimiter=",", dtype=np.float64,
+                         usecols=range(len(PLOT_DATA_COLUMNS)), ndmin=2)
+    except ValueError:
+        # truncated last line of a run that was killed mid-write
+        arr = _plot_data_rows_slow(text)
+
+    if len(arr) == 0:
+        return None
+    return {name: arr[:, i] for i, name in enumerate(PLOT_DATA_COLUMNS)}
+
+
+PPO_CHUNK_ROWS = 65536
+PPO_PROB_COLS = ["a0", "a1", "a2", "a3"]
+
+
+def _csv_rows_slow(lines, ncols):
+    rows = []
+    for line in lines:
+        parts = line.split(",")
+        if len(parts) < 2:
+            continue
+        row = [np.nan] * ncols
+        try:
+            for i, p in enumerate(parts[:ncols]):
+                row[i] = float(p)
+        except ValueError:
+            continue
+        rows.append(row)
+    return np.array(rows, dtype=np.float64).reshape(-1, ncols)
+
+
+def iter_csv_chunks(path, chunk_rows=PPO_CHUNK_ROWS):
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+        ncols = len(header)
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            try:
+                arr = np.loadtxt(lines, delimiter=",", dtype=np.float64, ndmin=2)
+                if arr.shape[1] != ncols:
+                    raise ValueError("column count mismatch")
+            except ValueError:
+                arr = _csv_rows_slow(lines, ncols)
+            yield header, arr
+
+
+def _entropy(probs):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plogp = np.where(probs > 0, probs * np.log(probs), 0.0)
+    return -plogp.sum(axis=1)
+
+
+def stream_ppo_log(path, window=1000, chunk_rows=PPO_CHUNK_ROWS, keep_arrays=False):
+    if not os.path.exists(path):
+        return None
+
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    r_min = np.inf
+    r_max = -np.inf
+    prob_sum = np.zeros(len(PPO_PROB_COLS))
+    prob_cnt = 0
+    ent_sum = 0.0
+
+    win_reward = []
+    win_entropy = []
+    win_count = []
+    win_prob_count = []
+    kept = []
+
+    for header, arr in iter_csv_chunks(path, chunk_rows):
+        col = {name: i for i, name in enumerate(header)}
+        steps = arr[:, col["step"]]
+        rewards = arr[:, col["reward"]]
+        ok = ~(np.isnan(steps) | np.isnan(rewards))
+        arr, rewards = arr[ok], rewards[ok]
+        m = len(rewards)
+        if m == 0:
+            continue
+
+        if all(c in col for c in PPO_PROB_COLS):
+            probs = arr[:, [col[c] for c in PPO_PROB_COLS]]
+        else:
+            probs = np.full((m, len(PPO_PROB_COLS)), np.nan)
+        has_p = ~np.isnan(probs).any(axis=1)
+        ent = np.where(has_p, _entropy(np.nan_to_num(probs)), 0.0)
+
+        # Chan et al. merge of the chunk's (n, mean, M2) into the running Welford state
+        c_mean = rewards.mean()
+        c_m2 = ((rewards - c_mean) ** 2).sum()
+        delta = c_mean - mean
+        tot = n + m
+        mean += delta * m / tot
+        m2 += c_m2 + delta * delta * n * m / tot
+
+        r_min = min(r_min, rewards.min())
+        r_max = max(r_max, rewards.max())
+        prob_sum += probs[has_p].sum(axis=0)
+        prob_cnt += int(has_p.sum())
+        ent_sum += ent.sum()
+
+        b0 = n // window
+        bins = (n + np.arange(m)) // window - b0
+        sums = [
+            np.bincount(bins, weights=rewards),
+            np.bincount(bins, weights=ent),
+            np.bincount(bins).astype(np.float64),
+            np.bincount(bins, weights=has_p.astype(np.float64)),
+        ]
+        for acc, part in zip((win_reward, win_entropy, win_count, win_prob_count), sums):
+            if len(acc) > b0:
+                acc[b0] += part[0]
+                part = part[1:]
+            acc.extend(part.tolist())
+
+        if keep_arrays:
+            kept.append((arr[:, col["step"]].astype(np.int64), rewards, probs))
+        n = tot
+
+    if n == 0:
+        return None
+
+    win_count = np.array(win_count)
+    win_prob_count = np.array(win_prob_count)
+    out = {
+        "steps": n,
+        "reward_mean": float(mean),
+        "reward_var": float(m2 / n),
+        "reward_min": float(r_min),
+        "reward_max": float(r_max),
+        "action_prob_means": (prob_sum / prob_cnt).tolist() if prob_cnt else None,
+        "entropy_mean": float(ent_sum / prob_cnt) if prob_cnt else None,
+        "window": window,
+        "window_reward": np.array(win_reward) / win_count,
+        "window_entropy": np.divide(
+            np.array(win_entropy), win_prob_count,
+            out=np.full(len(win_count), np.nan), where=win_prob_count > 0,
+        ),
+    }
+    if keep_arrays:
+        out["arrays"] = {
+            "steps": np.concatenate([k[0] for k in kept]),
+            "rewards": np.concatenate([k[1] for k in kept]),
+            "probs": np.concatenate([k[2] for k in kept]),
+        }
+    return out
+
+
+def parse_ppo_rewards(path):
+    if not os.path.exists(path):
+        return None
+
+    parts = []
+    for header, arr in iter_csv_chunks(path):
+        r = arr[:, header.index("reward")]
+        parts.append(r[~np.isnan(r)])
+    if not parts:
+        return np.zeros(0)
+    return np.concatenate(parts)
+
+
+def parse_ppo_timeline(path):
+    # per-decision step / reward / action / wall-clock time / server latency; logs
+    # written before timestamps (or serve_us) were recorded yield None for them
+    if not os.path.exists(path):
+        return None
+
+    cols = {"step": [], "reward": [], "action": [], "probs": [], "t_mono": [], "t_epoch": [], "serve_us": []}
+    for header, arr in iter_csv_chunks(path):
+        col = {name: i for i, name in enumerate(header)}
+        ok = ~(np.isnan(arr[:, col["step"]]) | np.isnan(arr[:, col["reward"]]))
+        arr = arr[ok]
+        for name in ("step", "reward", "action", "t_mono", "t_epoch", "serve_us"):
+            if name in col:
+                cols[name].append(arr[:, col[name]])
+        if all(c in col for c in PPO_PROB_COLS):
+            cols["probs"].append(arr[:, [col[c] for c in PPO_PROB_COLS]])
+
+    out = {k: np.concatenate(v) if v else None for k, v in cols.items()}
+    if out["step"] is None:
+        return None
+    out["step"] = out["step"].astype(np.int64)
+    if out["action"] is not None:
+        out["action"] = np.nan_to_num(out["action"], nan=-1).astype(np.int64)
+
+    t_mono, t_epoch = out.pop("t_mono"), out.pop("t_epoch")
+    if t_epoch is not None and len(t_epoch) > 0:
+        if t_mono is not None and not np.isnan(t_mono).any():
+            # anchor the monotonic clock at the first epoch stamp so NTP steps
+            # during a run do not bend the time axis
+            out["t"] = t_epoch[0] + (t_mono - t_mono[0])
+        else:
+            out["t"] = t_epoch
+    else:
+        out["t"] = None
+    return out
+
+
+def run_plot_data(run_dir):
+    return parse_plot_data(os.path.join(run_dir, "plot_data"))
+
+
+def run_ppo_rewards(run_dir):
+    return parse_ppo_rewards(os.path.join(run_dir, "ppo_log.csv"))
+
+
+def load_runs(root_dir, parser, jobs=1):
+    runs = list_runs(root_dir)
+    results = parallel_map(parser, runs, jobs)
+    return [(os.path.basename(r), res) for r, res in zip(runs, results)]
+
+
+def add_jobs_arg(ap):
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="parallel worker processes for run parsing (0 = all cores, default: 1)",
+    )
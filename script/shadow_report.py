@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import os
+import json
+import struct
+import argparse
+import warnings
+
+import numpy as np
+
+from run_loader import list_runs, parallel_map, add_jobs_arg
+from results_store import config_dirs
+
+# layout written by ShadowLog in ppo_server.py
+SHADOW_LOG = "ppo_shadow.bin"
+SHADOW_MAGIC = b"PPOSHD01"
+N_QUARTERS = 4
+
+
+def shadow_dtype(n_shadows, n_actions):
+    fields = [("step", "<u4"), ("action", "u1"), ("agree", "<u4"),
+              ("live_probs", "<f2", (n_actions,)), ("live_value", "<f4")]
+    for k in range(n_shadows):
+        fields += [(f"probs{k}", "<f2", (n_actions,)), (f"value{k}", "<f4")]
+    return np.dtype(fields)
+
+
+def shadow_header(names, n_actions):
+    out = SHADOW_MAGIC + struct.pack("<II", len(names), n_actions)
+    for name in names:
+        raw = name.encode()
+        out += struct.pack("<H", len(raw)) + raw
+    return out
+
+
+def read_shadow_log(path):
+    with open(path, "rb") as f:
+        if f.read(len(SHADOW_MAGIC)) != SHADOW_MAGIC:
+            raise ValueError(f"{path}: not a shadow log")
+        n_shadows, n_actions = struct.unpack("<II", f.read(8))
+        names = []
+        for _ in range(n_shadows):
+            (n,) = struct.unpack("<H", f.read(2))
+            names.append(f.read(n).decode())
+        offset = f.tell()
+    dtype = shadow_dtype(n_shadows, n_actions)
+    # a killed server can leave a partial last record
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    return names, np.fromfile(path, dtype=dtype, count=count, offset=offset)
+
+
+def corr(a, b):
+    ok = np.isfinite(a) & np.isfinite(b)
+    if ok.sum() < 3 or np.std(a[ok]) == 0 or np.std(b[ok]) == 0:
+        return None
+    return float(np.corrcoef(a[ok], b[ok])[0, 1])
+
+
+def shadow_stats(rec, k):
+    live = rec["live_probs"].astype(np.float64)
+    p = rec[f"probs{k}"].astype(np.float64)
+    action = rec["action"].astype(np.int64)
+    rows = np.arange(len(rec))
+    agree = ((rec["agree"] >> np.uint32(k)) & 1).astype(np.float64)
+    eps = 1e-6
+    kl = (live * (np.log(live + eps) - np.log(p + eps))).sum(axis=1)
+    v = rec[f"value{k}"].astype(np.float64)
+    quarters = [float(q.mean()) for q in np.array_split(agree, N_QUARTERS) if len(q)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        value_mean = float(np.nanmean(v)) if np.isfinite(v).any() else None
+    return {
+        "steps": int(len(rec)),
+        "agree": float(agree.mean()),
+        "agree_quarters": quarters,
+        "greedy_agree": float((p.argmax(axis=1) == live.argmax(axis=1)).mean()),
+        "kl_live_shadow": float(kl.mean()),
+        "tv": float(0.5 * np.abs(live - p).sum(axis=1).mean()),
+        # mean shadow / live probability of the action actually taken: how far the
+        # logged traffic is from the shadow's own behaviour for off-policy screening
+        "p_action_shadow": float(p[rows, action].mean()),
+        "p_action_live": float(live[rows, action].mean()),
+        "action_mix": p.mean(axis=0).tolist(),
+        "value_mean": value_mean,
+        "value_corr": corr(v, rec["live_value"].astype(np.float64)),
+    }
+
+
+def run_shadow(run_dir):
+    path = os.path.join(run_dir, SHADOW_LOG)
+    if not os.path.exists(path):
+        return None
+    try:
+        names, rec = read_shadow_log(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[WARN] {path}: {e}")
+        return None
+    if len(rec) == 0:
+        return None
+    return {
+        "run": os.path.basename(run_dir),
+        "live_mix": rec["live_probs"].astype(np.float64).mean(axis=0).tolist(),
+        "live_value_mean": float(rec["live_value"].mean()),
+        "shadows": {name: shadow_stats(rec, k) for k, name in enumerate(names)},
+    }
+
+
+def mean_of(vals):
+    vals = [v for v in vals if v is not None]
+    return float(np.mean(vals)) if vals else None
+
+
+def config_shadow(runs):
+    names = sorted({n for r in runs for n in r["shadows"]})
+    out = {"runs": len(runs), "shadows": {}}
+    for name in names:
+        per = [r["shadows"][name] for r in runs if name in r["shadows"]]
+        agg = {"runs": len(per), "steps": sum(s["steps"] for s in per)}
+        for key in ("agree", "greedy_agree", "kl_live_shadow", "tv", "p_action_shadow", "p_action_live",
+                    "value_mean", "value_corr"):
+            agg[key] = mean_of([s[key] for s in per])
+        agg["agree_quarters"] = np.mean([s["agree_quarters"] for s in per], axis=0).tolist()
+        agg["action_mix"] = np.mean([s["action_mix"] for s in per], axis=0).tolist()
+        out["shadows"][name] = agg
+    out["live_mix"] = np.mean([r["live_mix"] for r in runs], axis=0).tolist()
+    out["per_run"] = runs
+    return out
+
+
+def fmt(v, spec=".3f"):
+    return "N/A" if v is None else format(v, spec)
+
+
+def print_report(res, labels):
+    print("\n| config | shadow | runs | steps | agree | agree Q1 -> Q4 | greedy agree | KL(live‖shadow) | TV | "
+          "p(a) shadow / live | value corr |")
+    print("| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |")
+    for label in labels:
+        for name, s in res[label]["shadows"].items():
+            q = s["agree_quarters"]
+            print(f"| {label} | {name} | {s['runs']} | {s['steps']} | {fmt(s['agree'])} | "
+                  f"{q[0]:.3f} -> {q[-1]:.3f} | {fmt(s['greedy_agree'])} | {fmt(s['kl_live_shadow'])} | "
+                  f"{fmt(s['tv'])} | {fmt(s['p_action_shadow'])} / {fmt(s['p_action_live'])} | "
+                  f"{fmt(s['value_corr'])} |")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Screen shadow policies against live PPO traffic from ppo_shadow.bin: "
+                    "agreement, divergence and value estimates per config."
+    )
+    ap.add_argument("--root", help="output root; every subdirectory is a config")
+    ap.add_argument("--cfg", nargs="+", default=[], help="individual config directories")
+    ap.add_argument("--out", required=True, help="output JSON path")
+    add_jobs_arg(ap)
+    args = ap.parse_args()
+
+    cfgs = [os.path.abspath(c) for c in args.cfg]
+    if args.root:
+        cfgs += config_dirs(args.root)
+    if not cfgs:
+        raise SystemExit("nothing to analyze (use --root or --cfg)")
+    labels = [os.path.basename(c.rstrip(os.sep)) for c in cfgs]
+
+    res = {}
+    for label, cfg in zip(labels, cfgs):
+        runs = [r for r in parallel_map(run_shadow, list_runs(cfg), args.jobs) if r is not None]
+        if not runs:
+            continue
+        res[label] = config_shadow(runs)
+        print(f"[SHADOW] {label}: {len(runs)} run(s), shadows: {', '.join(res[label]['shadows'])}")
+    labels = [l for l in labels if l in res]
+    if not labels:
+        raise SystemExit(f"no {SHADOW_LOG} found")
+
+    print_report(res, labels)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(res, f, indent=2)
+    print(f"\n[INFO] saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+EXACT_MAX_N = 20
+
+
+def pad_raw(summaries, metrics):
+    # (configs x metrics x runs) NaN-padded matrix of summary.json "raw" values
+    raws = [[list(s.get(m, {}).get("raw", [])) for m in metrics] for s in summaries]
+    r_max = max([1] + [len(r) for row in raws for r in row])
+    vals = np.full((len(summaries), len(metrics), r_max), np.nan)
+    n = np.zeros((len(summaries), len(metrics)), dtype=np.int64)
+    for c, row in enumerate(raws):
+        for m, r in enumerate(row):
+            vals[c, m, :len(r)] = r
+            n[c, m] = len(r)
+    return vals, n
+
+
+def a12_matrix(vals):
+    # Vargha-Delaney A12[i, j, m] = P(X_i > X_j) + 0.5 * P(X_i == X_j)
+    x = vals[:, None, :, :, None]
+    y = vals[None, :, :, None, :]
+    valid = ~(np.isnan(x) | np.isnan(y))
+    gt = ((x > y) & valid).sum(axis=(-1, -2))
+    eq = ((x == y) & valid).sum(axis=(-1, -2))
+    pairs = valid.sum(axis=(-1, -2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (gt + 0.5 * eq) / pairs
+
+
+@lru_cache(maxsize=None)
+def _u_counts(n1, n2):
+    # number of orderings giving each U value, for samples without ties
+    if n1 == 0 or n2 == 0:
+        return (1,)
+    a = _u_counts(n1 - 1, n2)
+    b = _u_counts(n1, n2 - 1)
+    out = [0] * (n1 * n2 + 1)
+    for u, c in enumerate(a):
+        out[u + n2] += c
+    for u, c in enumerate(b):
+        out[u] += c
+    return tuple(out)
+
+
+def mann_whitney_p(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = x[~np.isnan(x)], y[~np.isnan(y)]
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return float("nan")
+
+    u = float((x[:, None] > y[None, :]).sum() + 0.5 * (x[:, None] == y[None, :]).sum())
+    both = np.concatenate([x, y])
+    _, ties = np.unique(both, return_counts=True)
+    has_ties = (ties > 1).any()
+
+    if not has_ties and max(n1, n2) <= EXACT_MAX_N:
+        counts = np.array(_u_counts(n1, n2), dtype=np.float64)
+        cdf = np.cumsum(counts) / counts.sum()
+        k = int(round(u))
+        p_lo = cdf[k]
+        p_hi = 1.0 - (cdf[k - 1] if k > 0 else 0.0)
+        return float(min(1.0, 2.0 * min(p_lo, p_hi)))
+
+    # normal approximation with tie and continuity correction
+    nn = n1 + n2
+    tie_term = float((ties ** 3 - ties).sum()) / (nn * (nn - 1))
+    var = n1 * n2 / 12.0 * ((nn + 1) - tie_term)
+    if var <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2.0) - 0.5) / math.sqrt(var)
+    return float(min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2.0))))
+
+
+def mwu_matrix(vals):
+    n_cfg, n_met = vals.shape[0], vals.shape[1]
+    p = np.full((n_cfg, n_cfg, n_met), np.nan)
+    for i in range(n_cfg):
+        for j in range(i + 1, n_cfg):
+            for m in range(n_met):
+                p[i, j, m] = p[j, i, m] = mann_whitney_p(vals[i, m], vals[j, m])
+    return p
+
+
+def bootstrap_diff_ci(vals, n, n_boot=2000, ci=95.0, seed=0):
+    # resample run indices per config, take the mean, then CI[i, j, m] of
+    # mean_i - mean_j over the replicates. Drawing one config at a time keeps
+    # the index / sample temporaries at n_boot x metrics x runs; only the
+    # means (n_boot x configs x metrics) are kept for all configs
+    rng = np.random.default_rng(seed)
+    n_cfg, n_met, r_max = vals.shape
+    use = np.arange(r_max)[None, None, :] < n[:, :, None]
+    means = np.empty((n_boot, n_cfg, n_met))
+    for c in range(n_cfg):
+        u = rng.random((n_boot, n_met, r_max))
+        idx = np.minimum((u * n[c][None, :, None]).astype(np.intp), np.maximum(n[c] - 1, 0)[None, :, None])
+        sample = np.take_along_axis(np.broadcast_to(vals[c], (n_boot, n_met, r_max)), idx, axis=-1)
+        sample[:, ~use[c]] = 0.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[:, c, :] = sample.sum(axis=-1) / n[c][None, :]
+
+    alpha = (100.0 - ci) / 2.0
+    lo = np.empty((n_cfg, n_cfg, n_met))
+    hi = np.empty((n_cfg, n_cfg, n_met))
+    # one config row at a time: each difference tensor is n_boot x configs x metrics
+    for i in range(n_cfg):
+        diff = means[:, i:i + 1, :] - means
+        lo[i], hi[i] = np.percentile(diff, [alpha, 100.0 - alpha], axis=0)
+    missing = (n == 0)
+    lo[missing[:, None, :] | missing[None, :, :]] = np.nan
+    hi[missing[:, None, :] | missing[None, :, :]] = np.nan
+    return lo, hi
+
+
+def compare_all(summaries, labels, metrics, n_boot=2000, ci=95.0, seed=0):
+    vals, n = pad_raw(summaries, metrics)
+    lo, hi = bootstrap_diff_ci(vals, n, n_boot=n_boot, ci=ci, seed=seed)
+    return {
+        "labels": list(labels),
+        "metrics": list(metrics),
+        "n": n,
+        "p_mwu": mwu_matrix(vals),
+        "a12": a12_matrix(vals),
+        "diff_ci_lo": lo,
+        "diff_ci_hi": hi,
+        "ci": ci,
+    }
+
+
+def sig_marker(p):
+    if p is None or np.isnan(p):
+        return ""
+    if p < 0.001:
+        return "***"
+    if p < 0.01:
+        return "**"
+    if p < 0.05:
+        return "*"
+    return ""
+
+
+def stats_to_json(res):
+    def clean(a):
+        return [[None if np.isnan(v) else float(v) for v in row] for row in a]
+
+    out = {}
+    for m, metric in enumerate(res["metrics"]):
+        out[metric] = {
+            "labels": res["labels"],
+            "n": res["n"][:, m].tolist(),
+            "p_mwu": clean(res["p_mwu"][:, :, m]),
+            "a12": clean(res["a12"][:, :, m]),
+            "diff_ci_lo": clean(res["diff_ci_lo"][:, :, m]),
+            "diff_ci_hi": clean(res["diff_ci_hi"][:, :, m]),
+            "ci": res["ci"],
+        }
+    return out
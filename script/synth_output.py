@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+import os
+import argparse
+
+import numpy as np
+
+from run_loader import PLOT_DATA_COLUMNS, PPO_PROB_COLS
+from telemetry import FIELDS as TELEMETRY_FIELDS
+from shadow_report import shadow_dtype, shadow_header
+
+PLOT_UPDATE_SEC = 5  # afl-fuzz appends a plot_data row every 5 s
+START_TIME = 1700000000
+OPS = ["flip1", "flip2", "flip4", "flip8", "arith8", "int16", "ext_UO", "havoc", "splice"]
+
+
+def discovery_times(rng, n, duration):
+    # new paths come fast at first and slow down: t ~ duration * u^3
+    return np.sort(duration * rng.random(n) ** 3)
+
+
+def write_plot_data(path, rng, duration, paths_t, crash_t, hang_t, map_final, execs=800.0):
+    t = np.arange(0, duration + 1, PLOT_UPDATE_SEC, dtype=np.int64)
+    paths = 1 + np.searchsorted(paths_t, t, side="right")
+    n = len(t)
+    cols = {
+        "unix_time": START_TIME + t,
+        "cycles_done": (t // max(1, duration // 20)),
+        "cur_path": (rng.random(n) * paths).astype(np.int64),
+        "paths_total": paths,
+        "pending_total": (paths * 0.6).astype(np.int64),
+        "pending_favs": (paths * 0.05).astype(np.int64),
+        "map_size": map_final * paths / paths[-1],
+        "unique_crashes": np.searchsorted(crash_t, t, side="right"),
+        "unique_hangs": np.searchsorted(hang_t, t, side="right"),
+        "max_depth": 1 + np.log2(paths).astype(np.int64),
+        "execs_per_sec": np.maximum(1.0, execs * (1 + 0.2 * rng.standard_normal(n))),
+    }
+    # same field formats as afl-fuzz's maybe_update_plot_file()
+    fmt = ["{}", "{}", "{}", "{}", "{}", "{}", "{:0.2f}%", "{}", "{}", "{}", "{:0.2f}"]
+    line = ", ".join(fmt) + "\n"
+    with open(path, "w") as f:
+        f.write("# " + ", ".join(PLOT_DATA_COLUMNS) + "\n")
+        for row in zip(*(cols[c].tolist() for c in PLOT_DATA_COLUMNS)):
+            f.write(line.format(*row))
+    return {c: v[-1] for c, v in cols.items()}
+
+
+def write_fuzzer_stats(path, last, duration, prog):
+    execs_done = int(last["execs_per_sec"] * duration)
+    stats = [
+        ("start_time", START_TIME),
+        ("last_update", START_TIME + duration),
+        ("fuzzer_pid", 4242),
+        ("cycles_done", last["cycles_done"]),
+        ("execs_done", execs_done),
+        ("execs_per_sec", f"{execs_done / max(1, duration):.2f}"),
+        ("paths_total", last["paths_total"]),
+        ("paths_favored", last["pending_favs"]),
+        ("paths_found", last["paths_total"] - 1),
+        ("paths_imported", 0),
+        ("max_depth", last["max_depth"]),
+        ("cur_path", last["cur_path"]),
+        ("pending_favs", last["pending_favs"]),
+        ("pending_total", last["pending_total"]),
+        ("variable_paths", 0),
+        ("stability", "100.00%"),
+        ("bitmap_cvg", f"{last['map_size']:.2f}%"),
+        ("unique_crashes", last["unique_crashes"]),
+        ("unique_hangs", last["unique_hangs"]),
+        ("last_path", START_TIME + duration),
+        ("last_crash", 0),
+        ("last_hang", 0),
+        ("execs_since_crash", execs_done),
+        ("exec_timeout", 1000),
+        ("afl_banner", prog),
+        ("afl_version", "2.57b"),
+        ("target_mode", "default"),
+        ("command_line", f"afl-fuzz -i seeds -o out -- /setup/bin/{prog} -a @@"),
+    ]
+    with open(path, "w") as f:
+        for k, v in stats:
+            f.write(f"{k:<18}: {v}\n")
+
+
+def write_inputs(d, rng, times, kind):
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, "README.txt"), "w") as f:
+        f.write("synthetic\n")
+    for i, t in enumerate(times):
+        src = int(rng.integers(0, max(1, i)))
+        op = OPS[int(rng.integers(0, len(OPS)))]
+        # afl-fuzz describe_op(): deterministic stages log pos:, havoc / splice log rep:
+        if op == "splice":
+            desc = f"src:{src:06d}+{int(rng.integers(0, max(1, i))):06d},op:splice,rep:{int(rng.integers(1, 64))}"
+        elif op == "havoc":
+            desc = f"src:{src:06d},op:havoc,rep:{int(rng.integers(1, 64))}"
+        else:
+            desc = f"src:{src:06d},op:{op},pos:{int(rng.integers(0, 512))}"
+        if kind == "queue":
+            name = f"id:{i:06d},orig:seed" if i == 0 else f"id:{i:06d},{desc},+cov"
+        elif kind == "crashes":
+            name = f"id:{i:06d},sig:11,{desc}"
+        else:
+            name = f"id:{i:06d},{desc}"
+        path = os.path.join(d, name)
+        with open(path, "wb") as f:
+            f.write(rng.integers(0, 256, int(rng.integers(16, 512)), dtype=np.uint8).tobytes())
+        os.utime(path, (START_TIME + t, START_TIME + t))
+
+
+def write_ppo_log(path, rng, steps, duration):
+    t = np.sort(rng.random(steps)) * duration
+    # policy drifts from uniform towards one favoured action
+    drift = np.linspace(0, 1, steps)[:, None] * np.array([1.5, 0.0, -0.5, -1.0])
+    logits = drift + 0.3 * rng.standard_normal((steps, len(PPO_PROB_COLS)))
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    action = (rng.random(steps)[:, None] > np.cumsum(probs, axis=1)).sum(axis=1)
+    reward = np.where(rng.random(steps) < 0.05, rng.integers(1, 5, steps), 0).astype(np.float64)
+    serve_us = rng.lognormal(np.log(400.0), 0.4, steps)
+    with open(path, "w") as f:
+        f.write(",".join(["step", "reward"] + PPO_PROB_COLS + ["action", "t_mono", "t_epoch", "serve_us"]) + "\n")
+        for i in range(steps):
+            p = probs[i]
+            f.write(f"{i + 1},{reward[i]},{p[0]},{p[1]},{p[2]},{p[3]},{action[i]},"
+                    f"{1000.0 + t[i]:.6f},{START_TIME + t[i]:.6f},{serve_us[i]:.0f}\n")
+    return probs, action
+
+
+def write_shadow_log(path, rng, probs, action, n_shadows):
+    # shadow k is the live policy with more noise on its logits (shadow 0 closest)
+    steps, n_actions = probs.shape
+    names = [f"cand{k}" for k in range(n_shadows)]
+    rec = np.zeros(steps, dtype=shadow_dtype(n_shadows, n_actions))
+    rec["step"] = np.arange(1, steps + 1)
+    rec["action"] = action
+    rec["live_probs"] = probs
+    live_value = np.cumsum(rng.standard_normal(steps)) * 0.05
+    rec["live_value"] = live_value
+    agree = np.zeros(steps, dtype=np.uint32)
+    for k in range(n_shadows):
+        logits = np.log(probs) + 0.5 * (k + 1) * rng.standard_normal(probs.shape)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+        rec[f"probs{k}"] = p
+        rec[f"value{k}"] = live_value + 0.2 * (k + 1) * rng.standard_normal(steps)
+        agree |= (p.argmax(axis=1) == action).astype(np.uint32) << np.uint32(k)
+    rec["agree"] = agree
+    with open(path, "wb") as f:
+        f.write(shadow_header(names, n_actions))
+        rec.tofile(f)
+
+
+def write_ppo_server_log(path, hist, steps):
+    with open(path, "w") as f:
+        f.write("[PPO] Hyperparams: LR=0.0003, GAMMA=0.99, CLIP=0.2\n")
+        f.write("[PPO] Listening on /tmp/ppo.sock\n[PPO] Client connected\n")
+        # the periodic lines carry the running histogram; only the last one is used
+        for s in range(100, steps + 1, max(100, steps // 50 // 100 * 100)):
+            f.write(f"[PPO] step={s}, actions={[int(v * s / steps) for v in hist]}\n")
+        f.write(f"[PPO] FINAL actions hist: {[int(v) for v in hist]}\n")
+
+
+def write_telemetry(path, rng, duration, groups):
+    with open(path, "w") as f:
+        f.write(",".join(TELEMETRY_FIELDS) + "\n")
+        for t in range(PLOT_UPDATE_SEC, duration + 1, PLOT_UPDATE_SEC):
+            for g, share in groups:
+                row = {
+                    "t": f"{t:.1f}", "group": g, "nprocs": 2, "cpu_sec": f"{t * share:.2f}",
+                    "rss_kb": int(20000 + 5000 * rng.random()), "read_bytes": t * 4096,
+                    "write_bytes": t * 1024, "vol_ctxt": t * 10, "nonvol_ctxt": t, "load1": "1.00",
+                }
+                f.write(",".join(str(row[k]) for k in TELEMETRY_FIELDS) + "\n")
+
+
+def generate_run(run_dir, seed, prog="readelf", ppo=False, duration=3600, ppo_steps=10000,
+                 queue=500, crashes=5, hangs=2, telemetry=True, execs=None, shadows=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(run_dir, exist_ok=True)
+    if execs is None:
+        # AFL-PPO blocks on the server socket, so its runs are a bit slower
+        execs = 680.0 if ppo else 800.0
+    queue_t = np.concatenate([[0.0], discovery_times(rng, max(0, queue - 1), duration)])
+    crash_t = discovery_times(rng, crashes, duration)
+    hang_t = discovery_times(rng, hangs, duration)
+
+    last = write_plot_data(os.path.join(run_dir, "plot_data"), rng, duration, queue_t[1:], crash_t, hang_t,
+                           map_final=2.0 + rng.random(), execs=execs)
+    write_fuzzer_stats(os.path.join(run_dir, "fuzzer_stats"), last, duration, prog)
+    write_inputs(os.path.join(run_dir, "queue"), rng, queue_t, "queue")
+    write_inputs(os.path.join(run_dir, "crashes"), rng, crash_t, "crashes")
+    write_inputs(os.path.join(run_dir, "hangs"), rng, hang_t, "hangs")
+
+    groups = [("afl", 0.95)]
+    if ppo:
+        probs, action = write_ppo_log(os.path.join(run_dir, "ppo_log.csv"), rng, ppo_steps, duration)
+        hist = np.bincount(action, minlength=len(PPO_PROB_COLS))
+        if shadows:
+            write_shadow_log(os.path.join(run_dir, "ppo_shadow.bin"), rng, probs, action, shadows)
+        write_ppo_server_log(os.path.join(run_dir, "ppo_server.log"), hist, ppo_steps)
+        groups.append(("ppo", 0.1))
+    if telemetry:
+        write_telemetry(os.path.join(run_dir, "telemetry.csv"), rng, duration, groups)
+
+
+def generate_tree(root, afl_configs=1, ppo_configs=1, runs=5, prog="readelf", seed=0, **run_opts):
+    # <root>/<config>/<FUZZER>_<PROG>_<i>, the layout reproduce.py produces
+    cfg_dirs = []
+    configs = [("AFL", f"AFL_{prog}" if afl_configs == 1 else f"AFL_{prog}_{c}", False) for c in range(afl_configs)]
+    configs += [("AFL-PPO", f"AFL-PPO_{prog}" if ppo_configs == 1 else f"AFL-PPO_{prog}_{c}", True)
+                for c in range(ppo_configs)]
+    for ci, (fuzzer, name, ppo) in enumerate(configs):
+        cfg_dir = os.path.join(os.path.abspath(root), name)
+        for r in range(runs):
+            generate_run(os.path.join(cfg_dir, f"{fuzzer}_{prog}_{r}"), seed=(seed, ci, r),
+                         prog=prog, ppo=ppo, **run_opts)
+        cfg_dirs.append(cfg_dir)
+    return cfg_dirs
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Generate a synthetic output root (plot_data, fuzzer_stats, ppo_log.csv, queue/, crashes/ ...)."
+    )
+    ap.add_argument("--out", required=True, help="output root to create")
+    ap.add_argument("--afl-configs", type=int, default=1, help="number of AFL configs (default: 1)")
+    ap.add_argument("--ppo-configs", type=int, default=1, help="number of AFL-PPO configs (default: 1)")
+    ap.add_argument("--runs", type=int, default=5, help="runs per config (default: 5)")
+    ap.add_argument("--duration", type=int, default=3600, help="run length in seconds; plot_data rows = duration / 5")
+    ap.add_argument("--ppo-steps", type=int, default=10000, help="ppo_log.csv rows per PPO run (default: 10000)")
+    ap.add_argument("--queue", type=int, default=500, help="queue/ entries per run (default: 500)")
+    ap.add_argument("--crashes", type=int, default=5, help="crashes/ entries per run (default: 5)")
+    ap.add_argument("--hangs", type=int, default=2, help="hangs/ entries per run (default: 2)")
+    ap.add_argument("--shadows", type=int, default=0, help="shadow policies in ppo_shadow.bin per PPO run (default: 0)")
+    ap.add_argument("--no-telemetry", action="store_true", help="do not write telemetry.csv")
+    ap.add_argument("--prog", default="readelf", help="program name used in directory names (default: readelf)")
+    ap.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = ap.parse_args()
+
+    cfg_dirs = generate_tree(
+        args.out, afl_configs=args.afl_configs, ppo_configs=args.ppo_configs, runs=args.runs,
+        prog=args.prog, seed=args.seed, duration=args.duration, ppo_steps=args.ppo_steps,
+        queue=args.queue, crashes=args.crashes, hangs=args.hangs, telemetry=not args.no_telemetry,
+        shadows=args.shadows,
+    )
+    for d in cfg_dirs:
+        print(f"[SYNTH] {d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+import os
+import time
+import argparse
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+FIELDS = [
+    "t",
+    "group",
+    "nprocs",
+    "cpu_sec",
+    "rss_kb",
+    "read_bytes",
+    "write_bytes",
+    "vol_ctxt",
+    "nonvol_ctxt",
+    "load1",
+]
+
+
+def read_stat(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces / parens, so split after the last ')'
+    rest = raw[raw.rindex(")") + 2:].split()
+    if rest[0] == "Z":
+        return None
+    return {
+        "ppid": int(rest[1]),
+        "cpu_ticks": int(rest[11]) + int(rest[12]) + int(rest[13]) + int(rest[14]),
+        "rss_kb": int(rest[21]) * PAGE_KB,
+    }
+
+
+def read_io(pid):
+    out = {"read_bytes": 0, "write_bytes": 0}
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                k, v = line.split(":", 1)
+                # storage I/O; rchar / wchar would also count pipe, socket and tmpfs traffic
+                if k in out:
+                    out[k] = int(v)
+    except OSError:
+        pass
+    return out
+
+
+def read_ctxt(pid):
+    vol = nonvol = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("voluntary_ctxt_switches:"):
+                    vol = int(line.split(":", 1)[1])
+                elif line.startswith("nonvoluntary_ctxt_switches:"):
+                    nonvol = int(line.split(":", 1)[1])
+    except OSError:
+        pass
+    return vol, nonvol
+
+
+def read_load1():
+    try:
+        with open("/proc/loadavg") as f:
+            return float(f.read().split()[0])
+    except OSError:
+        return 0.0
+
+
+def process_table():
+    table = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        st = read_stat(int(name))
+        if st is not None:
+            table[int(name)] = st
+    return table
+
+
+def descendants(root, table):
+    children = {}
+    for pid, st in table.items():
+        children.setdefault(st["ppid"], []).append(pid)
+
+    out = []
+    todo = [root]
+    while todo:
+        pid = todo.pop()
+        if pid not in table:
+            continue
+        out.append(pid)
+        todo.extend(children.get(pid, []))
+    return out
+
+
+def sample_group(root, table):
+    pids = descendants(root, table)
+    row = {
+        "nprocs": len(pids),
+        "cpu_sec": 0.0,
+        "rss_kb": 0,
+        "read_bytes": 0,
+        "write_bytes": 0,
+        "vol_ctxt": 0,
+        "nonvol_ctxt": 0,
+    }
+    for pid in pids:
+        st = table[pid]
+        # cutime/cstime make reaped children (target execs) count toward the tree
+        row["cpu_sec"] += st["cpu_ticks"] / CLK_TCK
+        row["rss_kb"] += st["rss_kb"]
+        io = read_io(pid)
+        row["read_bytes"] += io["read_bytes"]
+        row["write_bytes"] += io["write_bytes"]
+        vol, nonvol = read_ctxt(pid)
+        row["vol_ctxt"] += vol
+        row["nonvol_ctxt"] += nonvol
+    return row
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Sample CPU / RSS / I/O / context switches of process trees into a CSV."
+    )
+    ap.add_argument(
+        "--out",
+        required=True,
+        help="output CSV path (e.g. /output/<run>/telemetry.csv)",
+    )
+    ap.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="sampling interval in seconds (default: 5)",
+    )
+    ap.add_argument(
+        "groups",
+        nargs="+",
+        help="name=pid pairs; each pid is sampled together with its descendants",
+    )
+    args = ap.parse_args()
+
+    groups = []
+    for item in args.groups:
+        name, pid = item.split("=", 1)
+        if pid:
+            groups.append((name, int(pid)))
+
+    t0 = time.time()
+    with open(args.out, "w") as f:
+        f.write(",".join(FIELDS) + "\n")
+        while True:
+            table = process_table()
+            alive = False
+            t = time.time() - t0
+            load1 = read_load1()
+            for name, root in groups:
+                if root not in table:
+                    continue
+                alive = True
+                row = sample_group(root, table)
+                row.update({"t": f"{t:.1f}", "group": name, "load1": load1})
+                row["cpu_sec"] = f"{row['cpu_sec']:.2f}"
+                f.write(",".join(str(row[k]) for k in FIELDS) + "\n")
+            f.flush()
+
+            if not alive:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
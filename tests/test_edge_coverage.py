@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import subprocess
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "script", "edge_coverage.py")
+
+# stub tracer: a two-byte input (a, b) hits exactly edge a * 131 + b
+TREE = {
+    "AFL": {
+        "AFL_readelf_0": [b"\x00\x01", b"\x00\x02"],
+        "AFL_readelf_1": [b"\x00\x03"],
+    },
+    "AFL-PPO": {
+        "AFL-PPO_readelf_0": [b"\x00\x01", b"\x00\x04"],
+    },
+}
+
+# --tracer cmd: same edges as the stub, but fails (writes nothing) on inputs starting with "bad"
+FLAKY_CMD = (
+    f"{sys.executable} -c \"import sys; d = open(sys.argv[1], 'rb').read(); "
+    "d.startswith(b'bad') or open(sys.argv[2], 'w').write('%d:1\\n' % (d[0] * 131 + d[1]))\" "
+    "{input} {output}"
+)
+
+
+def make_tree(root, tree=TREE):
+    cfgs = []
+    for cfg, runs in tree.items():
+        for run, inputs in runs.items():
+            q = os.path.join(root, cfg, run, "queue")
+            os.makedirs(q)
+            for i, data in enumerate(inputs):
+                with open(os.path.join(q, f"id:{i:06d},orig:seed{i}"), "wb") as f:
+                    f.write(data)
+        cfgs.append(os.path.join(root, cfg))
+    return cfgs
+
+
+def run_edge(tmp_path, cfgs, *extra):
+    out = tmp_path / "report"
+    r = subprocess.run(
+        [sys.executable, SCRIPT, "--cache", str(tmp_path / "cache"), "--out", str(out), "--cfg", *cfgs,
+         "--jobs", "2", *extra],
+        capture_output=True, text=True, check=True,
+    )
+    with open(out / "edge_report.json") as f:
+        return json.load(f), r.stdout
+
+
+def test_stub_edge_counts(tmp_path):
+    cfgs = make_tree(str(tmp_path / "out"))
+    res, _ = run_edge(tmp_path, cfgs, "--tracer", "stub")
+
+    assert res["union_edges"] == 4
+    assert res["intersection_edges"] == 1
+    afl, ppo = res["configs"]["AFL"], res["configs"]["AFL-PPO"]
+    assert (afl["edges"], afl["exclusive_edges"]) == (3, 2)
+    assert (ppo["edges"], ppo["exclusive_edges"]) == (2, 1)
+    assert afl["edges_per_run"] == {"AFL_readelf_0": 2, "AFL_readelf_1": 1}
+    assert res["pairwise_exclusive"] == {"AFL - AFL-PPO": 2, "AFL-PPO - AFL": 1}
+    assert res["failed_inputs"] == []
+
+
+def test_rerun_reuses_cache(tmp_path):
+    cfgs = make_tree(str(tmp_path / "out"))
+    first, out1 = run_edge(tmp_path, cfgs, "--tracer", "stub")
+    second, out2 = run_edge(tmp_path, cfgs, "--tracer", "stub")
+
+    assert "4 distinct input(s): 0 cached, 4 traced" in out1
+    assert "4 distinct input(s): 4 cached, 0 traced" in out2
+    assert "0 newly hashed" in out2
+    assert first == second
+
+
+def test_tracer_failure_counted_not_cached(tmp_path):
+    tree = {"AFL": {"AFL_readelf_0": [b"\x00\x01", b"bad"]}, "AFL-PPO": TREE["AFL-PPO"]}
+    cfgs = make_tree(str(tmp_path / "out"), tree)
+    res, out = run_edge(tmp_path, cfgs, "--tracer", "cmd", "--cmd", FLAKY_CMD)
+
+    afl = res["configs"]["AFL"]
+    assert afl["failed_entries"] == 1
+    assert afl["edges"] == 1
+    assert res["configs"]["AFL-PPO"]["failed_entries"] == 0
+    assert [os.path.basename(os.path.dirname(os.path.dirname(p))) for p in res["failed_inputs"]] == \
+        ["AFL_readelf_0"]
+    assert "| trace failed |" in out
+
+    # the failed input is traced again on the next run, the others come from the cache
+    _, out = run_edge(tmp_path, cfgs, "--tracer", "cmd", "--cmd", FLAKY_CMD)
+    assert "3 distinct input(s): 2 cached, 1 traced" in out
+
+
+def test_removed_inputs_leave_hashes(tmp_path):
+    cfgs = make_tree(str(tmp_path / "out"))
+    run_edge(tmp_path, cfgs, "--tracer", "stub")
+    gone = os.path.join(cfgs[0], "AFL_readelf_1", "queue", "id:000000,orig:seed0")
+    os.unlink(gone)
+    run_edge(tmp_path, cfgs, "--tracer", "stub")
+
+    with open(tmp_path / "cache" / "hashes.json") as f:
+        hashes = json.load(f)
+    assert gone not in hashes
+    assert len(hashes) == 4